@@ -0,0 +1,95 @@
+"""
+Measure the image handoff from the generator to pygame and the per-frame cost of DisplayManager.draw.
+
+Handoff: a temporary PNG file loaded with pygame.image.load (the old path) against
+pil_to_surface, which wraps the pixels in memory. Draw: rescaling the top image on every frame
+(the old draw) against a full redraw with the cached, display-format scaled surface, a frame
+where only the toolbar changed, and an idle frame where nothing changed. Runs headless by default:
+
+    python benchmarks/display_draw.py --frames 300 --size 256
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from PIL import Image
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "kids_story_teller"))
+
+from display_manager import DisplayManager
+from image_surface import pil_to_surface
+
+def png_handoff(image):
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_file:
+        tmp_filename = tmp_file.name
+        image.save(tmp_filename)
+    try:
+        return pygame.image.load(tmp_filename)
+    finally:
+        os.unlink(tmp_filename)
+
+def draw_rescaling_every_frame(display):
+    """
+    DisplayManager.draw as it was before the scaled surface was cached.
+    """
+    display.screen.fill(display.bg_color)
+    top_area_height = display.screen.get_height() - 100
+    available_width = display.screen.get_width()
+    orig_width, orig_height = display.top_image.get_size()
+    scale_factor = min(available_width / orig_width, top_area_height / orig_height)
+    scaled = pygame.transform.smoothscale(
+        display.top_image, (int(orig_width * scale_factor), int(orig_height * scale_factor))
+    )
+    rect = scaled.get_rect(center=pygame.Rect(0, 0, available_width, top_area_height).center)
+    display.screen.blit(scaled, rect.topleft)
+    display.bottom_toolbar.draw(display.screen, display.current_energy)
+    pygame.display.update()
+
+def measure(fn, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    elapsed = time.perf_counter() - start
+    # Drop the redraw requests posted by invalidate().
+    pygame.event.clear()
+    return elapsed / count
+
+def redraw(display, *sections):
+    display.invalidate(*sections)
+    display.draw()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--handoffs", type=int, default=50)
+    parser.add_argument("--size", type=int, default=256, help="Side of the generated image in pixels")
+    args = parser.parse_args()
+
+    pygame.init()
+    display = DisplayManager(800, 600)
+    display.set_message("Give me 10 seconds to think a story for you about a dragon")
+    image = Image.frombytes("RGB", (args.size, args.size), os.urandom(args.size * args.size * 3))
+
+    print("{:<28} {:>12}".format("handoff", "ms/image"))
+    print("{:<28} {:>12.3f}".format("temporary PNG", 1000 * measure(lambda: png_handoff(image), args.handoffs)))
+    print("{:<28} {:>12.3f}".format("pil_to_surface", 1000 * measure(lambda: pil_to_surface(image), args.handoffs)))
+
+    display.set_top_image(pil_to_surface(image))
+    print("{:<28} {:>12}".format("draw", "ms/frame"))
+    print("{:<28} {:>12.3f}".format("rescale every frame", 1000 * measure(
+        lambda: draw_rescaling_every_frame(display), args.frames)))
+    print("{:<28} {:>12.3f}".format("full redraw, cached image", 1000 * measure(
+        lambda: redraw(display), args.frames)))
+    print("{:<28} {:>12.3f}".format("toolbar only", 1000 * measure(
+        lambda: redraw(display, DisplayManager.TOOLBAR), args.frames)))
+    print("{:<28} {:>12.3f}".format("nothing changed", 1000 * measure(display.draw, args.frames)))
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
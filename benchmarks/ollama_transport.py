@@ -0,0 +1,58 @@
+"""
+Measure per-request overhead of the Ollama transport against the local fake NDJSON server.
+
+Compares a fresh requests.post per question (the old behaviour) with OllamaClient's pooled
+keep-alive session, and reports mean latency per request and the number of TCP connections used:
+
+    python benchmarks/ollama_transport.py --requests 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "kids_story_teller"))
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from fake_ollama_server import FakeOllamaServer
+from ollama_client import OllamaClient
+from conversation_context import ConversationContext
+
+def bare_post(url: str):
+    payload = {"model": "test-model", "stream": True, "context": [], "prompt": "a dragon"}
+    response = requests.post(url, json=payload, stream=True)
+    for _ in response.iter_lines():
+        pass
+    response.close()
+
+def run(name: str, count: int, request_fn):
+    server = FakeOllamaServer().start()
+    try:
+        fn = request_fn(server.url)
+        fn()  # Warm-up request.
+        start = time.perf_counter()
+        for _ in range(count):
+            fn()
+        elapsed = time.perf_counter() - start
+        print("{:<16} {:>10.3f} ms/request {:>6} connections".format(
+            name, elapsed / count * 1000, server.connection_count))
+    finally:
+        server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    run("requests.post", args.requests, lambda url: lambda: bare_post(url))
+
+    def pooled(url):
+        client = OllamaClient(url, "test-model", "")
+        return lambda: client.ask("a dragon", ConversationContext(), lambda text: None)
+    run("pooled session", args.requests, pooled)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare seconds per image and per step of StableDiffusionImageGenerator sampler configurations,
+with the time spent in each stage (text encoding, UNet loop, VAE decoding).
+
+Each configuration is scheduler:steps:size. The default model is a tiny randomly initialized
+pipeline, so the run finishes quickly on CPU and shows the relative cost of the settings; pass the
+production model to measure real timings:
+
+    python benchmarks/sd_samplers.py
+    python benchmarks/sd_samplers.py --model CompVis/stable-diffusion-v1-4 --configs dpm++:12:256 euler-a:12:256
+
+Run once with --profile default and once with --profile cpu-optimized (optionally --compile)
+to see what the CPU optimizations buy. With --preview-every N, the time spent making previews is
+shown too; it should stay a small fraction of the UNet time.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "kids_story_teller"))
+
+from stable_diffusion_generator import StableDiffusionImageGenerator
+
+DEFAULT_CONFIGS = ["default:20:256", "dpm++:12:256", "dpm++:8:256", "euler-a:12:256", "ddim:12:256", "lcm:4:256"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="hf-internal-testing/tiny-stable-diffusion-pipe")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS)
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--prompt", default="a dragon and a princess in a castle")
+    parser.add_argument("--profile", default="default", choices=["default", "cpu-optimized"])
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--no-bf16", action="store_true", help="Disable bfloat16 autocast in the cpu-optimized profile")
+    parser.add_argument("--compile", action="store_true", help="torch.compile the UNet (cpu-optimized profile)")
+    parser.add_argument("--preview-every", type=int, default=0, help="Make a preview every N steps")
+    args = parser.parse_args()
+
+    generator = StableDiffusionImageGenerator(
+        modelName=args.model, device=args.device, seed=0, profile=args.profile, threads=args.threads,
+        bf16=False if args.no_bf16 else "auto", compile_unet=args.compile, preview_every=args.preview_every,
+        embedding_cache_entries=0  # Measure the text encoder on every run.
+    )
+    preview_fn = (lambda surface: None) if args.preview_every else None
+    print("{:<16} {:>6} {:>6} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "scheduler", "steps", "size", "s/image", "s/step", "text", "unet", "vae", "preview"))
+    for config in args.configs:
+        scheduler, steps, size = config.split(":")
+        try:
+            generator._set_scheduler(scheduler)
+        except ValueError as e:
+            print(f"{scheduler:<16} skipped: {e}")
+            continue
+        generator.steps = int(steps)
+        generator.height = generator.width = int(size)
+
+        generator.generate(args.prompt, preview_fn)  # Warm-up.
+        stages = {"text_encode": 0.0, "unet_loop": 0.0, "vae_decode": 0.0, "preview": 0.0}
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            generator.generate(args.prompt, preview_fn)
+            for stage in stages:
+                stages[stage] += generator.last_timings[stage] / args.repeat
+        per_image = (time.perf_counter() - start) / args.repeat
+        print("{:<16} {:>6} {:>6} {:>10.3f} {:>10.4f} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.4f}".format(
+            scheduler, steps, size, per_image, per_image / int(steps),
+            stages["text_encode"], stages["unet_loop"], stages["vae_decode"], stages["preview"]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compare word error rate (WER) and real-time factor (RTF) of the SpeechRecognizer inference modes.
+
+The fixtures directory holds pairs of files: <name>.wav (16 kHz, mono, 16-bit PCM) and
+<name>.txt containing the reference transcript. Use a tiny model to keep the run short:
+
+    python benchmarks/whisper_modes.py --fixtures path/to/fixtures --model tiny.en
+
+RTF is decode time divided by audio duration; lower is better and below 1.0 is faster than real time.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "kids_story_teller"))
+
+from speech_recognizer import SpeechRecognizer
+
+MODES = {
+    "whisper-fp32": {"backend": "whisper", "quantize": "none"},
+    "whisper-int8": {"backend": "whisper", "quantize": "int8"},
+    "faster-whisper-int8": {"backend": "faster-whisper", "quantize": "int8"},
+}
+
+def load_wav(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != 16000 or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+        data = wav.readframes(wav.getnframes())
+    return np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+
+def normalize_words(text: str) -> list:
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+def word_errors(reference: list, hypothesis: list) -> int:
+    """
+    Word-level Levenshtein distance (substitutions + insertions + deletions).
+    """
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1]
+
+def load_fixtures(directory: str) -> list:
+    fixtures = []
+    for wav_path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        txt_path = os.path.splitext(wav_path)[0] + ".txt"
+        if not os.path.exists(txt_path):
+            print(f"Skipping {wav_path}: no reference transcript")
+            continue
+        with open(txt_path, "r", encoding="utf-8") as f:
+            fixtures.append((os.path.basename(wav_path), load_wav(wav_path), f.read()))
+    return fixtures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", required=True, help="Directory with <name>.wav / <name>.txt pairs")
+    parser.add_argument("--model", default="tiny.en", help="Whisper model name or checkpoint path")
+    parser.add_argument("--lang", default="en")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated subset of: " + ", ".join(MODES))
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"No fixtures found in {args.fixtures}")
+    audio_seconds = sum(waveform.shape[0] for _, waveform, _ in fixtures) / 16000.0
+
+    print("{:<22} {:>8} {:>8} {:>10}".format("mode", "WER", "RTF", "load (s)"))
+    for mode in args.modes.split(","):
+        start = time.perf_counter()
+        try:
+            recognizer = SpeechRecognizer(args.model, args.lang, threads=args.threads, **MODES[mode])
+        except ImportError as e:
+            print(f"{mode:<22} skipped: {e}")
+            continue
+        load_seconds = time.perf_counter() - start
+
+        # Warm-up pass so that one-time initialization is not counted.
+        recognizer.speech_to_text(np.zeros(16000, dtype=np.float32))
+
+        errors = 0
+        reference_words = 0
+        decode_seconds = 0.0
+        for _, waveform, reference in fixtures:
+            start = time.perf_counter()
+            hypothesis = recognizer.speech_to_text(waveform)
+            decode_seconds += time.perf_counter() - start
+            reference = normalize_words(reference)
+            errors += word_errors(reference, normalize_words(hypothesis))
+            reference_words += len(reference)
+
+        wer = errors / max(1, reference_words)
+        print("{:<22} {:>8.3f} {:>8.3f} {:>10.2f}".format(mode, wer, decode_seconds / audio_seconds, load_seconds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Asyncio-native Ollama client.
+
+Dependencies:
+- aiohttp: Install with:
+    pip install aiohttp
+
+This module provides the same streaming-callback contract as OllamaClient.ask for code
+running inside an asyncio event loop.
+"""
+
+try:
+    import aiohttp
+except ImportError as e:
+    raise ImportError("aiohttp dependency is required. Please install it via 'pip install aiohttp'") from e
+
+import asyncio
+import json
+
+from ollama_client import (
+    StreamState, process_stream_chunk, poll_stream, flush_poll_interval, build_generate_payload, extract_answer
+)
+from sentence_segmenter import SentenceSegmenter
+
+class AsyncOllamaClient:
+    """
+    Asyncio client for the Ollama API with a pooled keep-alive connector.
+
+    ask() is a coroutine with the same (prompt, conversation_context, callback) contract as
+    OllamaClient.ask. Starting a new request cancels the previous one. Cancelling the task
+    stops the stream at the next await, and the half-read connection is closed, not leaked.
+    """
+    def __init__(self, url: str, model: str, context: str, keep_alive="30m",
+                 connect_timeout=5.0, read_timeout=60.0, pool_size=4,
+                 min_chunk_chars=20, max_chunk_chars=200, flush_interval=1.5,
+                 summary_prompt="Summarize the story so far in a few sentences."):
+        self.url = url
+        self.model = model
+        self.keep_alive = keep_alive
+        self.headers = {'Content-Type': 'application/json'}
+        self.initial_context = context
+        self.summary_prompt = summary_prompt
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.pool_size = pool_size
+        self.segmenter_options = {
+            "min_chars": min_chunk_chars,
+            "max_chars": max_chunk_chars,
+            "flush_interval": flush_interval,
+        }
+        # Created lazily because aiohttp sessions must be created inside a running event loop.
+        self.session = None
+        self.current_task = None
+
+    def _get_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.session = aiohttp.ClientSession(
+                connector=connector, headers=self.headers, timeout=self.timeout
+            )
+        return self.session
+
+    def build_payload(self, prompt: str, conversation_context) -> dict:
+        return build_generate_payload(
+            self.model, self.initial_context, self.keep_alive, prompt, conversation_context
+        )
+
+    async def summarize(self, conversation_context):
+        """
+        Ask the model to summarize the conversation so far and reset the token context.
+        """
+        payload = {
+            "model": self.model,
+            "stream": False,
+            "context": conversation_context.to_list(),
+            "prompt": self.summary_prompt,
+            "keep_alive": self.keep_alive,
+        }
+        try:
+            async with self._get_session().post(self.url, data=json.dumps(payload)) as response:
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+            summary = extract_answer(body.get('response', ''))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            print(f"Failed to summarize the conversation: {e}")
+            summary = ""
+        conversation_context.reset_with_summary(summary)
+
+    def cancel(self):
+        """
+        Cancel the in-flight request, if any.
+        """
+        task = self.current_task
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+        self.current_task = None
+
+    async def ask(self, prompt: str, conversation_context, callback):
+        """
+        Send a query to the Ollama API and stream the response via the callback.
+        Returns True if the response was received completely.
+        """
+        self.cancel()
+        self.current_task = asyncio.current_task()
+
+        payload = self.build_payload(prompt, conversation_context)
+        data = json.dumps(payload)
+        state = StreamState(SentenceSegmenter(**self.segmenter_options))
+        state.payload_bytes = len(data)
+        state.context_tokens = len(payload["context"])
+        interval = flush_poll_interval(state.segmenter)
+        timer = asyncio.ensure_future(self._flush_timer(state, callback, interval)) if interval else None
+        try:
+            async with self._get_session().post(self.url, data=data) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    line = line.strip()
+                    if not line or state.done:
+                        continue
+                    try:
+                        body = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    process_stream_chunk(body, state, conversation_context, callback)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            callback(f"Request error: {e}")
+            return False
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if self.current_task is asyncio.current_task():
+                self.current_task = None
+
+        if state.done and conversation_context.needs_summary:
+            await self.summarize(conversation_context)
+        return state.done
+
+    async def _flush_timer(self, state: StreamState, callback, interval: float):
+        """
+        Poll the segmenter every interval seconds while waiting for tokens; cancelled when the stream ends.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            poll_stream(state, callback)
+
+    async def close(self):
+        """
+        Cancel any in-flight request and close the pooled connections.
+        """
+        self.cancel()
+        if self.session is not None:
+            await self.session.close()
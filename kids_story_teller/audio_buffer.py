@@ -0,0 +1,152 @@
+import numpy as np
+
+# Scale factor used to convert int16 PCM samples to normalized float32.
+INT16_SCALE = 1.0 / 32768.0
+
+class CaptureBuffer:
+    """
+    Growable, preallocated float32 buffer that audio chunks are written into in place.
+
+    Each int16 chunk is converted straight into its slot of the buffer, so a recording
+    costs a single conversion pass and no per-chunk temporary arrays. At the end of a
+    recording, take() hands out a view of the captured samples without copying them.
+    """
+    def __init__(self, sample_rate: int, initial_seconds: float = 30.0):
+        """
+        :param sample_rate: Sample rate of the captured audio, in Hz.
+        :param initial_seconds: Capacity to preallocate, in seconds. The buffer doubles
+                                its capacity when a recording outgrows it.
+        """
+        self.sample_rate = sample_rate
+        self.initial_capacity = max(1, int(sample_rate * initial_seconds))
+        self._data = np.empty(self.initial_capacity, dtype=np.float32)
+        self._length = 0
+        # Set once a view has been handed out; the next reset() must not overwrite it.
+        self._handed_out = False
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    def reset(self):
+        """
+        Prepare the buffer for a new recording.
+        If the previous recording was handed out via take(), a fresh array is allocated
+        so the consumer's view stays valid while it is still being transcribed.
+        """
+        if self._handed_out:
+            self._data = np.empty(self.initial_capacity, dtype=np.float32)
+            self._handed_out = False
+        self._length = 0
+
+    def _reserve(self, extra: int):
+        needed = self._length + extra
+        if needed <= self._data.shape[0]:
+            return
+        new_capacity = self._data.shape[0]
+        while new_capacity < needed:
+            new_capacity *= 2
+        grown = np.empty(new_capacity, dtype=np.float32)
+        grown[:self._length] = self._data[:self._length]
+        self._data = grown
+
+    def write(self, data: bytes) -> float:
+        """
+        Append a chunk of int16 PCM data and return its normalized RMS energy.
+
+        :param data: Raw int16 PCM bytes as delivered by PyAudio.
+        :return: The RMS energy of the chunk, in the range [0.0, 1.0].
+        """
+        samples = np.frombuffer(data, dtype=np.int16)
+        return self.write_samples(samples)
+
+    def write_samples(self, samples: np.ndarray) -> float:
+        """
+        Append int16 or float32 samples and return the normalized RMS energy of the chunk.
+        """
+        count = samples.shape[0]
+        if count == 0:
+            return 0.0
+        self._reserve(count)
+        dest = self._data[self._length:self._length + count]
+        if samples.dtype == np.int16:
+            # Convert and scale directly into the destination slice.
+            np.multiply(samples, INT16_SCALE, out=dest, casting="unsafe")
+        else:
+            dest[:] = samples
+        self._length += count
+        # The dot product of the slice with itself avoids allocating a squared copy.
+        return float(np.sqrt(np.dot(dest, dest) / count))
+
+    def view(self) -> np.ndarray:
+        """
+        Return a view of the samples captured so far, without copying.
+        The view stays valid after further writes, even if the buffer grows.
+        """
+        return self._data[:self._length]
+
+    def take(self) -> np.ndarray:
+        """
+        Return a zero-copy view of the captured samples and release them to the caller.
+        """
+        view = self.view()
+        self._handed_out = True
+        return view
+
+class PreRollBuffer:
+    """
+    Fixed-size rolling buffer that keeps the most recent audio while nobody is recording.
+
+    When a recording starts, its contents are moved into the CaptureBuffer so that the
+    first syllables spoken before the trigger key was noticed are not lost.
+    """
+    def __init__(self, sample_rate: int, duration_ms: int):
+        """
+        :param sample_rate: Sample rate of the captured audio, in Hz.
+        :param duration_ms: Amount of audio to retain, in milliseconds.
+        """
+        self.capacity = max(0, int(sample_rate * duration_ms / 1000))
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+        self._pos = 0      # Index the next sample is written to.
+        self._filled = 0   # Number of valid samples in the buffer.
+
+    def __len__(self):
+        return self._filled
+
+    def clear(self):
+        self._pos = 0
+        self._filled = 0
+
+    def write_samples(self, samples: np.ndarray):
+        """
+        Write int16 samples into the ring, overwriting the oldest ones.
+        """
+        if self.capacity == 0:
+            return
+        count = samples.shape[0]
+        if count >= self.capacity:
+            samples = samples[count - self.capacity:]
+            count = self.capacity
+        end = self._pos + count
+        if end <= self.capacity:
+            np.multiply(samples, INT16_SCALE, out=self._data[self._pos:end], casting="unsafe")
+        else:
+            first = self.capacity - self._pos
+            np.multiply(samples[:first], INT16_SCALE, out=self._data[self._pos:], casting="unsafe")
+            np.multiply(samples[first:], INT16_SCALE, out=self._data[:count - first], casting="unsafe")
+        self._pos = end % self.capacity
+        self._filled = min(self.capacity, self._filled + count)
+
+    def drain_into(self, capture: CaptureBuffer):
+        """
+        Append the retained audio, oldest sample first, to the capture buffer and clear the ring.
+        """
+        if self._filled < self.capacity:
+            capture.write_samples(self._data[:self._filled])
+        else:
+            capture.write_samples(self._data[self._pos:])
+            capture.write_samples(self._data[:self._pos])
+        self.clear()
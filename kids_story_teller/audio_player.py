@@ -0,0 +1,146 @@
+import io
+import threading
+import time
+
+import numpy as np
+import pygame
+
+def pcm_to_mixer_samples(data: bytes, sample_rate: int, channels: int, mixer_rate: int,
+                         mixer_channels: int) -> np.ndarray:
+    """
+    Convert 16-bit PCM to the mixer's sample rate and channel count (linear interpolation).
+    Returns an int16 array of shape (frames,) for a mono mixer, or (frames, mixer_channels).
+    """
+    samples = np.frombuffer(data, dtype=np.int16).reshape(-1, channels)
+    # Down-mix to mono first; speech is mono anyway.
+    mono = samples.mean(axis=1) if channels > 1 else samples[:, 0].astype(np.float32)
+    if sample_rate != mixer_rate and mono.shape[0] > 0:
+        frames = int(round(mono.shape[0] * mixer_rate / sample_rate))
+        positions = np.arange(frames) * (sample_rate / mixer_rate)
+        mono = np.interp(positions, np.arange(mono.shape[0]), mono)
+    mono = mono.astype(np.int16)
+    if mixer_channels == 1:
+        return mono
+    return np.repeat(mono[:, None], mixer_channels, axis=1)
+
+class MixerPlayer:
+    """
+    Plays synthesized speech from memory on one pygame mixer channel kept open for the app's lifetime.
+
+    MP3 is decoded by the mixer from an in-memory file object; PCM is converted to the mixer's
+    format with numpy. Nothing is written to disk and no player process is started.
+    play() queues the sound behind the one that is playing, so consecutive sentences are gapless,
+    and returns shortly before it ends so that the next sentence can be queued in time.
+    stop() interrupts playback, and duck()/restore() lower and restore the volume.
+
+    A sound is only started if the caller's cancelled check, evaluated under the same lock as
+    stop(), still returns False; a stop() racing with play() therefore either prevents the sound
+    from starting or stops it.
+    """
+    def __init__(self, frequency=24000, channels=1, buffer=1024, lead_time=0.15, duck_volume=0.3):
+        """
+        :param frequency: Mixer sample rate, used if the mixer is not initialized yet.
+        :param channels: Mixer channel count, used if the mixer is not initialized yet.
+        :param buffer: Mixer buffer size in samples, used if the mixer is not initialized yet.
+        :param lead_time: Seconds before the end of a sound at which play() returns.
+        :param duck_volume: Volume used while ducked (0.0 to 1.0).
+        """
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(frequency=frequency, size=-16, channels=channels, buffer=buffer)
+        self.mixer_rate, size, self.mixer_channels = pygame.mixer.get_init()
+        if size != -16:
+            raise RuntimeError(f"Unsupported mixer sample size: {size}")
+        self.channel = pygame.mixer.Channel(0)
+        # Keep channel 0 for speech; pygame's automatic channel selection does not use reserved channels.
+        pygame.mixer.set_reserved(1)
+        self.lead_time = lead_time
+        self.duck_volume = duck_volume
+        self.volume = 1.0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # Incremented by stop(); waits end when it changes.
+        self._stops = 0
+        self.last_start_latency = None
+
+    def decode(self, audio) -> pygame.mixer.Sound:
+        """
+        Turn a TTSAudio into a mixer Sound, in memory.
+        """
+        if audio.format == "mp3":
+            return pygame.mixer.Sound(file=io.BytesIO(audio.data))
+        samples = pcm_to_mixer_samples(
+            audio.data, audio.sample_rate, audio.channels, self.mixer_rate, self.mixer_channels
+        )
+        return pygame.mixer.Sound(buffer=samples.tobytes())
+
+    def play(self, audio, cancelled=None):
+        """
+        Play audio after the sound currently playing; blocks until it is about to end or stop() is called.
+
+        :param audio: The TTSAudio to play.
+        :param cancelled: Optional callable returning True if the sound must no longer be started
+                          (e.g. because the speech queue was flushed); checked under the player lock.
+        """
+        requested = time.monotonic()
+        sound = self.decode(audio)
+        with self._lock:
+            if cancelled is not None and cancelled():
+                return
+            stops = self._stops
+            if self.channel.get_busy():
+                self.channel.queue(sound)
+            else:
+                self.channel.play(sound)
+        # A queued sound starts when the previous one ends.
+        while self.channel.get_queue() is not None:
+            if self._wait_for_stop(stops, 0.005):
+                return
+        started = time.monotonic()
+        self.last_start_latency = started - requested
+        print("[Audio] Sentence started {:.3f} seconds after play".format(self.last_start_latency))
+
+        end = started + sound.get_length()
+        self._wait_for_stop(stops, max(0.0, end - self.lead_time - time.monotonic()))
+
+    def wait(self, timeout=None) -> bool:
+        """
+        Block until the channel is silent or stop() is called. Returns False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            stops = self._stops
+        while self.channel.get_busy():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            if self._wait_for_stop(stops, 0.01):
+                break
+        return True
+
+    def _wait_for_stop(self, stops: int, timeout: float) -> bool:
+        """
+        Wait up to timeout seconds; returns True if stop() was called since stops was read.
+        """
+        with self._changed:
+            return self._changed.wait_for(lambda: self._stops != stops, timeout)
+
+    def stop(self):
+        """
+        Interrupt the current and queued sound.
+        """
+        with self._changed:
+            self._stops += 1
+            self.channel.stop()
+            self._changed.notify_all()
+
+    def set_volume(self, volume: float):
+        self.volume = volume
+        self.channel.set_volume(volume)
+
+    def duck(self):
+        """
+        Lower the volume (e.g. while the child is speaking).
+        """
+        self.channel.set_volume(self.volume * self.duck_volume)
+
+    def restore(self):
+        self.channel.set_volume(self.volume)
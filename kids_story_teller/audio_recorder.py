@@ -1,6 +1,9 @@
+import threading
 import numpy as np
 import pyaudio
 
+from audio_buffer import CaptureBuffer, PreRollBuffer
+
 # Configuration parameters (adjust as needed)
 INPUT_CHANNELS = 1
 INPUT_RATE = 16000
@@ -9,27 +12,71 @@ INPUT_CHUNK = 1024
 class AudioRecorder:
     """
     Implements audio recording functionality using PyAudio.
+
+    Two capture modes are supported:
+      - Per-recording (default): a blocking stream is opened for each push-to-talk and closed afterwards.
+      - Persistent: a single callback-driven stream stays open for the lifetime of the recorder and
+        keeps a short pre-roll of audio, which is prepended to every recording.
     """
-    def __init__(self):
+    def __init__(self, persistent_stream=False, pre_roll_ms=300):
+        """
+        :param persistent_stream: Keep one non-blocking input stream open instead of opening one per recording.
+        :param pre_roll_ms: Milliseconds of audio captured before the trigger key to include in each
+                            recording. Only used with a persistent stream.
+        """
         self.audio = pyaudio.PyAudio()
         self.format = pyaudio.paInt16
         self.stream = None
+        self.persistent_stream = persistent_stream
+        # Preallocated buffer that captured chunks are written into in place.
+        self.capture_buffer = CaptureBuffer(INPUT_RATE)
+
+        # State shared with the stream callback in persistent mode.
+        self.pre_roll = PreRollBuffer(INPUT_RATE, pre_roll_ms if persistent_stream else 0)
+        self._lock = threading.Lock()
+        self._capturing = False
+        self._energy_callback = None
+        self._chunk_ready = threading.Event()
+
         # Test if the audio input device is available
         try:
-            self._open_stream()
-            self.stream.close()
+            if persistent_stream:
+                # The stream is kept open and starts filling the pre-roll right away.
+                self._open_stream(stream_callback=self._stream_callback)
+            else:
+                self._open_stream()
+                self.stream.close()
         except Exception as e:
             raise RuntimeError(f"Error initializing audio input: {e}")
 
-    def _open_stream(self):
+    def _open_stream(self, stream_callback=None):
         self.stream = self.audio.open(
             format=self.format,
             channels=INPUT_CHANNELS,
             rate=INPUT_RATE,
             input=True,
-            frames_per_buffer=INPUT_CHUNK
+            frames_per_buffer=INPUT_CHUNK,
+            stream_callback=stream_callback
         )
 
+    def _stream_callback(self, in_data, frame_count, time_info, status):
+        """
+        PyAudio callback for the persistent stream. Routes each chunk either to the
+        pre-roll ring or, while a recording is active, to the capture buffer.
+        """
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        rms = None
+        with self._lock:
+            if self._capturing:
+                rms = self.capture_buffer.write_samples(samples)
+                energy_callback = self._energy_callback
+            else:
+                self.pre_roll.write_samples(samples)
+        if rms is not None and energy_callback is not None:
+            energy_callback(rms)
+        self._chunk_ready.set()
+        return (None, pyaudio.paContinue)
+
     def record_audio(self, should_continue_fn, display_energy_callback=None) -> np.ndarray:
         """
         Record audio data. Continue recording as long as should_continue_fn() returns True.
@@ -42,8 +89,11 @@ class AudioRecorder:
         Returns:
             np.ndarray: Recorded audio data (normalized float32 array).
         """
+        if self.persistent_stream:
+            return self._record_from_persistent_stream(should_continue_fn, display_energy_callback)
+
         self._open_stream()
-        frames = []
+        self.reset_capture()
         while should_continue_fn():
             try:
                 data = self.stream.read(INPUT_CHUNK, exception_on_overflow=False)
@@ -51,22 +101,67 @@ class AudioRecorder:
                 print(f"Error reading audio data: {e}")
                 break
 
-            # Calculate normalized RMS energy for the current audio chunk
-            raw = np.frombuffer(data, dtype=np.int16).astype(np.float32)
-            normalized = raw / 32768.0
-            rms = np.sqrt(np.mean(normalized ** 2))
+            # Convert the chunk into the capture buffer and get its normalized RMS energy.
+            # The lock keeps current_audio() from reading a half-written buffer.
+            with self._lock:
+                rms = self.capture_buffer.write(data)
             # Call the display energy callback if provided
             if display_energy_callback is not None:
                 display_energy_callback(rms)
 
-            frames.append(data)
         self.stream.stop_stream()
         self.stream.close()
-        waveform = np.frombuffer(b''.join(frames), dtype=np.int16).astype(np.float32) * (1/32768.0)
-        return waveform
+        # Hand the captured samples to the caller as a zero-copy view.
+        with self._lock:
+            return self.capture_buffer.take()
+
+    def _record_from_persistent_stream(self, should_continue_fn, display_energy_callback=None) -> np.ndarray:
+        """
+        Start capturing from the already-open stream, beginning with the buffered pre-roll,
+        and wait for should_continue_fn() to turn False. The stream callback does the reading.
+        """
+        with self._lock:
+            self.capture_buffer.reset()
+            self.pre_roll.drain_into(self.capture_buffer)
+            self._energy_callback = display_energy_callback
+            self._capturing = True
+
+        chunk_seconds = INPUT_CHUNK / INPUT_RATE
+        while should_continue_fn():
+            # Wake up once per delivered chunk (or chunk period) to re-check the condition.
+            self._chunk_ready.wait(timeout=chunk_seconds)
+            self._chunk_ready.clear()
+
+        with self._lock:
+            self._capturing = False
+            self._energy_callback = None
+            # Hand the captured samples to the caller as a zero-copy view.
+            return self.capture_buffer.take()
+
+    def reset_capture(self):
+        """
+        Empty the capture buffer, e.g. before a reader of current_audio() is started, so that it
+        never sees the previous recording.
+        """
+        with self._lock:
+            self.capture_buffer.reset()
+
+    def current_audio(self) -> np.ndarray:
+        """
+        Return a view of the audio captured so far by the recording in progress.
+        Safe to call from another thread while record_audio() is running.
+        """
+        with self._lock:
+            return self.capture_buffer.view()
 
     def terminate(self):
         """
         Clean up audio resources.
         """
-        self.audio.terminate() 
\ No newline at end of file
+        if self.persistent_stream and self.stream is not None:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception as e:
+                print(f"Error closing audio stream: {e}")
+        self.audio.terminate()
@@ -2,51 +2,68 @@ import pygame
 import textwrap
 import pygame_gui
 
+from cache_store import MemoryLRU
+
 # Global debug flag for draw methods.
 DEBUG_DRAW = True
 
+TOOLBAR_COLOR = (209, 220, 226)
+TEXT_COLOR = (0, 0, 0)
+# Button colors per state.
+BUTTON_COLORS = {
+    "normal": (255, 201, 136),
+    "hover": (255, 178, 132),
+    "pressed": (231, 151, 150),
+}
+
 # Custom circular button class based on pygame_gui's UIButton.
 class UICircularButton(pygame_gui.elements.UIButton):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Clear the theme-generated image to ensure our custom rendering.
-        self.image = None
+        # Draw the circle once per state; update() only switches between these surfaces.
+        button_rect = self.relative_rect
+        self.state_images = {}
+        for state, color in BUTTON_COLORS.items():
+            circular_surface = pygame.Surface(
+                (button_rect.width, button_rect.height), pygame.SRCALPHA
+            )
+            pygame.draw.circle(
+                circular_surface,
+                color,
+                (button_rect.width // 2, button_rect.height // 2),
+                button_rect.width // 2,
+            )
+            self.state_images[state] = circular_surface
+        # Replace the theme-generated image to ensure our custom rendering.
+        self.image = self.state_images["normal"]
 
     def update(self, time_delta):
         # Call the superclass update to process logic.
         super().update(time_delta)
         
-        # Recreate the button's image based on its current state.
-        button_rect = self.relative_rect
-        circular_surface = pygame.Surface(
-            (button_rect.width, button_rect.height), pygame.SRCALPHA
-        )
-        
         # Determine the button state based on mouse hover and left-button press.
         if self.hovered and pygame.mouse.get_pressed()[0]:
-            color = (231, 151, 150)  # Color for pressed state.
+            state = "pressed"
         elif self.hovered:
-            color = (255, 178, 132)  # Color for hover state.
+            state = "hover"
         else:
-            color = (255, 201, 136)  # Color for normal state.
-
-        # Draw circular background.
-        pygame.draw.circle(
-            circular_surface,
-            color,
-            (button_rect.width // 2, button_rect.height // 2),
-            button_rect.width // 2,
-        )
+            state = "normal"
         
         # Update the button's image for UIManager's draw_ui call.
-        self.image = circular_surface
+        self.image = self.state_images[state]
 
 class BottomToolBar:
     """
     Bottom toolbar component that occupies a fixed height at the bottom of the screen.
     This implementation uses pygame_gui to provide two circular UI buttons on the left and right.
     The center area displays a message that is rendered manually.
+
+    The toolbar surface is allocated once, and the wrapped and rendered lines of a message are
+    cached per message and line width, so drawing an unchanged toolbar creates no surfaces.
     """
+    # Maximum number of characters per message line.
+    max_chars = 20
+
     def __init__(self, screen_width, screen_height, toolbar_height=100):
         pad = 10
         button_size = 80
@@ -83,6 +100,9 @@ class BottomToolBar:
         self.message_rect = pygame.Rect(message_x, pad, message_width, toolbar_height - 2 * pad)
         self.message = ""
         self.font = pygame.font.Font(None, 24)
+        self.surface = pygame.Surface((self.width, self.height))
+        # (message, max_chars) -> rendered lines and their positions on the toolbar.
+        self._text_cache = MemoryLRU(8)
 
     def set_message(self, message: str):
         self.message = message
@@ -91,32 +111,40 @@ class BottomToolBar:
         # Delegate event processing to the pygame_gui manager.
         self.ui_manager.process_events(event)
 
+    def _message_layout(self, message: str):
+        """
+        Wrap and render the message; returns a list of (text surface, position) pairs.
+        """
+        key = (message, self.max_chars)
+        layout = self._text_cache.get(key)
+        if layout is not None:
+            return layout
+        lines = []
+        for line in message.splitlines():
+            lines.extend(textwrap.wrap(line, width=self.max_chars))
+        text_surfaces = [self.font.render(line, True, TEXT_COLOR) for line in lines]
+        total_height = sum(tsurf.get_height() for tsurf in text_surfaces)
+        start_y = self.message_rect.top + (self.message_rect.height - total_height) / 2
+        layout = []
+        for tsurf in text_surfaces:
+            layout.append((tsurf, tsurf.get_rect(centerx=self.message_rect.centerx, y=start_y)))
+            start_y += tsurf.get_height()
+        self._text_cache.put(key, layout)
+        return layout
+
     def draw(self, surface, energy: float):
-        # Create a dedicated toolbar surface with background color (209, 220, 226).
-        toolbar_surface = pygame.Surface((self.width, self.height))
-        toolbar_surface.fill((209, 220, 226))
+        # Reuse the toolbar surface, cleared to the background color.
+        toolbar_surface = self.surface
+        toolbar_surface.fill(TOOLBAR_COLOR)
     
         # Update and render UI buttons.
         time_delta = 1.0 / 60.0
         self.ui_manager.update(time_delta)
         self.ui_manager.draw_ui(toolbar_surface)
     
-        # Render and display the center message text.
+        # Display the center message text.
         if self.message:
-            max_chars = 20
-            lines = []
-            for line in self.message.splitlines():
-                lines.extend(textwrap.wrap(line, width=max_chars))
-            total_height = 0
-            text_surfaces = []
-            for line in lines:
-                tsurf = self.font.render(line, True, (0, 0, 0))
-                text_surfaces.append(tsurf)
-                total_height += tsurf.get_height()
-            start_y = self.message_rect.top + (self.message_rect.height - total_height) / 2
-            for tsurf in text_surfaces:
-                text_rect = tsurf.get_rect(centerx=self.message_rect.centerx, y=start_y)
+            for tsurf, text_rect in self._message_layout(self.message):
                 toolbar_surface.blit(tsurf, text_rect)
-                start_y += tsurf.get_height()
     
         surface.blit(toolbar_surface, self.rect.topleft) 
\ No newline at end of file
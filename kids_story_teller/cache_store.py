@@ -0,0 +1,171 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+def cache_key(*parts) -> str:
+    """
+    Build a stable hex key from strings or bytes.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+class MemoryLRU:
+    """
+    In-memory least-recently-used cache with a fixed number of entries.
+    """
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+class DiskStore:
+    """
+    Directory of cache files (one per key) with a total size limit.
+    When the limit is exceeded, the least recently used files (oldest modification time) are removed.
+    """
+    def __init__(self, directory: str, max_bytes: int, suffix=".bin"):
+        """
+        :param directory: Directory holding the cache files; created if missing.
+        :param max_bytes: Maximum total size of the cache files.
+        :param suffix: File name suffix of the cache files.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key: str):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Mark the file as recently used.
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self.path(key)
+        tmp_path = path + ".tmp"
+        with self._lock:
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                # Readers never see a partially written file.
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Failed to write cache file {path}: {e}")
+                return
+            self._evict()
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        files = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+class TieredCache:
+    """
+    Two-tier byte cache: an in-memory LRU in front of a size-limited DiskStore.
+    Values found on disk are promoted to memory. Hits and misses are counted per tier.
+    """
+    def __init__(self, directory=None, memory_entries=64, disk_max_bytes=50 * 1024 * 1024, suffix=".bin"):
+        """
+        :param directory: Directory of the disk tier, or None to keep the cache in memory only.
+        :param memory_entries: Number of entries kept in memory.
+        :param disk_max_bytes: Maximum total size of the disk tier.
+        :param suffix: File name suffix of the disk tier files.
+        """
+        self.memory = MemoryLRU(memory_entries)
+        self.disk = DiskStore(directory, disk_max_bytes, suffix) if directory else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        data = self.memory.get(key)
+        if data is not None:
+            self.memory_hits += 1
+            return data
+        if self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                self.disk_hits += 1
+                self.memory.put(key, data)
+                return data
+        self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes):
+        self.memory.put(key, data)
+        if self.disk is not None:
+            self.disk.put(key, data)
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
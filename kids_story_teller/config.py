@@ -1,3 +1,4 @@
+import re
 import yaml
 from yaml import Loader
 
@@ -11,24 +12,112 @@ class Config:
         self.messages.pressSpace = "Press the space key to begin speaking and then release it."
         self.messages.loadingModel = "Loading model..."
         self.messages.noAudioInput = "Error: No audio input."
+        self.messages.modelUnavailable = "Sorry, I can't listen right now."
+
+        self.audio = type("AudioConfig", (), {})()
+        self.audio.persistentStream = False
+        self.audio.preRollMs = 300
+
+        self.vad = type("VadConfig", (), {})()
+        self.vad.enabled = True
+        self.vad.threshold = 0.02
+        self.vad.frameMs = 30
+        self.vad.paddingMs = 200
+        self.vad.maxPauseMs = 600
+        self.vad.handsFree = False
+        self.vad.autoStopMs = 1000
+        self.vad.noSpeechTimeoutMs = 5000
 
         self.whisper_recognition = type("WhisperRecognition", (), {})()
         self.whisper_recognition.modelPath = "whisper/large-v3.pt"
         self.whisper_recognition.lang = "en"
+        self.whisper_recognition.backend = "whisper"   # "whisper" or "faster-whisper"
+        self.whisper_recognition.quantize = "none"     # "none" or "int8"
+        self.whisper_recognition.threads = 0           # 0 keeps the torch default
+        self.whisper_recognition.interopThreads = 0
+        self.whisper_recognition.useProcess = False
+        self.whisper_recognition.streaming = False
+        self.whisper_recognition.streamIntervalSec = 1.0
+        self.whisper_recognition.streamMinWindowSec = 2.0
+        self.whisper_recognition.streamHoldbackSec = 1.0
 
         self.ollama = type("OllamaConfig", (), {})()
         self.ollama.url = "http://localhost:11434/api/generate"
         self.ollama.model = 'deepseek-r1:7b'
+        self.ollama.keepAlive = "30m"
+        self.ollama.connectTimeoutSec = 5.0
+        self.ollama.readTimeoutSec = 60.0
+        self.ollama.minChunkChars = 20
+        self.ollama.maxChunkChars = 200
+        self.ollama.flushIntervalSec = 1.5
+        # Several Ollama hosts (their /api/generate URLs); when set, url is not used.
+        self.ollama.endpoints = []
+        self.ollama.healthIntervalSec = 10.0
+        self.ollama.failureThreshold = 3
+        self.ollama.maxBackoffSec = 60.0
+        # Start generating from a stable partial transcript (needs whisperRecognition.streaming).
+        self.ollama.speculative = False
+        self.ollama.speculativeStableCount = 2
+
+        self.tts = type("TtsConfig", (), {})()
+        self.tts.backend = "gtts"          # "gtts" (online), "espeak" (local espeak-ng) or "fake"
+        self.tts.lang = "en"
+        self.tts.voice = "co.uk"           # gTTS: Google domain (accent); espeak: voice name
+        self.tts.player = "mixer"          # "mixer" (pygame, from memory) or "playsound"
+        self.tts.duckVolume = 0.3          # volume of speech while the child is recording
+        self.tts.pipelined = True          # synthesize the next sentence while the current one plays
+        self.tts.queueSize = 2
+        self.tts.synthesisWorkers = 1
+        self.tts.cacheEnabled = True
+        self.tts.cacheDirectory = "cache/tts"     # empty keeps the cache in memory only
+        self.tts.cacheMemoryEntries = 32
+        self.tts.cacheDiskMaxMb = 100
+
+        self.response_cache = type("ResponseCacheConfig", (), {})()
+        self.response_cache.enabled = False
+        self.response_cache.directory = "cache/llm"    # empty keeps the cache in memory only
+        self.response_cache.memoryEntries = 64
+        self.response_cache.diskMaxMb = 50
+        self.response_cache.match = "normalized"       # "exact" or "normalized"
+        self.response_cache.ttlSec = 0                 # 0 never expires
+        self.response_cache.variants = 1              # number of different stories kept per request
 
         self.stablediffusion = type("StableDiffusionConfig", (), {})()
         self.stablediffusion.modelName = "CompVis/stable-diffusion-v1-4"
         self.stablediffusion.device = "cpu"
+        self.stablediffusion.scheduler = "default"    # "default", "dpm++", "dpm++-karras", "euler-a", "euler", "ddim", "pndm", "lcm"
+        self.stablediffusion.steps = 20
+        self.stablediffusion.height = 256
+        self.stablediffusion.width = 256
+        self.stablediffusion.guidanceScale = 7.5
+        self.stablediffusion.seed = None              # None for a random image each time
+        self.stablediffusion.lcmLora = None           # LCM-LoRA weights, needed by "lcm" unless the model is LCM-distilled
+        self.stablediffusion.profile = "default"      # "default" or "cpu-optimized"
+        self.stablediffusion.threads = 0              # 0 keeps the torch default
+        self.stablediffusion.interopThreads = 0
+        self.stablediffusion.bf16 = "auto"            # true, false or "auto" (if the CPU supports it)
+        self.stablediffusion.compileUnet = False
+        self.stablediffusion.previewEverySteps = 0    # show a rough preview every N steps, 0 to disable
+        self.stablediffusion.useProcess = False       # generate images in a dedicated process
+        self.stablediffusion.embeddingCacheEntries = 32   # prompt embeddings kept in memory, 0 to disable
+        self.stablediffusion.imageCacheEnabled = True
+        self.stablediffusion.imageCacheDirectory = "cache/images"   # empty keeps the cache in memory only
+        self.stablediffusion.imageCacheMemoryEntries = 8
+        self.stablediffusion.imageCacheDiskMaxMb = 200
+
+        self.display = type("DisplayConfig", (), {})()
+        self.display.maxFps = 30
+        self.display.idleFps = 2               # wake-ups per second while nothing changes
+        self.display.reportIntervalSec = 30    # frame rate / CPU report, 0 to disable
 
         self.conversation = type("Conversation", (), {})()
         self.conversation.context = "This is a discussion in English.\n"
         self.conversation.greeting = "I am listening to you."
         self.conversation.recognitionWaitMsg = "Yes."
         self.conversation.llmWaitMsg = "Let me think."
+        self.conversation.maxContextTokens = 2048
+        self.conversation.contextPolicy = "truncate"   # "truncate" or "summarize"
+        self.conversation.summaryPrompt = "Summarize the story so far in a few sentences."
 
         # Attempt to load external configuration from a YAML file to override defaults
         try:
@@ -43,8 +132,10 @@ class Config:
         Override default configuration values with the values from the YAML file.
         """
         for section, overrides in config_overrides.items():
-            if hasattr(self, section):
-                section_obj = getattr(self, section)
+            # YAML sections are camelCase (e.g. whisperRecognition); attributes are snake_case.
+            attribute = re.sub(r"(?<!^)(?=[A-Z])", "_", section).lower()
+            if hasattr(self, attribute):
+                section_obj = getattr(self, attribute)
                 for key, value in overrides.items():
                     if hasattr(section_obj, key):
                         setattr(section_obj, key, value)
@@ -0,0 +1,104 @@
+from array import array
+
+class ConversationContext:
+    """
+    Bounded store for the Ollama conversation context (the token list returned with each response).
+
+    Tokens are kept in a compact int array instead of a list of Python ints. When the context
+    grows beyond max_tokens, one of two policies applies:
+      - "truncate": keep only the most recent max_tokens tokens.
+      - "summarize": mark the context for summarization; the client asks the model for a short
+        summary of the story so far, then resets the context and carries the summary forward.
+    Per-request prompt-eval and payload sizes are recorded so that growth is visible.
+    """
+    def __init__(self, max_tokens=2048, policy="truncate"):
+        """
+        :param max_tokens: Maximum number of context tokens sent with a request.
+        :param policy: "truncate" or "summarize".
+        """
+        if policy not in ("truncate", "summarize"):
+            raise ValueError(f"Unknown context policy: {policy}")
+        self.max_tokens = max_tokens
+        self.policy = policy
+        self.tokens = array("i")
+        # Summary of earlier turns, used after a summarize-and-reset.
+        self.summary = ""
+        # Set when older tokens were dropped, so the instructions must be sent again.
+        self.truncated = False
+        self.needs_summary = False
+        self.last_request_stats = {}
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def to_list(self) -> list:
+        """
+        Return the tokens as a list for the JSON payload.
+        """
+        return self.tokens.tolist()
+
+    def update(self, tokens):
+        """
+        Replace the context with the one returned by the model and apply the size policy.
+        """
+        self.tokens = array("i", tokens)
+        if len(self.tokens) <= self.max_tokens:
+            return
+        if self.policy == "summarize":
+            self.needs_summary = True
+        else:
+            del self.tokens[:len(self.tokens) - self.max_tokens]
+            self.truncated = True
+
+    def reset_with_summary(self, summary: str):
+        """
+        Drop the token context and carry the given summary into the next prompt instead.
+        """
+        self.tokens = array("i")
+        self.summary = summary.strip()
+        self.truncated = False
+        self.needs_summary = False
+
+    def copy(self):
+        """
+        Return an independent copy (e.g. for a speculative request).
+        """
+        other = ConversationContext(self.max_tokens, self.policy)
+        other.replace_with(self)
+        return other
+
+    def replace_with(self, other):
+        """
+        Take over the state of another context.
+        """
+        self.tokens = array("i", other.tokens)
+        self.summary = other.summary
+        self.truncated = other.truncated
+        self.needs_summary = other.needs_summary
+        self.last_request_stats = dict(other.last_request_stats)
+
+    def clear(self):
+        self.tokens = array("i")
+        self.summary = ""
+        self.truncated = False
+        self.needs_summary = False
+
+    def record_stats(self, body: dict, payload_bytes: int, context_tokens: int):
+        """
+        Record the sizes and timings Ollama reports in the final chunk of a response.
+
+        :param body: The final ("done") response chunk.
+        :param payload_bytes: Size of the request body that was sent.
+        :param context_tokens: Number of context tokens sent with the request.
+        """
+        self.last_request_stats = {
+            "payload_bytes": payload_bytes,
+            "context_tokens_sent": context_tokens,
+            "prompt_eval_count": body.get("prompt_eval_count"),
+            "prompt_eval_seconds": body.get("prompt_eval_duration", 0) / 1e9,
+            "eval_count": body.get("eval_count"),
+            "total_seconds": body.get("total_duration", 0) / 1e9,
+        }
+        print("[Ollama] payload {} bytes, {} context tokens, prompt eval {} tokens in {:.3f} seconds".format(
+            payload_bytes, context_tokens,
+            self.last_request_stats["prompt_eval_count"], self.last_request_stats["prompt_eval_seconds"]))
@@ -0,0 +1,287 @@
+import itertools
+import multiprocessing
+import threading
+import time
+
+import pygame
+
+class DiffusionJob:
+    """
+    One image request handled by a DiffusionWorker.
+    """
+    def __init__(self, job_id: int, prompt: str):
+        self.job_id = job_id
+        self.prompt = prompt
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.cancelled = False
+
+class DiffusionWorker:
+    """
+    Runs image generations one at a time on a single long-lived thread.
+
+    There is at most one pending job: submit() replaces a job that has not started yet (latest
+    wins), and asks the running job to stop at its next step boundary. Cancellation is
+    cooperative: generate_fn receives a should_stop callable to check between steps and returns
+    None when it stops early. The worker counts submitted, completed, coalesced (replaced before
+    they started) and cancelled (stopped while running) jobs, the time jobs waited before starting
+    and the seconds of generation thrown away by cancellation.
+    """
+    def __init__(self, generate_fn, result_fn=None):
+        """
+        :param generate_fn: Callable (prompt, should_stop) returning an image, or None if it was stopped.
+        :param result_fn: Optional callable (prompt, image) called on the worker thread for every finished image.
+        """
+        self.generate_fn = generate_fn
+        self.result_fn = result_fn
+        self._job_ids = itertools.count(1)
+        self._pending = None
+        self._running = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+        self.submitted = 0
+        self.completed = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.last_wait = None
+        self.cancelled_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt: str) -> int:
+        """
+        Queue an image for prompt, replacing any job that has not started yet. Returns the job ID.
+        """
+        with self._changed:
+            job = DiffusionJob(next(self._job_ids), prompt)
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = job
+            self.submitted += 1
+            self._changed.notify_all()
+            depth = 1 + (self._running is not None)
+        print(f"[SD worker] Job {job.job_id} submitted, queue depth {depth}")
+        return job.job_id
+
+    def cancel(self):
+        """
+        Drop the pending job and stop the running one.
+        """
+        with self._changed:
+            if self._pending is not None:
+                self.coalesced += 1
+                self._pending = None
+            if self._running is not None:
+                self._running.cancelled = True
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of jobs waiting or running.
+        """
+        with self._lock:
+            return (self._pending is not None) + (self._running is not None)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            started = self.completed + self.cancelled + self.failed
+            return {
+                "queue_depth": (self._pending is not None) + (self._running is not None),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "coalesced": self.coalesced,
+                "cancelled": self.cancelled,
+                "failed": self.failed,
+                "mean_wait": self.total_wait / started if started else None,
+                "last_wait": self.last_wait,
+                "cancelled_seconds": self.cancelled_seconds,
+            }
+
+    def wait_until_idle(self, timeout=None) -> bool:
+        """
+        Block until no job is pending or running.
+        """
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: self._pending is None and self._running is None, timeout
+            )
+
+    def close(self):
+        with self._changed:
+            self._closed = True
+            self._pending = None
+            if self._running is not None:
+                self._running.cancelled = True
+            self._changed.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._pending is not None or self._closed)
+                if self._closed:
+                    return
+                job = self._pending
+                self._pending = None
+                self._running = job
+                job.started_at = time.monotonic()
+                wait = job.started_at - job.submitted_at
+                self.total_wait += wait
+                self.last_wait = wait
+            print("[SD worker] Job {} started {:.3f} seconds after it was submitted".format(job.job_id, wait))
+
+            # Stop when a newer job is waiting or cancel() or close() was called.
+            should_stop = lambda: job.cancelled or self._pending is not None or self._closed
+            try:
+                image = self.generate_fn(job.prompt, should_stop)
+                error = None
+            except Exception as e:
+                image, error = None, e
+
+            elapsed = time.monotonic() - job.started_at
+            with self._changed:
+                if error is not None:
+                    self.failed += 1
+                    print(f"[SD worker] Job {job.job_id} failed: {error}")
+                elif image is None or should_stop():
+                    self.cancelled += 1
+                    self.cancelled_seconds += elapsed
+                    image = None
+                    print("[SD worker] Job {} cancelled after {:.3f} seconds".format(job.job_id, elapsed))
+                else:
+                    self.completed += 1
+                self._running = None
+                self._changed.notify_all()
+            if image is not None and self.result_fn is not None:
+                self.result_fn(job.prompt, image)
+
+def _process_main(conn, cancel_event, options: dict):
+    """
+    Entry point of the diffusion process: load and warm up the generator, then serve jobs.
+
+    Messages received over the pipe:
+      ("generate", job_id, prompt, previews)
+      ("stop",)
+    Messages sent back:
+      ("ready",) or ("failed", error) once after loading
+      ("preview", job_id, size, rgb_bytes) for every preview if previews were requested
+      ("result", job_id, size_or_None, rgb_bytes_or_None) for every job
+    cancel_event is set by the parent to stop the running job at its next step.
+    """
+    try:
+        # Imported here so that importing this module does not pull in torch.
+        from stable_diffusion_generator import StableDiffusionImageGenerator
+        generator = StableDiffusionImageGenerator(**options)
+        generator.warm_up()
+    except Exception as e:
+        conn.send(("failed", str(e)))
+        return
+    conn.send(("ready",))
+
+    while True:
+        message = conn.recv()
+        if message[0] == "stop":
+            return
+        _, job_id, prompt, previews = message
+
+        def send_preview(surface):
+            conn.send(("preview", job_id, surface.get_size(), pygame.image.tostring(surface, "RGB")))
+
+        image = generator.generate(prompt, send_preview if previews else None, should_stop=cancel_event.is_set)
+        if image is None:
+            conn.send(("result", job_id, None, None))
+        else:
+            conn.send(("result", job_id, image.size, image.convert("RGB").tobytes()))
+
+class DiffusionProcess:
+    """
+    Hosts a StableDiffusionImageGenerator in a dedicated process so that the UNet loop does not
+    compete with the pygame loop and the speech threads for the GIL.
+
+    generate_image() has the same interface as the in-process generator; previews and the final
+    image come back over a pipe as raw RGB. Cancellation sets a shared event that the generator
+    checks between steps.
+    """
+    def __init__(self, **options):
+        """
+        :param options: Keyword arguments for StableDiffusionImageGenerator.
+        """
+        context = multiprocessing.get_context("spawn")
+        self._conn, worker_conn = context.Pipe()
+        self._cancel_event = context.Event()
+        self._process = context.Process(
+            target=_process_main, args=(worker_conn, self._cancel_event, options), daemon=True
+        )
+        self._process.start()
+        worker_conn.close()
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.error = None
+
+    def wait_ready(self) -> bool:
+        """
+        Block until the process has loaded and warmed up the generator. Returns False if it failed.
+        """
+        try:
+            message = self._conn.recv()
+        except EOFError:
+            message = ("failed", "diffusion process exited")
+        if message[0] == "failed":
+            self.error = message[1]
+            print(f"Diffusion process failed to load the model: {self.error}")
+            return False
+        return True
+
+    def warm_up(self):
+        """
+        The process warms the generator up before it reports ready.
+        """
+
+    def generate_image(self, prompt: str, preview_fn=None, should_stop=None):
+        """
+        Generate an image in the diffusion process.
+
+        :param prompt: The text prompt.
+        :param preview_fn: Optional callable receiving a pygame.Surface preview.
+        :param should_stop: Optional callable polled while waiting; returning True cancels the image.
+        :return: A pygame.Surface, or None if cancelled or an error occurs.
+        """
+        with self._lock:
+            job_id = next(self._job_ids)
+            self._cancel_event.clear()
+            self._conn.send(("generate", job_id, prompt, preview_fn is not None))
+            while True:
+                if not self._conn.poll(0.05):
+                    if should_stop is not None and should_stop():
+                        self._cancel_event.set()
+                    continue
+                try:
+                    message = self._conn.recv()
+                except EOFError:
+                    print("Diffusion process exited")
+                    return None
+                kind, message_job_id, size, data = message
+                if message_job_id != job_id:
+                    continue
+                if kind == "preview":
+                    preview_fn(pygame.image.frombuffer(data, size, "RGB"))
+                elif kind == "result":
+                    return None if data is None else pygame.image.frombuffer(data, size, "RGB")
+
+    def terminate(self):
+        """
+        Stop the diffusion process.
+        """
+        self._cancel_event.set()
+        try:
+            self._conn.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
@@ -1,3 +1,5 @@
+import threading
+
 import pygame
 import pygame_gui
 import textwrap
@@ -10,7 +12,18 @@ class DisplayManager:
     Manages the entire Pygame display rendering and divides the screen into two sections:
       - Top: Displays the top_image, which fills the space above the bottom toolbar.
       - Bottom: The toolbar containing two buttons (left and right) and a center message.
+
+    Each section is redrawn only when it has changed (dirty), and only the redrawn sections are
+    pushed to the display. Setters called from other threads post a REDRAW_EVENT so that a main
+    loop sleeping in pygame.event.wait() wakes up.
     """
+    # Posted when a section becomes dirty; the main loop only needs to wake up, not handle it.
+    REDRAW_EVENT = pygame.event.custom_type()
+    TOP = "top"
+    TOOLBAR = "toolbar"
+    # Changes of the sound energy smaller than this do not redraw the toolbar.
+    ENERGY_STEP = 0.02
+
     def __init__(self, width=800, height=600):
         self.screen = pygame.display.set_mode((width, height))
         pygame.display.set_caption("Kids Story Teller")
@@ -26,6 +39,26 @@ class DisplayManager:
 
         self.top_image = None
         self.current_energy = 0.0
+        # The top image scaled to the top area and converted to the display format, and the
+        # (image, area size) it was made for; rebuilt only when either changes.
+        self._scaled_top_image = None
+        self._scaled_for = None
+        self._dirty = {self.TOP, self.TOOLBAR}
+        self._dirty_lock = threading.Lock()
+
+    def invalidate(self, *sections):
+        """
+        Mark sections (by default all of them) for redrawing at the next draw().
+        """
+        with self._dirty_lock:
+            was_clean = not self._dirty
+            self._dirty.update(sections or (self.TOP, self.TOOLBAR))
+        if was_clean and pygame.display.get_init():
+            pygame.event.post(pygame.event.Event(self.REDRAW_EVENT))
+
+    def is_dirty(self) -> bool:
+        with self._dirty_lock:
+            return bool(self._dirty)
 
     def set_icon(self, icon_path: str):
         try:
@@ -43,36 +76,75 @@ class DisplayManager:
                 self.top_image = None
         else:
             self.top_image = image
+        self.invalidate(self.TOP)
 
     def set_message(self, message: str):
-        self.bottom_toolbar.set_message(message)
+        if message != self.bottom_toolbar.message:
+            self.bottom_toolbar.set_message(message)
+            self.invalidate(self.TOOLBAR)
 
     def set_energy(self, energy: float):
-        self.current_energy = energy
+        if abs(energy - self.current_energy) >= self.ENERGY_STEP:
+            self.current_energy = energy
+            self.invalidate(self.TOOLBAR)
 
     def process_events(self, event):
         # Delegate UI events to the bottom toolbar.
         self.bottom_toolbar.process_events(event)
+        if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                          pygame.WINDOWENTER, pygame.WINDOWLEAVE):
+            # The buttons' hover and pressed states may have changed.
+            self.invalidate(self.TOOLBAR)
+        elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED):
+            self.invalidate()
 
-    def draw(self):
-        self.screen.fill(self.bg_color)
-        top_area_height = self.screen.get_height() - 100
-        if self.top_image:
-            available_width = self.screen.get_width()
-            available_height = top_area_height
-
-            orig_width, orig_height = self.top_image.get_size()
+    def _scaled_image(self, image, available_width, available_height):
+        """
+        Return the image scaled to fit the area, converted to the display's pixel format for fast blits.
+        """
+        key = (image, available_width, available_height)
+        if self._scaled_for != key:
+            orig_width, orig_height = image.get_size()
             scale_factor = min(available_width / orig_width, available_height / orig_height)
             new_width = int(orig_width * scale_factor)
             new_height = int(orig_height * scale_factor)
-            
-            top_image_scaled = pygame.transform.smoothscale(self.top_image, (new_width, new_height))
-            top_area_rect = pygame.Rect(0, 0, available_width, available_height)
-            top_image_rect = top_image_scaled.get_rect(center=top_area_rect.center)
-            self.screen.blit(top_image_scaled, top_image_rect.topleft)
-        else:
-            pygame.draw.rect(self.screen, self.bg_color, pygame.Rect(0, 0, self.screen.get_width(), top_area_height))
-        
-        self.bottom_toolbar.draw(self.screen, self.current_energy)
 
-        pygame.display.update()
\ No newline at end of file
+            scaled = pygame.transform.smoothscale(image, (new_width, new_height))
+            if image.get_flags() & pygame.SRCALPHA:
+                self._scaled_top_image = scaled.convert_alpha()
+            else:
+                self._scaled_top_image = scaled.convert()
+            self._scaled_for = key
+        return self._scaled_top_image
+
+    def draw(self) -> list:
+        """
+        Redraw the dirty sections and push them to the display.
+
+        :return: The updated rectangles (empty if nothing had changed).
+        """
+        with self._dirty_lock:
+            dirty = self._dirty
+            self._dirty = set()
+        if not dirty:
+            return []
+
+        updated = []
+        if self.TOP in dirty:
+            top_area_height = self.screen.get_height() - 100
+            top_area_rect = pygame.Rect(0, 0, self.screen.get_width(), top_area_height)
+            self.screen.fill(self.bg_color, top_area_rect)
+            # Read once: set_top_image() may be called from other threads.
+            top_image = self.top_image
+            if top_image:
+                top_image_scaled = self._scaled_image(top_image, top_area_rect.width, top_area_rect.height)
+                top_image_rect = top_image_scaled.get_rect(center=top_area_rect.center)
+                self.screen.blit(top_image_scaled, top_image_rect.topleft)
+            updated.append(top_area_rect)
+
+        if self.TOOLBAR in dirty:
+            self.bottom_toolbar.draw(self.screen, self.current_energy)
+            updated.append(self.bottom_toolbar.rect)
+
+        pygame.display.update(updated)
+        return updated
\ No newline at end of file
@@ -0,0 +1,67 @@
+import time
+
+import pygame
+
+class FrameScheduler:
+    """
+    Paces the pygame main loop.
+
+    Frames are capped at max_fps. When nothing needs redrawing, the loop sleeps in
+    pygame.event.wait() until an event arrives (input, or a redraw request posted by another
+    thread) or 1 / idle_fps seconds pass, so an idle window costs almost no CPU.
+    Every report_interval seconds it prints the loop rate, the number of drawn frames, the
+    average time spent drawing and the main thread's CPU usage.
+    """
+    def __init__(self, max_fps=30, idle_fps=2, report_interval=10.0):
+        """
+        :param max_fps: Maximum number of frames per second.
+        :param idle_fps: Wake-ups per second while nothing changes.
+        :param report_interval: Seconds between frame statistics reports (0 disables them).
+        """
+        self.max_fps = max_fps
+        self.idle_fps = idle_fps
+        self.report_interval = report_interval
+        self.clock = pygame.time.Clock()
+        self._reset_stats(time.monotonic())
+
+    def _reset_stats(self, now: float):
+        self.loops = 0
+        self.frames = 0
+        self.draw_seconds = 0.0
+        self._window_start = now
+        self._cpu_start = time.thread_time()
+
+    def next_events(self, dirty: bool) -> list:
+        """
+        Wait for the next frame and return the pending events.
+
+        :param dirty: Whether something is waiting to be drawn; if not, sleep until an event arrives.
+        """
+        self.clock.tick(self.max_fps)
+        if dirty or self.idle_fps <= 0:
+            return pygame.event.get()
+        first = pygame.event.wait(int(1000 / self.idle_fps))
+        if first.type == pygame.NOEVENT:
+            return []
+        return [first] + pygame.event.get()
+
+    def record(self, draw_seconds: float, drew: bool):
+        """
+        Account for one loop iteration and report the statistics when they are due.
+        """
+        self.loops += 1
+        if drew:
+            self.frames += 1
+            self.draw_seconds += draw_seconds
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if self.report_interval > 0 and elapsed >= self.report_interval:
+            print(self.report(now))
+            self._reset_stats(now)
+
+    def report(self, now=None) -> str:
+        elapsed = max(1e-9, (now or time.monotonic()) - self._window_start)
+        cpu = time.thread_time() - self._cpu_start
+        return "[Display] {:.1f} loops/s, {:.1f} frames/s drawn, {:.2f} ms per frame, main thread CPU {:.1%}".format(
+            self.loops / elapsed, self.frames / elapsed,
+            1000 * self.draw_seconds / self.frames if self.frames else 0.0, cpu / elapsed)
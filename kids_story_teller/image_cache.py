@@ -0,0 +1,50 @@
+import io
+
+from PIL import Image
+
+from cache_store import TieredCache, cache_key
+
+class ImageCache:
+    """
+    Cache of generated images.
+
+    Entries are keyed by the hash of everything that determines the image (model, prompt, seed,
+    steps, size, scheduler, guidance) and stored as PNG in a TieredCache: an in-memory LRU in front
+    of a size-limited directory.
+    """
+    def __init__(self, directory=None, memory_entries=8, disk_max_bytes=200 * 1024 * 1024):
+        """
+        :param directory: Directory of the disk tier, or None to keep the cache in memory only.
+        :param memory_entries: Number of images kept in memory.
+        :param disk_max_bytes: Maximum total size of the disk tier.
+        """
+        self.cache = TieredCache(directory, memory_entries, disk_max_bytes, suffix=".png")
+
+    @staticmethod
+    def key(model: str, prompt: str, seed, steps: int, width: int, height: int, scheduler: str,
+            guidance_scale: float, lora=None) -> str:
+        return cache_key(
+            model, prompt, str(seed), str(steps), f"{width}x{height}", scheduler, str(guidance_scale), str(lora)
+        )
+
+    def get(self, key: str):
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.load()
+        except (OSError, ValueError) as e:
+            # A truncated or corrupted PNG is dropped and generated again like a miss.
+            print(f"[Cache] Dropping unreadable image entry: {e}")
+            self.cache.delete(key)
+            return None
+        return image
+
+    def put(self, key: str, image):
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        self.cache.put(key, buffer.getvalue())
+
+    def stats(self) -> dict:
+        return self.cache.stats()
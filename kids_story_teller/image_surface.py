@@ -0,0 +1,10 @@
+import pygame
+
+def pil_to_surface(image) -> pygame.Surface:
+    """
+    Build a pygame surface from a PIL image's pixels in memory, without a file or an image codec.
+    The surface shares the pixel buffer instead of copying it.
+    """
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    return pygame.image.frombuffer(image.tobytes(), image.size, image.mode)
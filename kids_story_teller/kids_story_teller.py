@@ -20,13 +20,30 @@ import pygame.locals
 
 from config import Config
 from display_manager import DisplayManager
-from audio_recorder import AudioRecorder
+from frame_scheduler import FrameScheduler
+from audio_recorder import AudioRecorder, INPUT_RATE
 from keyboard_monitor import KeyboardMonitor
 from speech_recognizer import SpeechRecognizer
+from speech_worker import SpeechRecognizerProcess
 from tts_manager import TTSManager
+from tts_cache import TTSCache
+from audio_player import MixerPlayer
 from ollama_client import OllamaClient
+from ollama_pool import OllamaEndpointPool
+from conversation_context import ConversationContext
+from response_cache import CachedOllamaClient
+from speculative_generation import SpeculativeGenerator
 from constants import INPUT_CONFIG_PATH
 from stable_diffusion_generator import StableDiffusionImageGenerator
+from diffusion_worker import DiffusionWorker, DiffusionProcess
+from voice_activity import VoiceActivityDetector, SilenceAutoStop
+from streaming_transcriber import StreamingTranscriber
+from model_lifecycle import ModelLifecycleManager, FAILED
+
+# Names of the models managed by the ModelLifecycleManager.
+SPEECH_MODEL = "speech_recognizer"
+IMAGE_MODEL = "sd_image_generator"
+LLM_MODEL = "ollama"
 
 class KidsStoryTeller:
     """
@@ -49,6 +66,11 @@ class KidsStoryTeller:
         self.display_manager = DisplayManager()
         self.display_manager.set_icon("kids_story_teller.png")
         self.display_manager.set_top_image("default_top_image.jpeg")
+        self.frame_scheduler = FrameScheduler(
+            max_fps=self.config.display.maxFps,
+            idle_fps=self.config.display.idleFps,
+            report_interval=self.config.display.reportIntervalSec
+        )
         print("[Init] DisplayManager initialization took {:.3f} seconds".format(time.time() - start_time))
 
         # Measure KeyboardMonitor initialization.
@@ -59,45 +81,122 @@ class KidsStoryTeller:
         # Initialize the audio recording module; exit if an error occurs.
         start_time = time.time()
         try:
-            self.audio_recorder = AudioRecorder()
+            self.audio_recorder = AudioRecorder(
+                persistent_stream=self.config.audio.persistentStream,
+                pre_roll_ms=self.config.audio.preRollMs
+            )
         except RuntimeError as e:
             print(e)
             self.wait_exit()
         print("[Init] AudioRecorder initialization took {:.3f} seconds".format(time.time() - start_time))
 
+        # Voice activity detection used to trim silence before transcription.
+        self.vad = None
+        if self.config.vad.enabled:
+            self.vad = VoiceActivityDetector(
+                INPUT_RATE,
+                threshold=self.config.vad.threshold,
+                frame_ms=self.config.vad.frameMs,
+                padding_ms=self.config.vad.paddingMs,
+                max_pause_ms=self.config.vad.maxPauseMs
+            )
+        # Set while a recording is in progress so that only one recording happens at a time.
+        self.recording_active = False
+
         # Measure OllamaClient initialization.
         start_time = time.time()
+        self.ollama_pool = None
+        if self.config.ollama.endpoints:
+            self.ollama_pool = OllamaEndpointPool(
+                self.config.ollama.endpoints,
+                health_interval=self.config.ollama.healthIntervalSec,
+                failure_threshold=self.config.ollama.failureThreshold,
+                max_backoff=self.config.ollama.maxBackoffSec
+            ).start()
         self.ollama_client = OllamaClient(
             self.config.ollama.url,
             self.config.ollama.model,
-            self.config.conversation.context
+            self.config.conversation.context,
+            keep_alive=self.config.ollama.keepAlive,
+            connect_timeout=self.config.ollama.connectTimeoutSec,
+            read_timeout=self.config.ollama.readTimeoutSec,
+            min_chunk_chars=self.config.ollama.minChunkChars,
+            max_chunk_chars=self.config.ollama.maxChunkChars,
+            flush_interval=self.config.ollama.flushIntervalSec,
+            summary_prompt=self.config.conversation.summaryPrompt,
+            pool=self.ollama_pool
         )
-        self.conversation_context = []
-        print("[Init] OllamaClient initialization took {:.3f} seconds".format(time.time() - start_time))
-
-        # Offload SpeechRecognizer initialization to a background thread.
-        def init_speech_recognizer():
-            sr_start = time.time()
-            self.speech_recognizer = SpeechRecognizer(
-                self.config.whisper_recognition.modelPath,
-                self.config.whisper_recognition.lang
+        if self.config.response_cache.enabled:
+            cache_config = self.config.response_cache
+            self.ollama_client = CachedOllamaClient(
+                self.ollama_client,
+                directory=cache_config.directory or None,
+                memory_entries=cache_config.memoryEntries,
+                disk_max_bytes=int(cache_config.diskMaxMb * 1024 * 1024),
+                match=cache_config.match,
+                ttl_sec=cache_config.ttlSec,
+                variants=cache_config.variants
             )
-            print("[Init] SpeechRecognizer initialization took {:.3f} seconds (background)".format(time.time() - sr_start))
-        threading.Thread(target=init_speech_recognizer, daemon=True).start()
-
-        # Offload StableDiffusionImageGenerator initialization to a background thread.
-        def init_sd_generator():
-            sd_start = time.time()
-            self.sd_image_generator = StableDiffusionImageGenerator(
-                modelName=self.config.stablediffusion.modelName, 
-                device=self.config.stablediffusion.device
+        self.conversation_context = ConversationContext(
+            max_tokens=self.config.conversation.maxContextTokens,
+            policy=self.config.conversation.contextPolicy
+        )
+        # Speculative generation starts the request from partial transcripts while recording.
+        self.speculator = None
+        if self.config.ollama.speculative:
+            self.speculator = SpeculativeGenerator(
+                self.ollama_client, stable_count=self.config.ollama.speculativeStableCount
             )
-            print("[Init] StableDiffusionImageGenerator initialization took {:.3f} seconds (background)".format(time.time() - sd_start))
-        threading.Thread(target=init_sd_generator, daemon=True).start()
+        print("[Init] OllamaClient initialization took {:.3f} seconds".format(time.time() - start_time))
+
+        # Load the models in the background. Each one runs a synthetic warm-up inference after
+        # loading; push-to-talk waits for (or refuses on) the speech recognizer's state.
+        self.models = ModelLifecycleManager()
+        self.models.register(
+            SPEECH_MODEL, self._load_speech_recognizer, warm_up_fn=lambda recognizer: recognizer.warm_up()
+        )
+        self.models.register(
+            IMAGE_MODEL, self._load_sd_generator, warm_up_fn=lambda generator: generator.warm_up()
+        )
+        self.models.register(
+            LLM_MODEL, lambda: self.ollama_client, warm_up_fn=lambda client: client.warm_up()
+        )
+        # A single long-lived worker generates the images; a new prompt replaces the one in progress.
+        self.image_worker = DiffusionWorker(
+            self._generate_image, result_fn=lambda prompt, image: self.display_manager.set_top_image(image)
+        )
 
         # Measure TTSManager initialization.
         start_time = time.time()
-        self.tts_manager = TTSManager()
+        player = None
+        if self.config.tts.player == "mixer":
+            # pygame.init() has opened the audio device; it stays open for the app's lifetime.
+            player = MixerPlayer(duck_volume=self.config.tts.duckVolume)
+        tts_cache = None
+        if self.config.tts.cacheEnabled:
+            tts_cache = TTSCache(
+                directory=self.config.tts.cacheDirectory or None,
+                memory_entries=self.config.tts.cacheMemoryEntries,
+                disk_max_bytes=int(self.config.tts.cacheDiskMaxMb * 1024 * 1024)
+            )
+        self.tts_manager = TTSManager(
+            backend=self.config.tts.backend,
+            lang=self.config.tts.lang,
+            voice=self.config.tts.voice,
+            queue_size=self.config.tts.queueSize,
+            synthesis_workers=self.config.tts.synthesisWorkers,
+            cache=tts_cache,
+            player=player
+        )
+        # Synthesize the fixed phrases in the background so that they play instantly.
+        # The greeting is cached by speaking it below.
+        self.tts_manager.precompute([
+            self.config.conversation.recognitionWaitMsg,
+            self.config.conversation.llmWaitMsg,
+            self.config.messages.pressSpace,
+            self.config.messages.noAudioInput,
+            self.config.messages.modelUnavailable,
+        ])
         print("[Init] TTSManager initialization took {:.3f} seconds".format(time.time() - start_time))
 
         # Greet the user.
@@ -112,74 +211,250 @@ class KidsStoryTeller:
         threading.Thread(target=speak_greeting, daemon=True).start()
 
 
+    def _load_speech_recognizer(self):
+        whisper_config = self.config.whisper_recognition
+        options = {
+            "backend": whisper_config.backend,
+            "quantize": whisper_config.quantize,
+            "threads": whisper_config.threads,
+            "interop_threads": whisper_config.interopThreads,
+        }
+        if whisper_config.useProcess:
+            recognizer = SpeechRecognizerProcess(whisper_config.modelPath, whisper_config.lang, **options)
+            if not recognizer.wait_ready():
+                raise RuntimeError(recognizer.error)
+            return recognizer
+        return SpeechRecognizer(whisper_config.modelPath, whisper_config.lang, **options)
+
+    def _load_sd_generator(self):
+        sd_config = self.config.stablediffusion
+        image_cache = None
+        if sd_config.imageCacheEnabled:
+            image_cache = {
+                "directory": sd_config.imageCacheDirectory or None,
+                "memory_entries": sd_config.imageCacheMemoryEntries,
+                "disk_max_bytes": int(sd_config.imageCacheDiskMaxMb * 1024 * 1024),
+            }
+        options = dict(
+            modelName=sd_config.modelName,
+            device=sd_config.device,
+            scheduler=sd_config.scheduler,
+            steps=sd_config.steps,
+            height=sd_config.height,
+            width=sd_config.width,
+            guidance_scale=sd_config.guidanceScale,
+            seed=sd_config.seed,
+            lcm_lora=sd_config.lcmLora,
+            profile=sd_config.profile,
+            threads=sd_config.threads,
+            interop_threads=sd_config.interopThreads,
+            bf16=sd_config.bf16,
+            compile_unet=sd_config.compileUnet,
+            preview_every=sd_config.previewEverySteps,
+            embedding_cache_entries=sd_config.embeddingCacheEntries,
+            image_cache=image_cache
+        )
+        if sd_config.useProcess:
+            generator = DiffusionProcess(**options)
+            if not generator.wait_ready():
+                raise RuntimeError(generator.error)
+            return generator
+        return StableDiffusionImageGenerator(**options)
+
     def wait_exit(self):
         """
         Display an error message and wait for the user to quit.
         """
+        self.display_manager.set_message(self.config.messages.noAudioInput)
         while True:
-            self.display_manager.set_message(self.config.messages.noAudioInput)
             self.display_manager.draw()
 
             # Process all events; check for quit event.
-            for event in pygame.event.get():
+            for event in self.frame_scheduler.next_events(self.display_manager.is_dirty()):
                 if event.type == pygame.QUIT:
                     self.shutdown()
+                self.display_manager.process_events(event)
 
     def shutdown(self):
         """
         Clean up resources and exit the program.
         """
         self.audio_recorder.terminate()
+        speech_recognizer = self.models.models[SPEECH_MODEL].instance
+        if isinstance(speech_recognizer, SpeechRecognizerProcess):
+            speech_recognizer.terminate()
+        self.image_worker.cancel()
+        image_generator = self.models.models[IMAGE_MODEL].instance
+        if isinstance(image_generator, DiffusionProcess):
+            image_generator.terminate()
+        if self.ollama_pool is not None:
+            self.ollama_pool.stop()
         pygame.quit()
         sys.exit()
 
     def handle_push_to_talk(self):
         """
         Process audio recording and speech recognition. Once text is recognized,
-        spawn two separate threads:
-          - One for the Ollama API call.
-          - One for generating an image using Stable Diffusion.
+        start the Ollama API call on a separate thread and submit the text to the image worker.
         """
-        waveform = self.audio_recorder.record_audio(
-            should_continue_fn=self.keyboard_monitor.is_recording,
-            display_energy_callback=self.display_manager.set_energy
-        )
-        recognized_text = self.speech_recognizer.speech_to_text(waveform)
+        # A new question interrupts the story that is still being told. Stop its stream first,
+        # otherwise its callback keeps queueing sentences after the flush.
+        if self.speculator is not None:
+            self.speculator.reset()
+        self.ollama_client.cancel()
+        self.tts_manager.flush()
+
+        if self.models.state(SPEECH_MODEL) == FAILED:
+            # Refuse gracefully instead of recording audio that cannot be transcribed.
+            self.recording_active = False
+            self.display_manager.set_message(self.config.messages.modelUnavailable)
+            self._say(self.config.messages.modelUnavailable)
+            self.display_manager.set_message(self.config.messages.pressSpace)
+            return
+
+        recognized_text = self._transcribe_utterance()
+        if not recognized_text.strip():
+            if self.speculator is not None:
+                self.speculator.reset()
+            self.display_manager.set_message(self.config.messages.noAudioInput)
+            self._say(self.config.messages.noAudioInput)
+            self.display_manager.set_message(self.config.messages.pressSpace)
+            return
 
         self.display_manager.set_message(self.config.conversation.llmWaitMsg + recognized_text)
-        # Disabled TTS speech invocation:
-        self.tts_manager.speak(self.config.conversation.llmWaitMsg + recognized_text)
+        # The fixed part of the acknowledgement is spoken separately so that it comes from the cache.
+        # When pipelined, it is queued ahead of the story, which is generated meanwhile.
+        self._say(self.config.conversation.llmWaitMsg)
+        self._say(recognized_text)
 
-        # Start two separate threads.
         ollama_thread = threading.Thread(
             target=self._ollama_thread_func, args=(recognized_text,), daemon=True
         )
-        stable_diffusion_thread = threading.Thread(
-            target=self._stable_diffusion_thread_func, args=(recognized_text,), daemon=True
-        )
         ollama_thread.start()
-        stable_diffusion_thread.start()
+        # Replaces an image that is still pending or being generated for an earlier question.
+        self.image_worker.submit(recognized_text)
 
         self.display_manager.set_message(self.config.messages.pressSpace)
 
+    def _say(self, text: str):
+        """
+        Speak text through the speech pipeline when it is enabled, so that it never plays over
+        queued sentences; otherwise speak it and wait.
+        """
+        if self.config.tts.pipelined:
+            self.tts_manager.speak_async(text)
+        else:
+            self.tts_manager.speak(text)
+
+    def _transcribe_utterance(self) -> str:
+        """
+        Record one utterance and return its transcript (empty if no speech was detected).
+        In streaming mode, decoding runs while recording and only the tail is decoded at the end.
+        """
+        streaming = None
+        speech_recognizer = self.models.get(SPEECH_MODEL)
+        # Streaming needs a loaded model; otherwise the whole recording is decoded at the end.
+        if self.config.whisper_recognition.streaming and speech_recognizer is not None:
+            def on_partial(text):
+                self.display_manager.set_message(text)
+                if self.speculator is not None:
+                    self.speculator.observe_partial(text, self.conversation_context)
+
+            if self.speculator is not None:
+                self.speculator.reset()
+            streaming = StreamingTranscriber(
+                speech_recognizer,
+                self.audio_recorder.current_audio,
+                INPUT_RATE,
+                interval_sec=self.config.whisper_recognition.streamIntervalSec,
+                min_window_sec=self.config.whisper_recognition.streamMinWindowSec,
+                holdback_sec=self.config.whisper_recognition.streamHoldbackSec,
+                partial_callback=on_partial
+            )
+            # The first window must not include the previous utterance.
+            self.audio_recorder.reset_capture()
+            streaming.start()
+
+        try:
+            waveform = self._record_utterance()
+        finally:
+            self.recording_active = False
+
+        if speech_recognizer is None:
+            # The recording is queued until the model has loaded and warmed up.
+            self.display_manager.set_message(self.config.messages.loadingModel)
+            if not self.models.wait_ready(SPEECH_MODEL):
+                return ""
+            speech_recognizer = self.models.get(SPEECH_MODEL)
+
+        trim_fn = self.vad.trim if self.vad is not None else None
+        if streaming is not None:
+            if self.speculator is not None:
+                # The child stopped speaking: the last partial is the best guess of the final transcript.
+                self.speculator.speculate_latest(self.conversation_context)
+            return streaming.finish(waveform, preprocess_fn=trim_fn)
+        if trim_fn is not None:
+            waveform = trim_fn(waveform)
+            if waveform.shape[0] == 0:
+                return ""
+        return speech_recognizer.speech_to_text(waveform)
+
+    def _record_utterance(self):
+        """
+        Record one utterance. In push-to-talk mode recording lasts while the trigger key is held;
+        in hands-free mode the key only starts it and it ends after vad.autoStopMs of silence.
+        """
+        vad_config = self.config.vad
+        auto_stop = None
+        if vad_config.handsFree:
+            auto_stop = SilenceAutoStop(
+                threshold=vad_config.threshold,
+                silence_ms=vad_config.autoStopMs,
+                no_speech_timeout_ms=vad_config.noSpeechTimeoutMs
+            )
+
+        def on_energy(rms):
+            if auto_stop is not None:
+                auto_stop.observe(rms)
+            self.display_manager.set_energy(rms)
+
+        def should_continue():
+            if auto_stop is not None and auto_stop.should_stop():
+                return False
+            # In hands-free mode the key only starts the recording.
+            return vad_config.handsFree or self.keyboard_monitor.is_recording()
+
+        # Speech that is still playing (e.g. the greeting) is ducked while the child talks.
+        self.tts_manager.duck()
+        try:
+            return self.audio_recorder.record_audio(
+                should_continue_fn=should_continue,
+                display_energy_callback=on_energy
+            )
+        finally:
+            self.tts_manager.restore()
+
     def _ollama_thread_func(self, recognized_text: str):
         """
         Thread function for invoking the Ollama API.
         """
-        self.ollama_client.ask(recognized_text, self.conversation_context, self._ollama_callback)
+        if self.speculator is not None:
+            self.speculator.resolve(recognized_text, self.conversation_context, self._ollama_callback)
+        else:
+            self.ollama_client.ask(recognized_text, self.conversation_context, self._ollama_callback)
 
-    def _stable_diffusion_thread_func(self, recognized_text: str):
+    def _generate_image(self, recognized_text: str, should_stop):
         """
-        Thread function for generating an image using the Stable Diffusion model.
-        The generated image is then displayed in the top area.
+        Generate an image with the Stable Diffusion model; runs on the image worker's thread.
+        The image worker displays the finished image in the top area.
         """
-        try:
-            # Generate an image using the recognized text as a prompt.
-            image = self.sd_image_generator.generate_image(recognized_text)
-            # Update the top image in the display manager with the generated image.
-            self.display_manager.set_top_image(image)
-        except Exception as e:
-            print(f"Stable diffusion generation failed: {e}")
+        # Wait for the generator to finish loading; skip the image if it failed.
+        if not self.models.wait_ready(IMAGE_MODEL):
+            return None
+        # Use the recognized text as a prompt, showing previews as the image develops.
+        return self.models.get(IMAGE_MODEL).generate_image(
+            recognized_text, preview_fn=self.display_manager.set_top_image, should_stop=should_stop
+        )
 
     def run(self):
         """
@@ -192,8 +467,8 @@ class KidsStoryTeller:
         already_recording = False
 
         while True:
-            # Get and process all events once.
-            events = pygame.event.get()
+            # Wait for the next frame (or, when nothing changes, for an event) and process all events once.
+            events = self.frame_scheduler.next_events(self.display_manager.is_dirty())
             for event in events:
                 if event.type == pygame.QUIT:
                     self.shutdown()
@@ -204,24 +479,31 @@ class KidsStoryTeller:
                 self.keyboard_monitor.process_events(event)
 
             # Start a recording thread if the trigger key is pressed and no recording is happening.
-            if self.keyboard_monitor.is_recording() and not already_recording:
+            if self.keyboard_monitor.is_recording() and not already_recording and not self.recording_active:
                 self.display_manager.set_message(self.config.conversation.recognitionWaitMsg)
                 already_recording = True
+                self.recording_active = True
                 threading.Thread(
                     target=self.handle_push_to_talk, daemon=True
                 ).start()
             elif not self.keyboard_monitor.is_recording():
                 already_recording = False
 
-            self.display_manager.draw()
+            start_time = time.perf_counter()
+            drew = bool(self.display_manager.draw())
+            self.frame_scheduler.record(time.perf_counter() - start_time, drew)
 
     def _ollama_callback(self, text: str):
         """
         Process the response text from the Ollama API by updating the display.
         """
-        self.display_manager.set_message(text)
-        # Disabled TTS speech invocation:
-        self.tts_manager.speak(text)
+        if self.config.tts.pipelined:
+            # Return right away so the stream keeps being read while the sentence is spoken;
+            # the sentence is shown when it starts playing, not while it waits in the queue.
+            self.tts_manager.speak_async(text, on_start=self.display_manager.set_message)
+        else:
+            self.display_manager.set_message(text)
+            self.tts_manager.speak(text)
 
 def main():
     """
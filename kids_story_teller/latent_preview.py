@@ -0,0 +1,29 @@
+import numpy as np
+import pygame
+
+# Linear approximation of the Stable Diffusion v1/v2 VAE decoder: each of the 4 latent channels
+# contributes a fixed amount to R, G and B. Applied to the raw (unscaled) latents, it gives an
+# image in about [-1, 1] at 1/8 of the output resolution.
+SD_LATENT_RGB_FACTORS = np.array([
+    [0.298, 0.207, 0.208],
+    [0.187, 0.286, 0.173],
+    [-0.158, 0.189, 0.264],
+    [-0.184, -0.271, -0.473],
+], dtype=np.float32)
+
+def latents_to_rgb(latents: np.ndarray) -> np.ndarray:
+    """
+    Project latents of shape (4, height, width) to an RGB image.
+
+    :return: A uint8 array of shape (height, width, 3).
+    """
+    rgb = np.tensordot(latents.astype(np.float32), SD_LATENT_RGB_FACTORS, axes=([0], [0]))
+    return ((rgb + 1.0) * 127.5).clip(0, 255).astype(np.uint8)
+
+def latents_to_surface(latents: np.ndarray) -> pygame.Surface:
+    """
+    Turn latents of shape (4, height, width) into a small pygame surface; the display scales it up.
+    """
+    rgb = latents_to_rgb(latents)
+    height, width, _ = rgb.shape
+    return pygame.image.frombuffer(rgb.tobytes(), (width, height), "RGB")
@@ -0,0 +1,116 @@
+import threading
+import time
+
+# Lifecycle states of a managed model.
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+class ManagedModel:
+    """
+    Loads one model in a background thread, runs a synthetic warm-up inference on it and
+    tracks its state (loading -> warming -> ready, or failed) along with load and warm-up durations.
+    """
+    def __init__(self, name: str, load_fn, warm_up_fn=None):
+        """
+        :param name: Name used in logs and metrics.
+        :param load_fn: Callable that loads and returns the model instance.
+        :param warm_up_fn: Optional callable receiving the instance, used to pay first-call costs
+                           (kernel initialization, allocator growth, JIT) before real requests arrive.
+        """
+        self.name = name
+        self.load_fn = load_fn
+        self.warm_up_fn = warm_up_fn
+        self.state = LOADING
+        self.instance = None
+        self.error = None
+        self.load_seconds = None
+        self.warm_up_seconds = None
+        self._finished = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            start_time = time.time()
+            instance = self.load_fn()
+            self.load_seconds = time.time() - start_time
+
+            self.state = WARMING
+            start_time = time.time()
+            if self.warm_up_fn is not None:
+                self.warm_up_fn(instance)
+            self.warm_up_seconds = time.time() - start_time
+
+            self.instance = instance
+            self.state = READY
+            print("[Init] {} loaded in {:.3f} seconds, warmed up in {:.3f} seconds (background)".format(
+                self.name, self.load_seconds, self.warm_up_seconds))
+        except Exception as e:
+            phase = "loading" if self.state == LOADING else "warm-up"
+            self.error = e
+            self.state = FAILED
+            print(f"[Init] {self.name} failed during {phase}: {e}")
+        finally:
+            self._finished.set()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == READY
+
+    @property
+    def is_finished(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout=None) -> bool:
+        """
+        Block until the model is ready or has failed. Returns True if it is ready.
+        """
+        self._finished.wait(timeout)
+        return self.is_ready
+
+class ModelLifecycleManager:
+    """
+    Registry of the application's models and their lifecycle states.
+    Callers use get() to obtain a model only once it is ready, and metrics() for load/warm-up timings.
+    """
+    def __init__(self):
+        self.models = {}
+
+    def register(self, name: str, load_fn, warm_up_fn=None) -> ManagedModel:
+        """
+        Register a model and start loading it in the background.
+        """
+        model = ManagedModel(name, load_fn, warm_up_fn)
+        self.models[name] = model
+        model.start()
+        return model
+
+    def state(self, name: str) -> str:
+        return self.models[name].state
+
+    def get(self, name: str):
+        """
+        Return the model instance if it is ready, otherwise None.
+        """
+        model = self.models.get(name)
+        return model.instance if model is not None and model.is_ready else None
+
+    def wait_ready(self, name: str, timeout=None) -> bool:
+        return self.models[name].wait(timeout)
+
+    def metrics(self) -> dict:
+        """
+        Return the state, load time, warm-up time and error of every registered model.
+        """
+        return {
+            name: {
+                "state": model.state,
+                "load_seconds": model.load_seconds,
+                "warm_up_seconds": model.warm_up_seconds,
+                "error": str(model.error) if model.error is not None else None,
+            }
+            for name, model in self.models.items()
+        }
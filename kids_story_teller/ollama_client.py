@@ -1,100 +1,401 @@
 import requests
 import json
+import threading
+import time
+from requests.adapters import HTTPAdapter
+
+from sentence_segmenter import SentenceSegmenter
+from conversation_context import ConversationContext
+
+class StreamState:
+    """
+    Per-request state of a streamed Ollama response, shared by the sync and async clients.
+    """
+    def __init__(self, segmenter: SentenceSegmenter):
+        self.segmenter = segmenter
+        # None until the first token shows whether the model opens with a "<think>" section;
+        # callbacks are enabled right away if it does not, or once "</think>" has been seen.
+        self.callback_enabled = None
+        self.done = False
+        # Set once a chunk has been passed to the callback (a failed request can then no longer be retried).
+        self.emitted = False
+        # Request sizes, recorded in the conversation context when the response is done.
+        self.payload_bytes = 0
+        self.context_tokens = 0
+        # Serializes the stream reader and the flush timer.
+        self.lock = threading.Lock()
+
+def process_stream_chunk(body: dict, state: StreamState, conversation_context: ConversationContext, callback):
+    """
+    Handle one decoded NDJSON chunk of a streamed /api/generate response.
+    Feeds the token to the sentence segmenter, passes every speakable chunk to the callback,
+    and flushes the remaining text and updates the conversation context when done.
+    """
+    token_str = body.get('response', '')
+
+    if state.callback_enabled is None and token_str.strip():
+        state.callback_enabled = not token_str.lstrip().startswith("<think>")
+
+    if state.callback_enabled:
+        for chunk in state.segmenter.feed(token_str):
+            callback(chunk)
+    elif "</think>" in token_str:
+        # Enable callback when the "</think>" tag appears; speak only what follows it.
+        state.callback_enabled = True
+        for chunk in state.segmenter.feed(token_str.split("</think>", 1)[1]):
+            callback(chunk)
+
+    if 'error' in body:
+        if state.callback_enabled:
+            callback("Error: " + body['error'])
+    if body.get('done', False):
+        # Speak any trailing text that did not end with punctuation.
+        if state.callback_enabled:
+            for chunk in state.segmenter.flush():
+                callback(chunk)
+        # Update conversation context.
+        if 'context' in body:
+            conversation_context.update(body['context'])
+        conversation_context.record_stats(body, state.payload_bytes, state.context_tokens)
+        state.done = True
+
+# Shortest time between two polls of the segmenter by the flush timer.
+MIN_FLUSH_POLL_SEC = 0.05
+
+def flush_poll_interval(segmenter: SentenceSegmenter):
+    """
+    Seconds between two polls of the segmenter while waiting for tokens, or None if no timer is
+    needed (with a flush interval of 0 every token already flushes at the last boundary).
+    """
+    if segmenter.flush_interval <= 0:
+        return None
+    return max(MIN_FLUSH_POLL_SEC, segmenter.flush_interval / 4)
+
+def poll_stream(state: StreamState, callback):
+    """
+    Pass on pending text that has waited flush_interval seconds for a boundary, without a new
+    token having arrived. Called periodically while the model is slow between tokens.
+    """
+    if state.callback_enabled and not state.done:
+        for chunk in state.segmenter.poll():
+            callback(chunk)
+
+def build_generate_payload(model: str, initial_context: str, keep_alive, prompt: str,
+                           conversation_context: ConversationContext) -> dict:
+    """
+    Build the /api/generate request body for a streamed question.
+    The instructions (and any summary of earlier turns) are only sent when the token context
+    no longer carries them: on the first turn, after a summarize-and-reset, or after truncation.
+    """
+    if len(conversation_context) == 0 or conversation_context.truncated:
+        preamble = initial_context + "\n"
+        if conversation_context.summary:
+            preamble += "The story so far: " + conversation_context.summary + "\n"
+        prompt = preamble + prompt
+    return {
+        "model": model,
+        "stream": True,
+        "context": conversation_context.to_list(),
+        "prompt": prompt,
+        "keep_alive": keep_alive,
+    }
+
+def extract_answer(text: str) -> str:
+    """
+    Strip a leading "<think>...</think>" section from a non-streamed response.
+    """
+    if "</think>" in text:
+        text = text.split("</think>", 1)[1]
+    return text.strip()
 
 class OllamaClient:
     """
     Client for interacting with the Ollama API and streaming responses.
+
+    Requests go through one long-lived requests.Session, so TCP connections are pooled and
+    kept alive between questions, and every request has explicit connect and read timeouts.
+    The token stream is cut into sentence-sized chunks by a SentenceSegmenter, and each chunk
+    is passed to the callback as soon as it can be spoken. While the model stalls between
+    tokens, a timer thread polls the segmenter so that pending text is still flushed after
+    flush_interval seconds.
     """
-    def __init__(self, url: str, model: str, context: str):
+    def __init__(self, url: str, model: str, context: str, keep_alive="30m",
+                 connect_timeout=5.0, read_timeout=60.0, pool_size=4,
+                 min_chunk_chars=20, max_chunk_chars=200, flush_interval=1.5,
+                 summary_prompt="Summarize the story so far in a few sentences.", pool=None):
+        """
+        :param url: URL of the Ollama /api/generate endpoint (unused when a pool is given).
+        :param model: Name of the model to query.
+        :param context: Instructions prepended to every prompt.
+        :param keep_alive: How long Ollama keeps the model loaded after a request.
+        :param connect_timeout: Seconds to wait for a connection to be established.
+        :param read_timeout: Maximum number of seconds to wait between two streamed chunks.
+        :param pool_size: Maximum number of pooled connections kept open to the server.
+        :param min_chunk_chars: Minimum length of a chunk passed to the callback.
+        :param max_chunk_chars: Maximum length of a chunk passed to the callback.
+        :param flush_interval: Seconds after which pending text is passed on at the last boundary.
+        :param summary_prompt: Prompt used to summarize the conversation when its context is too long.
+        :param pool: Optional OllamaEndpointPool that routes requests across several hosts.
+        """
         self.url = url
+        self.pool = pool
         self.model = model
+        self.keep_alive = keep_alive
         self.headers = {'Content-Type': 'application/json'}
         self.initial_context = context
-        # Removed the context_sent flag since it is no longer used.
+        self.summary_prompt = summary_prompt
+        self.timeout = (connect_timeout, read_timeout)
+        self.segmenter_options = {
+            "min_chars": min_chunk_chars,
+            "max_chars": max_chunk_chars,
+            "flush_interval": flush_interval,
+        }
 
-        # Flag to control callback invocation.
-        self.callback_enabled = False
+        # Long-lived session with a keep-alive connection pool.
+        self.session = requests.Session()
+        hosts = len(pool.endpoints) if pool is not None else 1
+        adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
 
         # Attributes to handle cancellation of ongoing requests.
         self.current_response = None      # Store the currently active response object.
         self.request_counter = 0          # Used to generate sequential tokens for requests.
         self.current_token = None         # Token for the current request.
 
-    def ask(self, prompt: str, conversation_context: list, callback):
+    def warm_up(self):
         """
-        Send a query to the Ollama API and stream the response via the callback.
-        If a new request comes in, the previous ongoing request is cancelled.
+        Send an empty, non-streaming generate request. Ollama loads the model into memory
+        and keeps it resident for keep_alive without generating any tokens.
+        With an endpoint pool every host is warmed up; it fails only if no host could be reached.
         """
-        # Cancel any ongoing request.
-        if self.current_response is not None:
+        payload = {"model": self.model, "prompt": "", "stream": False, "keep_alive": self.keep_alive}
+        if self.pool is None:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return
+
+        errors = []
+        for endpoint in self.pool.endpoints:
+            try:
+                response = self.session.post(endpoint.url, json=payload, timeout=self.timeout)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                print(f"[Ollama pool] Warm-up of {endpoint.url} failed: {e}")
+                self.pool.record_failure(endpoint)
+                errors.append(e)
+            else:
+                self.pool.record_success(endpoint)
+        if len(errors) == len(self.pool.endpoints):
+            raise errors[-1]
+
+    def build_payload(self, prompt: str, conversation_context: ConversationContext) -> dict:
+        return build_generate_payload(
+            self.model, self.initial_context, self.keep_alive, prompt, conversation_context
+        )
+
+    def summarize(self, conversation_context: ConversationContext, current_token=None):
+        """
+        Ask the model to summarize the conversation so far, then reset the token context and
+        carry the summary forward. Used by the "summarize" context policy.
+
+        The summary is streamed like an answer, so cancel() (or a new question) stops it; the
+        context is then left as it is and summarized after a later answer.
+
+        :param current_token: Token of the request the summary belongs to; a new one by default.
+        """
+        if current_token is None:
+            self.request_counter += 1
+            current_token = self.request_counter
+            self.current_token = current_token
+        payload = {
+            "model": self.model,
+            "stream": True,
+            "context": conversation_context.to_list(),
+            "prompt": self.summary_prompt,
+            "keep_alive": self.keep_alive,
+        }
+        endpoint = self.pool.choose() if self.pool is not None else None
+        url = endpoint.url if endpoint is not None else self.url
+        parts = []
+        try:
+            response = self.session.post(url, data=json.dumps(payload), stream=True, timeout=self.timeout)
+            response.raise_for_status()
+            self.current_response = response
+            try:
+                for line in response.iter_lines():
+                    if self.current_token != current_token:
+                        break
+                    if not line:
+                        continue
+                    body = json.loads(line)
+                    parts.append(body.get('response', ''))
+                    if body.get('done', False):
+                        break
+            finally:
+                if self.current_token == current_token:
+                    self.current_response = None
+                    response.close()
+        except Exception as e:
+            # Closing the response from cancel() interrupts the read; only report real errors.
+            if self.current_token == current_token:
+                print(f"Failed to summarize the conversation: {e}")
+                parts = []
+        finally:
+            if endpoint is not None:
+                self.pool.release(endpoint)
+
+        if self.current_token != current_token:
+            # A newer request owns the context now; do not overwrite what it recorded.
+            print("[Ollama] Context summary cancelled")
+            return
+        summary = extract_answer("".join(parts))
+        conversation_context.reset_with_summary(summary)
+        print("[Ollama] Context summarized into {} characters".format(len(summary)))
+
+    def cancel(self):
+        """
+        Cancel the ongoing request, if any. The streaming loop stops immediately and the
+        response's connection is closed rather than returned to the pool half-read.
+        """
+        self.request_counter += 1
+        self.current_token = self.request_counter
+        response = self.current_response
+        self.current_response = None
+        if response is not None:
             try:
-                self.current_response.close()
+                response.close()
             except Exception:
                 pass
-            self.current_response = None
+
+    def ask(self, prompt: str, conversation_context: ConversationContext, callback):
+        """
+        Send a query to the Ollama API and stream the response via the callback.
+        If a new request comes in, the previous ongoing request is cancelled.
+        With an endpoint pool, a request that fails before anything was passed to the callback
+        is retried on the next endpoint.
+        Returns True if the response was received completely.
+        """
+        # Cancel any ongoing request.
+        self.cancel()
 
         # Generate a new token for the current request.
         self.request_counter += 1
         current_token = self.request_counter
         self.current_token = current_token
 
-        self.callback_enabled = False
+        payload = self.build_payload(prompt, conversation_context)
+        data = json.dumps(payload)
+
+        tried = []
+        while True:
+            endpoint = self.pool.choose(exclude=tried) if self.pool is not None else None
+            state = StreamState(SentenceSegmenter(**self.segmenter_options))
+            state.payload_bytes = len(data)
+            state.context_tokens = len(payload["context"])
+            try:
+                error = self._stream(endpoint, data, state, current_token, conversation_context, callback)
+            finally:
+                if endpoint is not None:
+                    self.pool.release(endpoint)
+            if error is None:
+                break
+            if endpoint is None:
+                callback(f"Request error: {error}")
+                return False
+            self.pool.record_failure(endpoint)
+            tried.append(endpoint)
+            if state.emitted or len(tried) == len(self.pool.endpoints):
+                callback(f"Request error: {error}")
+                return False
+            print(f"[Ollama pool] {endpoint.url} failed ({error}), failing over")
 
-        # Construct the full prompt (without using any context flag).
-        full_prompt = self.initial_context + "\n" + prompt
+        completed = state.done and self.current_token == current_token
+        # Summarize after the answer has been delivered, off the critical path of the next question.
+        if completed and conversation_context.needs_summary:
+            self.summarize(conversation_context, current_token)
+        return completed
 
-        payload = {
-            "model": self.model,
-            "stream": True,
-            "context": conversation_context,
-            "prompt": full_prompt,
-        }
+    def _stream(self, endpoint, data: str, state: StreamState, current_token: int,
+                conversation_context: ConversationContext, callback):
+        """
+        Post one request and process its stream. Returns the error that stopped it, or None.
+        """
+        def emit(text):
+            state.emitted = True
+            callback(text)
 
+        url = endpoint.url if endpoint is not None else self.url
+        start_time = time.monotonic()
         try:
-            response = requests.post(self.url, json=payload, headers=self.headers, stream=True)
+            response = self.session.post(url, data=data, stream=True, timeout=self.timeout)
             response.raise_for_status()
             self.current_response = response  # Save the current active response object.
         except requests.RequestException as e:
-            callback(f"Request error: {e}")
-            return
+            return e
 
-        tokens = []
-        # Iterate over each line of the streamed response.
-        for line in response.iter_lines():
-            # Cancel processing if a new request has started (token mismatch).
-            if self.current_token != current_token:
-                break
+        stopped = threading.Event()
+        interval = flush_poll_interval(state.segmenter)
+        timer = None
+        if interval is not None:
+            timer = threading.Thread(
+                target=self._flush_timer, args=(state, current_token, interval, stopped, emit), daemon=True
+            )
+            timer.start()
 
-            if not line:
-                continue
-            try:
-                body = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            token_str = body.get('response', '')
-            tokens.append(token_str)
-            
-            # Flush the output when encountering punctuation.
-            if token_str in [".", ":", "!", "?"]:
-                current_response_str = "".join(tokens)
-                if self.callback_enabled:
-                    callback(current_response_str)
-                tokens = []
-
-            # Enable callback when the "</think>" tag appears.
-            if "</think>" in token_str:
-                self.callback_enabled = True
-                tokens = []
-
-            if 'error' in body:
-                if self.callback_enabled:
-                    callback("Error: " + body['error'])
-            if body.get('done', False):
-                # Update conversation context.
-                conversation_context[:] = body.get('context', conversation_context)
-                break
-        
-        # If the current request has not been cancelled, clear the saved response.
-        if self.current_token == current_token:
-            self.current_response = None 
\ No newline at end of file
+        first_chunk_latency = None
+        try:
+            # Iterate over each line of the streamed response. The stream is read to its end
+            # so that the connection goes back to the pool for the next question.
+            for line in response.iter_lines():
+                # Cancel processing if a new request has started (token mismatch).
+                if self.current_token != current_token:
+                    break
+                if not line or state.done:
+                    continue
+                if first_chunk_latency is None:
+                    first_chunk_latency = time.monotonic() - start_time
+                try:
+                    body = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                with state.lock:
+                    process_stream_chunk(body, state, conversation_context, emit)
+        except Exception as e:
+            # Closing the response from cancel() interrupts the read; only report real errors.
+            if self.current_token == current_token:
+                return e
+        finally:
+            stopped.set()
+            if timer is not None:
+                timer.join()
+            # If the current request has not been cancelled, clear the saved response.
+            if self.current_token == current_token:
+                self.current_response = None
+                response.close()
+
+        if self.current_token == current_token and not state.done:
+            return requests.ConnectionError("Stream ended before the response was done")
+        if endpoint is not None and state.done:
+            self.pool.record_success(endpoint, first_chunk_latency)
+        return None
+
+    def _flush_timer(self, state: StreamState, current_token: int, interval: float,
+                     stopped: threading.Event, callback):
+        """
+        Poll the segmenter every interval seconds until the stream ends, so that a stall between
+        tokens does not hold back text that is already speakable.
+        """
+        while not stopped.wait(interval):
+            with state.lock:
+                if self.current_token != current_token:
+                    return
+                poll_stream(state, callback)
+
+    def close(self):
+        """
+        Cancel any ongoing request and close the pooled connections.
+        """
+        self.cancel()
+        self.session.close()
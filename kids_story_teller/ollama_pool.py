@@ -0,0 +1,145 @@
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+class Endpoint:
+    """
+    One Ollama host of an OllamaEndpointPool, with its load, latency and circuit-breaker state.
+    """
+    def __init__(self, url: str):
+        """
+        :param url: URL of the host's /api/generate endpoint.
+        """
+        self.url = url
+        parts = urlsplit(url)
+        self.health_url = urlunsplit((parts.scheme, parts.netloc, "/api/version", "", ""))
+        self.in_flight = 0
+        # Exponentially weighted average of the time to the first streamed chunk, in seconds.
+        self.latency = None
+        self.failures = 0
+        # The circuit is open (the endpoint is skipped) until this time.
+        self.open_until = 0.0
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.open_until
+
+    def __repr__(self):
+        return f"Endpoint({self.url}, in_flight={self.in_flight}, latency={self.latency}, failures={self.failures})"
+
+class OllamaEndpointPool:
+    """
+    Routes Ollama requests across several hosts.
+
+    Each request goes to the available endpoint with the fewest requests in flight, ties broken by
+    the lowest recent latency. Failures open a circuit breaker: after failure_threshold consecutive
+    failures the endpoint is skipped for a backoff that doubles with every further failure, up to
+    max_backoff. A background thread probes every endpoint's /api/version every health_interval
+    seconds; a successful probe closes the circuit, a failed one counts as a failure.
+    """
+    def __init__(self, urls, health_interval=10.0, probe_timeout=2.0, failure_threshold=3,
+                 base_backoff=1.0, max_backoff=60.0, latency_weight=0.3):
+        """
+        :param urls: URLs of the /api/generate endpoints.
+        :param health_interval: Seconds between health probes; 0 disables the probe thread.
+        :param probe_timeout: Timeout of a health probe, in seconds.
+        :param failure_threshold: Consecutive failures before an endpoint's circuit opens.
+        :param base_backoff: Seconds the circuit stays open after reaching the threshold.
+        :param max_backoff: Upper limit of the circuit-breaker backoff, in seconds.
+        :param latency_weight: Weight of the newest sample in the latency average.
+        """
+        if not urls:
+            raise ValueError("At least one Ollama endpoint is required")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.health_interval = health_interval
+        self.probe_timeout = probe_timeout
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.latency_weight = latency_weight
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        # Probes use their own session so they never wait for a pooled streaming connection.
+        self._probe_session = requests.Session()
+
+    def choose(self, exclude=()):
+        """
+        Pick the endpoint for the next request and count it as in flight.
+        Endpoints in exclude (already tried) are skipped. If every circuit is open, the endpoint
+        whose backoff ends first is tried anyway. Returns None if all endpoints were excluded.
+        Every chosen endpoint must be passed back to release().
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+            if not candidates:
+                return None
+            available = [endpoint for endpoint in candidates if endpoint.is_available(now)]
+            if available:
+                endpoint = min(available, key=lambda e: (e.in_flight, e.latency or 0.0))
+            else:
+                endpoint = min(candidates, key=lambda e: e.open_until)
+            endpoint.in_flight += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint):
+        with self._lock:
+            endpoint.in_flight -= 1
+
+    def record_success(self, endpoint: Endpoint, latency=None):
+        with self._lock:
+            endpoint.failures = 0
+            endpoint.open_until = 0.0
+            if latency is not None:
+                if endpoint.latency is None:
+                    endpoint.latency = latency
+                else:
+                    endpoint.latency += self.latency_weight * (latency - endpoint.latency)
+
+    def record_failure(self, endpoint: Endpoint):
+        with self._lock:
+            endpoint.failures += 1
+            if endpoint.failures >= self.failure_threshold:
+                backoff = self.base_backoff * 2 ** (endpoint.failures - self.failure_threshold)
+                endpoint.open_until = time.monotonic() + min(backoff, self.max_backoff)
+                print(f"[Ollama pool] {endpoint.url} unavailable for {min(backoff, self.max_backoff):.1f} seconds")
+
+    def probe(self, endpoint: Endpoint) -> bool:
+        """
+        Check that the endpoint's server answers; update its circuit accordingly.
+        """
+        try:
+            response = self._probe_session.get(endpoint.health_url, timeout=self.probe_timeout)
+            response.raise_for_status()
+        except requests.RequestException:
+            self.record_failure(endpoint)
+            return False
+        self.record_success(endpoint)
+        return True
+
+    def probe_all(self):
+        for endpoint in self.endpoints:
+            self.probe(endpoint)
+
+    def start(self):
+        """
+        Start the background health probes.
+        """
+        if self.health_interval <= 0 or self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop_event.wait(self.health_interval):
+            self.probe_all()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._probe_session.close()
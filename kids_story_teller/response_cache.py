@@ -0,0 +1,135 @@
+import json
+import random
+import re
+import time
+
+from cache_store import TieredCache, cache_key
+
+def normalize_transcript(text: str) -> str:
+    """
+    Normalize a transcript for cache matching: lower case, no punctuation, single spaces.
+    """
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+class CachedOllamaClient:
+    """
+    Response cache in front of an OllamaClient.
+
+    Responses are keyed on the model, the instructions, the prompt and a hash of the conversation
+    context, and stored as the list of chunks that were passed to the callback. A hit replays the
+    chunks through the same callback and restores the conversation context the model returned,
+    so the TTS and display path does not change. Only completed, uncancelled responses are stored.
+
+    Policy:
+      - match: "exact" keys on the prompt as given; "normalized" ignores case, punctuation and spacing.
+      - ttl_sec: entries older than this are regenerated (0 keeps them forever).
+      - variants: number of different responses kept per key; until that many exist, the model is
+        asked again, then a random stored variant is replayed.
+    """
+    def __init__(self, client, directory=None, memory_entries=64, disk_max_bytes=50 * 1024 * 1024,
+                 match="normalized", ttl_sec=0, variants=1):
+        """
+        :param client: The OllamaClient that generates responses on a miss.
+        :param directory: Directory of the on-disk tier, or None for memory only.
+        :param memory_entries: Number of responses kept in the in-memory LRU tier.
+        :param disk_max_bytes: Maximum total size of the on-disk tier.
+        :param match: "exact" or "normalized".
+        :param ttl_sec: Maximum age of a cached response in seconds; 0 disables expiry.
+        :param variants: Number of responses kept per key.
+        """
+        if match not in ("exact", "normalized"):
+            raise ValueError(f"Unknown cache match policy: {match}")
+        self.client = client
+        self.cache = TieredCache(directory, memory_entries, disk_max_bytes, suffix=".json")
+        self.match = match
+        self.ttl_sec = ttl_sec
+        self.variants = max(1, variants)
+        self.hits = 0
+        self.misses = 0
+        self._replay_token = 0
+
+    def __getattr__(self, name):
+        # Everything else (warm_up, close, build_payload, ...) goes to the wrapped client.
+        return getattr(self.client, name)
+
+    def key(self, prompt: str, conversation_context) -> str:
+        if self.match == "normalized":
+            prompt = normalize_transcript(prompt)
+        return cache_key(
+            self.client.model,
+            self.client.initial_context,
+            prompt,
+            conversation_context.tokens.tobytes(),
+            conversation_context.summary,
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _load(self, key: str):
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        try:
+            entry = json.loads(data)
+            created = entry["created"]
+            entry["variants"]
+        except (ValueError, KeyError, TypeError) as e:
+            # A truncated or corrupted entry is dropped and regenerated like a miss.
+            print(f"[Cache] Dropping unreadable LLM response entry: {e}")
+            self.cache.delete(key)
+            return None
+        if self.ttl_sec and time.time() - created > self.ttl_sec:
+            self.cache.delete(key)
+            return None
+        return entry
+
+    def cancel(self):
+        self._replay_token += 1
+        self.client.cancel()
+
+    def ask(self, prompt: str, conversation_context, callback) -> bool:
+        """
+        Same contract as OllamaClient.ask: answer from the cache if possible, otherwise ask the model.
+        """
+        key = self.key(prompt, conversation_context)
+        entry = self._load(key)
+        if entry is not None and len(entry["variants"]) >= self.variants:
+            self.hits += 1
+            print("[Cache] LLM response hit (hit rate {:.0%})".format(self.hit_rate))
+            return self._replay(random.choice(entry["variants"]), conversation_context, callback)
+
+        self.misses += 1
+        chunks = []
+        def record(text):
+            chunks.append(text)
+            callback(text)
+
+        completed = self.client.ask(prompt, conversation_context, record)
+        if completed and chunks:
+            if entry is None:
+                entry = {"created": time.time(), "variants": []}
+            entry["variants"].append({
+                "chunks": chunks,
+                "context": conversation_context.to_list(),
+                "summary": conversation_context.summary,
+            })
+            self.cache.put(key, json.dumps(entry).encode("utf-8"))
+        return completed
+
+    def _replay(self, variant: dict, conversation_context, callback) -> bool:
+        self.client.cancel()
+        self._replay_token += 1
+        token = self._replay_token
+        for chunk in variant["chunks"]:
+            if self._replay_token != token:
+                return False
+            callback(chunk)
+        if variant["context"]:
+            conversation_context.update(variant["context"])
+        else:
+            conversation_context.reset_with_summary(variant["summary"])
+        return True
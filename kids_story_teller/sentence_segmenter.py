@@ -0,0 +1,147 @@
+import time
+
+# Words that end with a period without ending the sentence (compared in lower case, without the period).
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "st", "jr", "sr", "prof", "mt", "vs", "etc", "e.g", "i.e",
+}
+SENTENCE_END = ".!?…"
+CLAUSE_BREAKS = ",;:—–"
+# Closing quotes and brackets that belong to the sentence they follow.
+CLOSERS = "\"')]”’"
+
+class SentenceSegmenter:
+    """
+    Incremental segmenter that turns a stream of LLM tokens into speakable chunks.
+
+    Boundaries are detected inside tokens (e.g. ". The" or "!\\n"). Abbreviations, initials,
+    decimal numbers and closing quotes do not end a sentence too early. Sentences shorter than
+    min_chars are merged with the next one. Text longer than max_chars is split at the last
+    clause break. If flush_interval seconds pass without a chunk being emitted, the text up to
+    the last sentence or clause boundary is emitted so that speech can start sooner.
+    """
+    def __init__(self, min_chars=20, max_chars=200, flush_interval=1.5, clock=time.monotonic):
+        """
+        :param min_chars: Minimum length of an emitted chunk (the final chunk may be shorter).
+        :param max_chars: Maximum length of an emitted chunk.
+        :param flush_interval: Seconds after which pending text is flushed at the last boundary.
+        :param clock: Time source, replaceable for tests.
+        """
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._buffer = ""
+        self._pending_since = None
+
+    def feed(self, token: str) -> list:
+        """
+        Add a token and return the chunks that became speakable.
+        """
+        if not token:
+            return []
+        if self._pending_since is None and token.strip():
+            self._pending_since = self.clock()
+        self._buffer += token
+        return self._drain(final=False)
+
+    def poll(self) -> list:
+        """
+        Apply the time-based flush without new input. OllamaClient calls it from a timer while
+        the model is slow between tokens.
+        """
+        return self._drain(final=False)
+
+    def flush(self) -> list:
+        """
+        Return all remaining text, regardless of boundaries. Call when the stream ends.
+        """
+        return self._drain(final=True)
+
+    def _is_sentence_end(self, text: str, index: int) -> bool:
+        """
+        Check whether the terminator at text[index] ends a sentence.
+        """
+        if text[index] != ".":
+            return True
+        # Look at the word the period belongs to.
+        start = index
+        while start > 0 and not text[start - 1].isspace() and text[start - 1] not in "\"'(“‘":
+            start -= 1
+        word = text[start:index]
+        if word.lower() in ABBREVIATIONS:
+            return False
+        # Single-letter initials such as "J. R. R." do not end a sentence.
+        if len(word) == 1 and word.isupper():
+            return False
+        return True
+
+    def _boundaries(self, text: str):
+        """
+        Yield (end_index, kind) for every confirmed boundary in text; kind is "sentence" or "clause".
+        A boundary is confirmed once the whitespace following it has arrived.
+        """
+        i = 0
+        length = len(text)
+        while i < length:
+            char = text[i]
+            if char == "\n":
+                yield i + 1, "sentence"
+            elif char in SENTENCE_END or char in CLAUSE_BREAKS:
+                end = i + 1
+                # Swallow repeated terminators ("?!", "...") and closing quotes.
+                while end < length and (text[end] in SENTENCE_END or text[end] in CLOSERS):
+                    end += 1
+                if end < length and text[end].isspace():
+                    if char in CLAUSE_BREAKS:
+                        yield end, "clause"
+                    elif self._is_sentence_end(text, i):
+                        yield end, "sentence"
+                i = end - 1
+            i += 1
+
+    def _emit(self, end: int, chunks: list):
+        chunk = self._buffer[:end].strip()
+        self._buffer = self._buffer[end:]
+        if chunk:
+            chunks.append(chunk)
+        self._pending_since = self.clock() if self._buffer.strip() else None
+
+    def _drain(self, final: bool) -> list:
+        chunks = []
+        while True:
+            sentence_end = None
+            last_clause = None
+            last_boundary = None
+            for end, kind in self._boundaries(self._buffer):
+                if end > self.max_chars:
+                    break
+                last_boundary = end
+                if kind == "clause":
+                    last_clause = end
+                elif len(self._buffer[:end].strip()) >= self.min_chars:
+                    sentence_end = end
+                    break
+
+            if sentence_end is not None:
+                self._emit(sentence_end, chunks)
+                continue
+
+            if len(self._buffer) > self.max_chars:
+                # Too long without a usable sentence end: cut at a clause break or a space.
+                cut = last_clause or self._buffer.rfind(" ", 0, self.max_chars) + 1 or self.max_chars
+                self._emit(cut, chunks)
+                continue
+
+            timed_out = (
+                self._pending_since is not None
+                and self.clock() - self._pending_since >= self.flush_interval
+            )
+            if timed_out and last_boundary is not None:
+                # Waited long enough: speak whatever ends at a boundary, even if it is short.
+                self._emit(last_boundary, chunks)
+                continue
+            break
+
+        if final:
+            self._emit(len(self._buffer), chunks)
+        return chunks
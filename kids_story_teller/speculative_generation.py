@@ -0,0 +1,188 @@
+import threading
+import time
+
+from response_cache import normalize_transcript
+
+class _Speculation:
+    """
+    One speculative request: its prompt, its private copy of the conversation context,
+    and the chunks produced before the final transcript was known.
+    """
+    def __init__(self, prompt: str, key: str, conversation_context):
+        self.prompt = prompt
+        self.key = key
+        self.conversation_context = conversation_context
+        self.chunks = []
+        self.callback = None
+        self.completed = False
+        self.started = time.time()
+        self.finished = None
+        self.thread = None
+
+class SpeculativeGenerator:
+    """
+    Starts the LLM request from a partial transcript, before the final transcript is known.
+
+    Partial transcripts are passed to observe_partial() while the child is still speaking. Once the
+    same (normalized) partial has been seen stable_count times in a row, a request is started in the
+    background on a copy of the conversation context, and its chunks are buffered. When the final
+    transcript arrives, resolve() keeps the speculation if it matches under the normalization rule:
+    the buffered chunks are passed to the callback and the rest streams live. Otherwise the
+    speculation is cancelled (through the client's token-based cancellation) and the request is
+    restarted with the final transcript. Hits, misses and the time saved are recorded.
+    """
+    def __init__(self, client, stable_count=2, normalize_fn=normalize_transcript):
+        """
+        :param client: OllamaClient (or a wrapper with the same ask/cancel contract).
+        :param stable_count: Number of identical consecutive partials before speculating.
+        :param normalize_fn: Normalization rule used to compare partial and final transcripts.
+        """
+        self.client = client
+        self.stable_count = stable_count
+        self.normalize_fn = normalize_fn
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._speculation = None
+        self._last_partial = None
+        self._last_text = ""
+        self._repeats = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def observe_partial(self, text: str, conversation_context):
+        """
+        Record a partial transcript; start speculating once it is stable.
+        """
+        key = self.normalize_fn(text)
+        if not key:
+            return
+        if key == self._last_partial:
+            self._repeats += 1
+        else:
+            self._last_partial = key
+            self._repeats = 1
+        self._last_text = text
+        if self._repeats >= self.stable_count:
+            self.speculate(text, conversation_context)
+
+    def speculate_latest(self, conversation_context):
+        """
+        Speculate on the latest partial even if it has not been repeated (e.g. when recording stops).
+        """
+        if self._last_partial:
+            self.speculate(self._last_text, conversation_context)
+
+    def speculate(self, text: str, conversation_context):
+        """
+        Start a speculative request for text, replacing a different speculation in flight.
+        """
+        key = self.normalize_fn(text)
+        with self._lock:
+            if self._speculation is not None and self._speculation.key == key:
+                return
+            previous = self._discard()
+        self._stop(previous)
+        speculation = _Speculation(text, key, conversation_context.copy())
+        speculation.thread = threading.Thread(target=self._run, args=(speculation,), daemon=True)
+        with self._lock:
+            self._speculation = speculation
+        speculation.thread.start()
+        print(f"[Speculation] Started for: {text}")
+
+    def _run(self, speculation: _Speculation):
+        with self._lock:
+            if self._speculation is not speculation:
+                return
+
+        def on_chunk(chunk):
+            with self._lock:
+                if self._speculation is not speculation:
+                    return
+                if speculation.callback is None:
+                    speculation.chunks.append(chunk)
+                    return
+                callback = speculation.callback
+            callback(chunk)
+
+        speculation.completed = bool(
+            self.client.ask(speculation.prompt, speculation.conversation_context, on_chunk)
+        )
+        speculation.finished = time.time()
+
+    def _discard(self):
+        # Called with the lock held; the returned speculation must be passed to _stop().
+        speculation = self._speculation
+        self._speculation = None
+        return speculation
+
+    def _stop(self, speculation):
+        """
+        Cancel a discarded speculation and wait for its thread, so that it cannot start
+        (and thereby cancel) a request after the next one has begun.
+        """
+        if speculation is None:
+            return
+        while speculation.thread.is_alive():
+            self.client.cancel()
+            speculation.thread.join(0.05)
+
+    def reset(self):
+        """
+        Cancel any speculation and forget the observed partials (e.g. before a new recording).
+        """
+        with self._lock:
+            speculation = self._discard()
+        self._stop(speculation)
+        self._last_partial = None
+        self._repeats = 0
+
+    def resolve(self, final_text: str, conversation_context, callback) -> bool:
+        """
+        Answer final_text, reusing the speculation if it matches. Blocks until the response is done.
+        Returns True if the response was received completely.
+        """
+        resolve_time = time.time()
+        with self._lock:
+            speculation = self._speculation
+            hit = speculation is not None and speculation.key == self.normalize_fn(final_text)
+            if not hit:
+                self._discard()
+        if hit:
+            # Pass on the buffered chunks before any new one, then let the rest stream live.
+            # The callback runs without the lock; chunks arriving meanwhile are buffered and
+            # picked up by the next pass.
+            while True:
+                with self._lock:
+                    chunks = speculation.chunks
+                    speculation.chunks = []
+                    if not chunks:
+                        speculation.callback = callback
+                        break
+                for chunk in chunks:
+                    callback(chunk)
+        self._last_partial = None
+        self._repeats = 0
+
+        if not hit:
+            self._stop(speculation)
+            if speculation is not None:
+                self.misses += 1
+                print("[Speculation] Miss (hit rate {:.0%})".format(self.hit_rate))
+            return self.client.ask(final_text, conversation_context, callback)
+
+        self.hits += 1
+        saved = min(resolve_time, speculation.finished or resolve_time) - speculation.started
+        self.saved_seconds += saved
+        print("[Speculation] Hit, saved {:.3f} seconds (hit rate {:.0%})".format(saved, self.hit_rate))
+        speculation.thread.join()
+        with self._lock:
+            if self._speculation is speculation:
+                self._speculation = None
+        if speculation.completed:
+            conversation_context.replace_with(speculation.conversation_context)
+        return speculation.completed
@@ -0,0 +1,139 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class SpeechPipeline:
+    """
+    Asynchronous speech output: synthesis and playback run on their own threads.
+
+    enqueue() returns immediately. A dispatcher hands each sentence to a pool of synthesis
+    workers and puts the pending result in a bounded queue; the playback worker takes results
+    from that queue in order and plays them. While sentence N plays, sentence N+1 (up to
+    queue_size sentences ahead) is already being synthesized, and sentences are always played
+    in the order they were enqueued. flush() drops everything that has not started playing yet
+    (and stops the current sentence if a stop function is given), e.g. when a new question starts.
+    """
+    def __init__(self, synthesize_fn, play_fn, stop_fn=None, wait_fn=None, queue_size=2, workers=1):
+        """
+        :param synthesize_fn: Callable turning a text into audio.
+        :param play_fn: Callable (audio, cancelled) playing the audio returned by synthesize_fn; blocks
+                        until done. cancelled() returns True once the sentence has been flushed and
+                        must be checked again right before the audio is started.
+        :param stop_fn: Optional callable interrupting the audio being played.
+        :param wait_fn: Optional callable (timeout) blocking until the audio started by play_fn is
+                        silent, for players whose play_fn returns before the sound ends.
+        :param queue_size: Maximum number of synthesized (or in synthesis) sentences waiting for playback.
+        :param workers: Number of synthesis workers.
+        """
+        self.synthesize_fn = synthesize_fn
+        self.play_fn = play_fn
+        self.stop_fn = stop_fn
+        self.wait_fn = wait_fn
+        self._texts = queue.Queue()
+        self._pending = queue.Queue(maxsize=queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-synthesis")
+        # Bumped by flush(); items of an older generation are dropped.
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0
+        self._stopped = False
+        threading.Thread(target=self._dispatch, daemon=True).start()
+        threading.Thread(target=self._playback, daemon=True).start()
+
+    def enqueue(self, text: str, on_start=None):
+        """
+        Queue a sentence for speaking without waiting for it.
+
+        :param on_start: Optional callable receiving the text when it starts playing.
+        """
+        with self._lock:
+            self._outstanding += 1
+            generation = self._generation
+        self._texts.put((generation, text, time.monotonic(), on_start))
+
+    def flush(self):
+        """
+        Drop all queued sentences and stop the current one (if a stop function was given).
+        """
+        with self._lock:
+            self._generation += 1
+        for pending in (self._texts, self._pending):
+            while True:
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Keep the shutdown marker.
+                    pending.put(None)
+                    break
+                if pending is self._pending:
+                    item[3].cancel()
+                self._done()
+        if self.stop_fn is not None:
+            self.stop_fn()
+
+    def wait_until_done(self, timeout=None) -> bool:
+        """
+        Block until every queued sentence has been played to its end or dropped.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            if not self._idle.wait_for(lambda: self._outstanding == 0, timeout):
+                return False
+        if self.wait_fn is None:
+            return True
+        # play_fn may return before the last sentence has finished; wait for the audio itself.
+        return self.wait_fn(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def close(self):
+        self.flush()
+        self._stopped = True
+        self._texts.put(None)
+        self._executor.shutdown(wait=False)
+
+    def _done(self):
+        with self._idle:
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._idle.notify_all()
+
+    def _is_current(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+    def _dispatch(self):
+        while True:
+            item = self._texts.get()
+            if item is None:
+                self._pending.put(None)
+                return
+            generation, text, queued_at, on_start = item
+            if not self._is_current(generation):
+                self._done()
+                continue
+            future = self._executor.submit(self.synthesize_fn, text)
+            # Blocks while queue_size sentences are waiting, which bounds how far synthesis runs ahead.
+            self._pending.put((generation, text, queued_at, future, on_start))
+
+    def _playback(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            generation, text, queued_at, future, on_start = item
+            try:
+                audio = future.result()
+                if self._is_current(generation) and not self._stopped:
+                    print(text)
+                    print("[TTS] Sentence started {:.3f} seconds after it was queued".format(
+                        time.monotonic() - queued_at))
+                    if on_start is not None:
+                        on_start(text)
+                    self.play_fn(audio, lambda: not self._is_current(generation))
+            except Exception as e:
+                print(f"Error in TTS: {e}")
+            finally:
+                self._done()
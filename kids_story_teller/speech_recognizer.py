@@ -1,20 +1,127 @@
+import threading
+import numpy as np
 import whisper
 import torch
 
+def _replace_linear_layers(module: torch.nn.Module):
+    """
+    Replace Whisper's Linear subclass with plain torch.nn.Linear modules sharing the same weights,
+    so that torch's dynamic quantization recognizes and converts them.
+    """
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+            linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+            linear.weight = child.weight
+            linear.bias = child.bias
+            setattr(module, name, linear)
+        else:
+            _replace_linear_layers(child)
+
 class SpeechRecognizer:
     """
     Uses the Whisper model to perform speech-to-text conversion.
+
+    Supported inference backends:
+      - "whisper": the openai-whisper package. On CPU, quantize="int8" applies dynamic int8
+        quantization to the model's linear layers.
+      - "faster-whisper": the CTranslate2-based faster-whisper runtime, where quantize="int8"
+        selects its int8 compute type. model_path is then a model size or a converted model directory.
     """
-    def __init__(self, model_path: str, language: str):
+    def __init__(self, model_path: str, language: str, backend="whisper", quantize="none",
+                 threads=0, interop_threads=0):
+        """
+        :param model_path: Whisper checkpoint path or model name.
+        :param language: Language code passed to the decoder.
+        :param backend: "whisper" or "faster-whisper".
+        :param quantize: "none" or "int8".
+        :param threads: Number of intra-op CPU threads (0 keeps the runtime default).
+        :param interop_threads: Number of torch inter-op threads (0 keeps the default).
+        """
+        self.language = language
+        self.backend = backend
+        self.quantize = quantize
+        # The model is shared by the streaming thread and the final pass; run one decode at a time.
+        self._lock = threading.Lock()
+
+        if threads > 0:
+            torch.set_num_threads(threads)
+        if interop_threads > 0:
+            try:
+                torch.set_num_interop_threads(interop_threads)
+            except RuntimeError as e:
+                # Can only be set before torch starts any inter-op parallel work.
+                print(f"Could not set torch inter-op threads: {e}")
+
         # Load the Whisper model from the specified path.
         print(model_path)
-        self.model = whisper.load_model(model_path)
-        self.language = language
+        if backend == "faster-whisper":
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError as e:
+                raise ImportError("faster-whisper is required for this backend. Please install it via 'pip install faster-whisper'") from e
+            self.model = WhisperModel(
+                model_path,
+                device="cpu",
+                compute_type="int8" if quantize == "int8" else "float32",
+                cpu_threads=threads
+            )
+        elif backend == "whisper":
+            self.model = whisper.load_model(model_path)
+            if quantize == "int8":
+                if self.model.device.type != "cpu":
+                    print("int8 quantization is only supported on CPU; keeping the full precision model.")
+                else:
+                    _replace_linear_layers(self.model)
+                    self.model = torch.quantization.quantize_dynamic(
+                        self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+                    )
+        else:
+            raise ValueError(f"Unknown speech recognition backend: {backend}")
+
+    def transcribe(self, waveform, initial_prompt=None, should_stop=None) -> dict:
+        """
+        Run Whisper on a waveform and return the full result, including timed segments.
+
+        :param waveform: Normalized float32 waveform sampled at 16 kHz.
+        :param initial_prompt: Optional text that precedes this audio, used as decoding context.
+        :param should_stop: Optional callable checked between decoded segments (faster-whisper
+                            decodes segment by segment); returning True ends the decode early with
+                            the segments decoded so far. The openai-whisper backend decodes in one
+                            call and only checks it before starting.
+        """
+        with self._lock:
+            if should_stop is not None and should_stop():
+                return {"text": "", "segments": []}
+            if self.backend == "faster-whisper":
+                segments, _ = self.model.transcribe(
+                    waveform, language=self.language, initial_prompt=initial_prompt
+                )
+                decoded = []
+                # faster-whisper decodes lazily, one segment per iteration.
+                for segment in segments:
+                    decoded.append({"start": segment.start, "end": segment.end, "text": segment.text})
+                    if should_stop is not None and should_stop():
+                        break
+                segments = decoded
+                return {"text": "".join(segment["text"] for segment in segments), "segments": segments}
+            return self.model.transcribe(
+                waveform,
+                language=self.language,
+                fp16=torch.cuda.is_available(),
+                initial_prompt=initial_prompt
+            )
+
+    def warm_up(self):
+        """
+        Run a synthetic inference on one second of silence so that the first real request
+        does not pay for lazy initialization. A numpy array is accepted by both backends.
+        """
+        self.transcribe(np.zeros(16000, dtype=np.float32))
 
     def speech_to_text(self, waveform) -> str:
         """
         Convert an audio waveform to text using the Whisper model.
         """
-        transcript = self.model.transcribe(waveform, language=self.language, fp16=torch.cuda.is_available())
+        transcript = self.transcribe(waveform)
         text = transcript.get("text", "")
-        return text 
\ No newline at end of file
+        return text
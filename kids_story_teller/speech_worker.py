@@ -0,0 +1,237 @@
+import itertools
+import multiprocessing
+import threading
+import numpy as np
+from multiprocessing import shared_memory
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to a segment created by the parent without taking over its cleanup.
+    """
+    try:
+        # Python 3.13+: do not register the segment with the resource tracker at all.
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Older versions always register it. A spawned worker shares the parent's resource
+        # tracker, whose registry is a set, so this is a no-op there and the parent's unlink()
+        # unregisters it. Unregistering it here would remove the parent's entry instead and make
+        # that unlink() fail in the tracker.
+        return shared_memory.SharedMemory(name=name)
+
+def _worker_main(conn, cancelled_up_to, model_path: str, language: str, options: dict):
+    """
+    Entry point of the worker process: load the model once, then serve transcription requests.
+
+    Messages received over the pipe:
+      ("transcribe", request_id, shm_name, sample_count, initial_prompt)
+      ("stop",)
+    Messages sent back:
+      ("ready",) or ("failed", error) once after loading
+      ("result", request_id, result_dict_or_None, error_or_None) for every transcribe request
+    cancelled_up_to is a shared request ID set by the parent: requests up to it are skipped if
+    they have not started, and a running decode stops at its next segment.
+    """
+    try:
+        # Imported here so that importing this module does not pull in Whisper.
+        from speech_recognizer import SpeechRecognizer
+        recognizer = SpeechRecognizer(model_path, language, **options)
+    except Exception as e:
+        conn.send(("failed", str(e)))
+        return
+    conn.send(("ready",))
+
+    while True:
+        message = conn.recv()
+        # Drain everything queued so that only the newest transcription request runs.
+        pending = [message]
+        while conn.poll():
+            pending.append(conn.recv())
+
+        latest = None
+        for message in pending:
+            kind = message[0]
+            if kind == "stop":
+                return
+            if kind == "transcribe":
+                if latest is not None:
+                    # Superseded by a newer request before it started.
+                    conn.send(("result", latest[1], None, "superseded"))
+                latest = message
+
+        if latest is None:
+            continue
+        _, request_id, shm_name, sample_count, initial_prompt = latest
+        should_stop = lambda: cancelled_up_to.value >= request_id
+        if should_stop():
+            conn.send(("result", request_id, None, "cancelled"))
+            continue
+
+        try:
+            shm = _attach_shared_memory(shm_name)
+            try:
+                waveform = np.ndarray((sample_count,), dtype=np.float32, buffer=shm.buf)
+                result = recognizer.transcribe(waveform, initial_prompt=initial_prompt, should_stop=should_stop)
+                # Only plain data goes back over the pipe.
+                result = {
+                    "text": result.get("text", ""),
+                    "segments": [
+                        {"start": s["start"], "end": s["end"], "text": s["text"]}
+                        for s in result.get("segments", [])
+                    ],
+                }
+                del waveform
+            finally:
+                shm.close()
+            if should_stop():
+                conn.send(("result", request_id, None, "cancelled"))
+            else:
+                conn.send(("result", request_id, result, None))
+        except Exception as e:
+            conn.send(("result", request_id, None, str(e)))
+
+class SpeechRecognizerProcess:
+    """
+    Hosts a SpeechRecognizer in a dedicated worker process so that Whisper's decode loop
+    does not compete with the pygame loop and the other threads for the GIL.
+
+    Audio is handed over through shared memory and results come back over a pipe. Each request
+    carries an ID; a newer request supersedes older ones that the worker has not started yet,
+    and callers of superseded or cancelled requests get an empty result. cancel() also stops a
+    decode that is already running, between segments with the faster-whisper backend (an
+    openai-whisper decode runs to its end once started).
+    The public interface matches SpeechRecognizer (transcribe / speech_to_text).
+    """
+    def __init__(self, model_path: str, language: str, **options):
+        """
+        :param model_path: Whisper checkpoint path or model name.
+        :param language: Language code passed to the decoder.
+        :param options: Extra keyword arguments for SpeechRecognizer (backend, quantize, threads, ...).
+        """
+        context = multiprocessing.get_context("spawn")
+        self._conn, worker_conn = context.Pipe()
+        # Highest cancelled request ID, read by the worker between segments.
+        self._cancelled_up_to = context.Value("q", 0)
+        self._process = context.Process(
+            target=_worker_main, args=(worker_conn, self._cancelled_up_to, model_path, language, options),
+            daemon=True
+        )
+        self._process.start()
+        worker_conn.close()
+
+        self.language = language
+        # Set once the worker has loaded the model (or failed to).
+        self.ready = threading.Event()
+        self.error = None
+
+        self._send_lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+        self._latest_request_id = 0
+        self._pending = {}  # request_id -> [Event, shared memory, result, error]
+        self._pending_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+
+    def wait_ready(self, timeout=None) -> bool:
+        """
+        Block until the worker has loaded the model. Returns False on timeout or load failure.
+        """
+        return self.ready.wait(timeout) and self.error is None
+
+    def _read_results(self):
+        while True:
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                if not self.ready.is_set():
+                    self.error = "speech worker exited"
+                    self.ready.set()
+                self._fail_all("speech worker exited")
+                return
+            kind = message[0]
+            if kind == "ready":
+                self.ready.set()
+            elif kind == "failed":
+                self.error = message[1]
+                self.ready.set()
+                print(f"Speech worker failed to load the model: {self.error}")
+            elif kind == "result":
+                _, request_id, result, error = message
+                with self._pending_lock:
+                    entry = self._pending.pop(request_id, None)
+                if entry is not None:
+                    entry[1].close()
+                    entry[1].unlink()
+                    entry[2], entry[3] = result, error
+                    entry[0].set()
+
+    def _fail_all(self, error: str):
+        with self._pending_lock:
+            entries = list(self._pending.values())
+            self._pending.clear()
+        for entry in entries:
+            entry[1].close()
+            entry[1].unlink()
+            entry[3] = error
+            entry[0].set()
+
+    def transcribe(self, waveform, initial_prompt=None) -> dict:
+        """
+        Transcribe a waveform in the worker process. Returns an empty result if the request
+        was superseded by a newer one or cancelled.
+        """
+        if not self.wait_ready():
+            raise RuntimeError(f"Speech worker is not available: {self.error}")
+
+        waveform = np.ascontiguousarray(waveform, dtype=np.float32)
+        # The segment is unlinked by the reader thread once the worker has answered.
+        shm = shared_memory.SharedMemory(create=True, size=max(1, waveform.nbytes))
+        np.ndarray(waveform.shape, dtype=np.float32, buffer=shm.buf)[:] = waveform
+
+        request_id = next(self._request_ids)
+        entry = [threading.Event(), shm, None, None]
+        with self._pending_lock:
+            self._pending[request_id] = entry
+            self._latest_request_id = request_id
+        with self._send_lock:
+            self._conn.send(("transcribe", request_id, shm.name, waveform.shape[0], initial_prompt))
+
+        entry[0].wait()
+        if entry[3] is not None:
+            if entry[3] not in ("superseded", "cancelled"):
+                print(f"Speech worker error: {entry[3]}")
+            return {"text": "", "segments": []}
+        return entry[2]
+
+    def warm_up(self):
+        """
+        Run a synthetic inference on one second of silence in the worker process.
+        """
+        self.transcribe(np.zeros(16000, dtype=np.float32))
+
+    def speech_to_text(self, waveform) -> str:
+        """
+        Convert an audio waveform to text using the worker's Whisper model.
+        """
+        return self.transcribe(waveform).get("text", "")
+
+    def cancel(self, request_id=None):
+        """
+        Cancel a request (by default the most recent one) and every older one. A request that has
+        not started is skipped; a running faster-whisper decode stops at its next segment.
+        """
+        request_id = request_id or self._latest_request_id
+        with self._cancelled_up_to.get_lock():
+            self._cancelled_up_to.value = max(self._cancelled_up_to.value, request_id)
+
+    def terminate(self):
+        """
+        Stop the worker process.
+        """
+        try:
+            with self._send_lock:
+                self._conn.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
@@ -1,12 +1,36 @@
-import os
-import tempfile
-import pygame
+import contextlib
+import time
 import torch
+import diffusers
 from diffusers import StableDiffusionPipeline
 
-class GenerationCancelledException(Exception):
-    """Exception to indicate that generation was cancelled due to a new request."""
-    pass
+from cache_store import MemoryLRU
+from image_cache import ImageCache
+from image_surface import pil_to_surface
+from latent_preview import latents_to_surface
+from response_cache import normalize_transcript
+
+# Scheduler names accepted in the configuration: diffusers class name and extra config.
+# "default" keeps the scheduler the model was saved with. "lcm" needs LCM weights (an LCM-distilled
+# model or an LCM-LoRA) and a diffusers release that provides LCMScheduler.
+SCHEDULERS = {
+    "dpm++": ("DPMSolverMultistepScheduler", {"algorithm_type": "dpmsolver++"}),
+    "dpm++-karras": ("DPMSolverMultistepScheduler", {"algorithm_type": "dpmsolver++", "use_karras_sigmas": True}),
+    "euler-a": ("EulerAncestralDiscreteScheduler", {}),
+    "euler": ("EulerDiscreteScheduler", {}),
+    "ddim": ("DDIMScheduler", {}),
+    "pndm": ("PNDMScheduler", {}),
+    "lcm": ("LCMScheduler", {}),
+}
+
+def cpu_supports_bf16() -> bool:
+    """
+    Check whether oneDNN has fast bfloat16 kernels on this CPU (AVX512-BF16 or AMX).
+    """
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
 
 class StableDiffusionImageGenerator:
     """
@@ -14,14 +38,48 @@ class StableDiffusionImageGenerator:
     
     Optimizations for Mac M2:
       - Uses the "mps" device if available.
-      - Generates lower resolution images (256 x 256) for faster inference.
-      - Runs fewer inference steps (20 steps) for quick image generation.
+      - Generates lower resolution images (256 x 256 by default) for faster inference.
+      - Runs fewer inference steps (20 by default) for quick image generation.
+    Few-step samplers (DPM-Solver++, Euler-a, LCM with LCM weights) can cut the step count further.
+
+    The "cpu-optimized" profile enables attention slicing, VAE slicing and tiling, channels-last
+    weights, bfloat16 autocast where the CPU supports it, explicit torch thread counts and,
+    optionally, torch.compile of the UNet. The time spent in each stage (text encoding, UNet loop,
+    VAE decoding) of the last image is kept in last_timings.
+
+    With preview_every set, a rough preview is made every few steps by projecting the latents to
+    RGB with a fixed linear map instead of running the VAE, and passed to the caller's preview
+    function so the picture can be shown while it develops.
+
+    Text-encoder embeddings of recent prompts are kept in an in-memory LRU, and finished images
+    can be kept in an ImageCache so that a repeated request does not run the model at all. Both
+    caches are keyed on the normalized prompt (lower case, no punctuation); the model itself
+    gets the prompt as given.
     """
-    def __init__(self, modelName="CompVis/stable-diffusion-v1-4", device=None):
+    def __init__(self, modelName="CompVis/stable-diffusion-v1-4", device=None, scheduler="default",
+                 steps=20, height=256, width=256, guidance_scale=7.5, seed=None, lcm_lora=None,
+                 profile="default", threads=0, interop_threads=0, bf16="auto", compile_unet=False,
+                 preview_every=0, embedding_cache_entries=32, image_cache=None):
         """
         :param modelName: Name of the pretrained Stable Diffusion model.
         :param device: Device to run the model on ("mps", "cuda", or "cpu"). If None,
                        the class automatically selects "mps" if available on Mac M2.
+        :param scheduler: Sampler name from SCHEDULERS, or "default" for the model's own scheduler.
+        :param steps: Number of inference steps.
+        :param height: Image height in pixels (a multiple of 8).
+        :param width: Image width in pixels (a multiple of 8).
+        :param guidance_scale: Classifier-free guidance scale (LCM works best around 1.0 - 2.0).
+        :param seed: Fixed seed for reproducible images, or None for a random one per image.
+        :param lcm_lora: Optional path or hub name of LCM-LoRA weights loaded into the pipeline.
+        :param profile: "default" or "cpu-optimized".
+        :param threads: Number of intra-op CPU threads (0 keeps the torch default; cpu-optimized only).
+        :param interop_threads: Number of torch inter-op threads (0 keeps the default; cpu-optimized only).
+        :param bf16: True, False or "auto" (use bfloat16 autocast if the CPU supports it; cpu-optimized only).
+        :param compile_unet: Compile the UNet with torch.compile (cpu-optimized only).
+        :param preview_every: Make a preview every this many steps (0 disables previews).
+        :param embedding_cache_entries: Number of prompt embeddings kept in memory (0 disables the cache).
+        :param image_cache: Optional ImageCache options (directory, memory_entries, disk_max_bytes)
+                            as a dict, or None to disable the image cache.
         """
         if device is None:
             if torch.backends.mps.is_available():
@@ -29,6 +87,8 @@ class StableDiffusionImageGenerator:
             else:
                 device = "cpu"
         self.device = device
+        self.model_name = modelName
+        self.lcm_lora = lcm_lora
         
         # Load the pipeline with half precision for non-CPU devices.
         self.pipe = StableDiffusionPipeline.from_pretrained(
@@ -37,75 +97,269 @@ class StableDiffusionImageGenerator:
             torch_dtype=torch.float16 if device != "cpu" else torch.float32,
             low_cpu_mem_usage=True
         )
+        if lcm_lora:
+            self.pipe.load_lora_weights(lcm_lora)
+        self._default_scheduler = self.pipe.scheduler
+        self._set_scheduler(scheduler)
+        self.steps = steps
+        self.height = height
+        self.width = width
+        self.guidance_scale = guidance_scale
+        self.seed = seed
+        self.preview_every = preview_every
+        self.embedding_cache = MemoryLRU(embedding_cache_entries)
+        self.embedding_hits = 0
+        self.embedding_misses = 0
+        self.image_cache = ImageCache(**image_cache) if image_cache is not None else None
+        self.bf16 = False
+        self.compile_unet = False
+        self.last_timings = {}
+        if profile == "cpu-optimized":
+            self._apply_cpu_profile(threads, interop_threads, bf16, compile_unet)
+        elif profile != "default":
+            raise ValueError(f"Unknown Stable Diffusion profile: {profile}")
         
         # Attributes for handling cancellation of ongoing requests.
         self.request_counter = 0   # Generates sequential tokens per request.
         self.current_token = None  # Token for the currently active request.
 
-    def _cancellation_callback(self, step, timestep, latents, token):
+    def _apply_cpu_profile(self, threads, interop_threads, bf16, compile_unet):
+        if threads > 0:
+            torch.set_num_threads(threads)
+        if interop_threads > 0:
+            try:
+                torch.set_num_interop_threads(interop_threads)
+            except RuntimeError as e:
+                # Can only be set before torch starts any inter-op parallel work.
+                print(f"Could not set torch inter-op threads: {e}")
+
+        # Compute attention and decode the VAE in slices: lower peak memory, friendlier to CPU caches.
+        self.pipe.enable_attention_slicing()
+        self.pipe.enable_vae_slicing()
+        if hasattr(self.pipe, "enable_vae_tiling"):
+            self.pipe.enable_vae_tiling()
+        # oneDNN convolutions are faster on NHWC tensors.
+        self.pipe.unet.to(memory_format=torch.channels_last)
+        self.pipe.vae.to(memory_format=torch.channels_last)
+
+        self.bf16 = cpu_supports_bf16() if bf16 == "auto" else bool(bf16)
+        if self.bf16 and not cpu_supports_bf16():
+            print("bfloat16 was requested but this CPU has no fast bfloat16 support.")
+
+        if compile_unet:
+            # Keep compiled kernels on disk so that later starts skip most of the compilation.
+            inductor_config = getattr(getattr(torch, "_inductor", None), "config", None)
+            if inductor_config is not None and hasattr(inductor_config, "fx_graph_cache"):
+                inductor_config.fx_graph_cache = True
+            self.pipe.unet = torch.compile(self.pipe.unet)
+            self.compile_unet = True
+        print("[SD] cpu-optimized profile: {} threads, bf16 {}, compiled UNet {}".format(
+            torch.get_num_threads(), self.bf16, self.compile_unet))
+
+    def _set_scheduler(self, name: str):
         """
-        Callback invoked during image generation to check for cancellation.
-        Raises a custom exception if a new request has overridden the current one.
+        Replace the pipeline's scheduler, keeping the model's noise schedule configuration.
+        """
+        self.scheduler = name
+        if name == "default":
+            self.pipe.scheduler = self._default_scheduler
+            return
+        if name not in SCHEDULERS:
+            raise ValueError(f"Unknown scheduler: {name}")
+        class_name, options = SCHEDULERS[name]
+        scheduler_class = getattr(diffusers, class_name, None)
+        if scheduler_class is None:
+            raise ValueError(f"Scheduler {name} needs a diffusers release that provides {class_name}")
+        self.pipe.scheduler = scheduler_class.from_config(self._default_scheduler.config, **options)
+
+    def _generator(self):
+        if self.seed is None:
+            return None
+        return torch.Generator(device="cpu").manual_seed(self.seed)
+
+    def warm_up(self):
+        """
+        Run a short generation so that the first real request does not pay for lazy kernel
+        initialization and allocator growth. The warm-up uses the configured size (and sampler and
+        precision), because kernels and allocations are specific to the input shape; one step is
+        enough, or two with a compiled UNet, whose graph is built on the first call.
+        """
+        steps = 2 if self.compile_unet else 1
+        self._run("", steps=steps, height=self.height, width=self.width, token=self.current_token)
+
+    def _cancellation_callback(self, step, timestep, latents, token, should_stop=None) -> bool:
+        """
+        Callback invoked after every step of image generation to check for cancellation.
+        Returns True if a new request has overridden the current one or should_stop() says so;
+        the denoising loop then ends at this step boundary.
         
         :param step: Current step of the diffusion process.
         :param timestep: Current timestep.
         :param latents: Current latent tensor.
         :param token: Token assigned to the current request.
+        :param should_stop: Optional callable returning True when the caller no longer wants the image.
+        """
+        return self.current_token != token or (should_stop is not None and should_stop())
+
+    def _encode_prompt(self, prompt: str, device, do_guidance: bool):
         """
-        if self.current_token != token:
-            raise GenerationCancelledException("Generation cancelled due to new request")
-            
-    def generate_image(self, prompt: str):
+        Text-encoder embeddings of the prompt, from the embedding cache when possible.
+        """
+        key = (normalize_transcript(prompt), do_guidance)
+        prompt_embeds = self.embedding_cache.get(key)
+        if prompt_embeds is not None:
+            self.embedding_hits += 1
+            return prompt_embeds
+        self.embedding_misses += 1
+        prompt_embeds = self.pipe._encode_prompt(prompt, device, 1, do_guidance)
+        self.embedding_cache.put(key, prompt_embeds)
+        return prompt_embeds
+
+    def _image_cache_key(self, prompt: str) -> str:
+        return ImageCache.key(
+            self.model_name, prompt, self.seed, self.steps, self.width, self.height, self.scheduler,
+            self.guidance_scale, self.lcm_lora
+        )
+
+    def cache_stats(self) -> dict:
+        return {
+            "embedding_hits": self.embedding_hits,
+            "embedding_misses": self.embedding_misses,
+            "image": self.image_cache.stats() if self.image_cache is not None else None,
+        }
+
+    def _autocast(self):
+        if self.bf16:
+            return torch.autocast("cpu", dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+
+    @torch.no_grad()
+    def _preview(self, output, preview_fn):
+        """
+        Pass a cheap preview of the current latents to preview_fn; returns the seconds it took.
+        Schedulers that estimate the final latents (pred_original_sample) give a less noisy preview.
+        """
+        start_time = time.perf_counter()
+        latents = getattr(output, "pred_original_sample", None)
+        if latents is None:
+            latents = output.prev_sample
+        preview_fn(latents_to_surface(latents[0].float().cpu().numpy()))
+        return time.perf_counter() - start_time
+
+    def _run(self, prompt: str, steps: int, height: int, width: int, token, preview_fn=None, should_stop=None):
+        """
+        Text encoding, denoising loop and VAE decoding, timed per stage.
+        The stages are the same as in StableDiffusionPipeline.__call__; they are run here so that
+        each one can be measured and cancellation can be checked after every step.
+        Previews are timed separately and not counted in the UNet time.
+        Returns None if the generation was cancelled.
+        """
+        pipe = self.pipe
+        device = pipe.device
+        do_guidance = self.guidance_scale > 1.0
+        timings = {}
+        with self._autocast():
+            start_time = time.perf_counter()
+            prompt_embeds = self._encode_prompt(prompt, device, do_guidance)
+            timings["text_encode"] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            generator = self._generator()
+            pipe.scheduler.set_timesteps(steps, device=device)
+            latents = pipe.prepare_latents(
+                1, pipe.unet.config.in_channels, height, width, pipe.unet.dtype, device, generator
+            )
+            extra_step_kwargs = pipe.prepare_extra_step_kwargs(generator, 0.0)
+            preview_time = 0.0
+            previews = 0
+            for step, timestep in enumerate(pipe.scheduler.timesteps):
+                model_input = torch.cat([latents] * 2) if do_guidance else latents
+                model_input = pipe.scheduler.scale_model_input(model_input, timestep)
+                noise_pred = pipe.unet(model_input, timestep, encoder_hidden_states=prompt_embeds).sample
+                if do_guidance:
+                    noise_uncond, noise_text = noise_pred.chunk(2)
+                    noise_pred = noise_uncond + self.guidance_scale * (noise_text - noise_uncond)
+                output = pipe.scheduler.step(noise_pred, timestep, latents, **extra_step_kwargs)
+                latents = output.prev_sample
+                if self._cancellation_callback(step, timestep, latents, token, should_stop):
+                    print("[SD] Generation cancelled after {} of {} steps".format(step + 1, steps))
+                    return None
+                if preview_fn is not None and self.preview_every > 0 and (step + 1) % self.preview_every == 0 \
+                        and step + 1 < steps:
+                    preview_time += self._preview(output, preview_fn)
+                    previews += 1
+            timings["unet_loop"] = time.perf_counter() - start_time - preview_time
+            timings["preview"] = preview_time
+            timings["unet_step"] = timings["unet_loop"] / max(1, steps)
+
+            start_time = time.perf_counter()
+            image = pipe.vae.decode(latents.to(pipe.vae.dtype) / pipe.vae.config.scaling_factor).sample
+            image = (image / 2 + 0.5).clamp(0, 1).cpu().permute(0, 2, 3, 1).float().numpy()
+            if pipe.safety_checker is not None:
+                image, _ = pipe.run_safety_checker(image, device, prompt_embeds.dtype)
+            timings["vae_decode"] = time.perf_counter() - start_time
+
+        timings["total"] = timings["text_encode"] + timings["unet_loop"] + timings["vae_decode"]
+        self.last_timings = timings
+        print("[SD] text encode {:.3f} s, UNet {:.3f} s ({:.3f} s/step), VAE decode {:.3f} s".format(
+            timings["text_encode"], timings["unet_loop"], timings["unet_step"], timings["vae_decode"]))
+        if previews:
+            print("[SD] {} previews, {:.4f} s each ({:.1%} of a step)".format(
+                previews, preview_time / previews, preview_time / previews / timings["unet_step"]))
+        return pipe.numpy_to_pil(image)[0]
+
+    def generate(self, prompt: str, preview_fn=None, should_stop=None):
         """
         Generate an image based on the given prompt.
         
         Optimizations: 
-         - Lower resolution (256 x 256) speeds up the image generation.
-         - Reduced number of inference steps (20).
+         - Lower resolution (256 x 256 by default) speeds up the image generation.
+         - Reduced number of inference steps (20 by default).
          - Employs a cancellation mechanism: if a new request starts,
            the previous one will be stopped.
          
         :param prompt: The text prompt.
-        :return: A pygame.Surface containing the generated image, or None if canceled or an error occurs.
+        :param preview_fn: Optional callable receiving a pygame.Surface preview every preview_every steps.
+        :param should_stop: Optional callable checked after every step; returning True cancels the image.
+        :return: A PIL image, or None if canceled or an error occurs.
         """
         # Generate a new token for the current request.
         self.request_counter += 1
         current_token = self.request_counter
         self.current_token = current_token
+
+        if self.image_cache is not None:
+            cache_key = self._image_cache_key(normalize_transcript(prompt))
+            image = self.image_cache.get(cache_key)
+            if image is not None:
+                print("[SD] Image cache hit, {}".format(self.cache_stats()))
+                return image
         
         try:
-            # Generate a low-resolution image with a cancellation callback.
-            generated = self.pipe(
-                prompt,
-                num_inference_steps=20,
-                height=256,
-                width=256,
-                callback=lambda step, timestep, latents: self._cancellation_callback(step, timestep, latents, current_token),
-                callback_steps=1
-            )
-        except GenerationCancelledException:
-            print("Image generation cancelled due to a new request.")
-            return None
+            # Generate a low-resolution image, checking for cancellation after every step.
+            image = self._run(prompt, self.steps, self.height, self.width, current_token, preview_fn, should_stop)
         except Exception as ex:
-            # If an exception occurs and either the token has changed or it's an IndexError, assume cancellation.
-            if self.current_token != current_token or isinstance(ex, IndexError):
-                print("Image generation cancelled due to a new request.")
-                return None
             print("Error generating image with Stable Diffusion:", ex)
             return None 
 
         # Verify that no new request has overridden this one.
-        if self.current_token != current_token:
+        if image is None or self.current_token != current_token:
+            print("Image generation cancelled due to a new request.")
             return None
-        
-        image = generated.images[0]
-        # Save the image to a temporary file so that it can be loaded via pygame.
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_file:
-                tmp_filename = tmp_file.name
-                image.save(tmp_filename)
-            # Load the image as a pygame surface.
-            pygame_image = pygame.image.load(tmp_filename)
-        finally:
-            os.unlink(tmp_filename)  # Remove the temporary file.
-        return pygame_image 
\ No newline at end of file
+        if self.image_cache is not None:
+            self.image_cache.put(cache_key, image)
+        return image
+
+    def generate_image(self, prompt: str, preview_fn=None, should_stop=None):
+        """
+        Generate an image based on the given prompt.
+
+        :param prompt: The text prompt.
+        :param preview_fn: Optional callable receiving a pygame.Surface preview every preview_every steps.
+        :param should_stop: Optional callable checked after every step; returning True cancels the image.
+        :return: A pygame.Surface containing the generated image, or None if canceled or an error occurs.
+        """
+        image = self.generate(prompt, preview_fn, should_stop)
+        if image is None:
+            return None
+        return pil_to_surface(image) 
\ No newline at end of file
@@ -0,0 +1,103 @@
+import threading
+import time
+
+class StreamingTranscriber:
+    """
+    Transcribes a recording incrementally while it is still being captured.
+
+    A background thread periodically decodes the audio captured since the last committed
+    point. Whisper segments that end well before the edge of the window are treated as
+    stable and committed, and the committed point moves past them. Consecutive windows
+    therefore overlap only in the uncommitted tail. When recording stops, only that tail
+    is decoded again, which keeps the release-to-text latency roughly independent of the
+    length of the utterance.
+    """
+    def __init__(self, recognizer, audio_source, sample_rate: int, interval_sec=1.0,
+                 min_window_sec=2.0, holdback_sec=1.0, partial_callback=None):
+        """
+        :param recognizer: SpeechRecognizer used for decoding (its transcribe() method).
+        :param audio_source: Callable returning the audio captured so far as a float32 array.
+        :param sample_rate: Sample rate of the audio, in Hz.
+        :param interval_sec: Time between background decodes.
+        :param min_window_sec: Minimum amount of uncommitted audio before a background decode runs.
+        :param holdback_sec: Segments ending within this distance from the end of the window
+                             are not committed yet, since later audio may still change them.
+        :param partial_callback: Optional callable receiving the partial transcript as it grows.
+        """
+        self.recognizer = recognizer
+        self.audio_source = audio_source
+        self.sample_rate = sample_rate
+        self.interval_sec = interval_sec
+        self.min_window_samples = int(min_window_sec * sample_rate)
+        self.holdback_sec = holdback_sec
+        self.partial_callback = partial_callback
+
+        self.committed_text = ""
+        self.committed_samples = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start decoding in the background.
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_sec):
+            try:
+                self._decode_window()
+            except Exception as e:
+                print(f"Streaming transcription failed: {e}")
+                return
+
+    def _decode_window(self):
+        audio = self.audio_source()
+        window = audio[self.committed_samples:]
+        if window.shape[0] < self.min_window_samples:
+            return
+
+        result = self.recognizer.transcribe(window, initial_prompt=self.committed_text or None)
+        segments = result.get("segments", [])
+        window_end = window.shape[0] / self.sample_rate
+
+        # Never commit the last segment: it may still be cut off mid-word.
+        stable = []
+        for segment in segments[:-1]:
+            if segment["end"] > window_end - self.holdback_sec:
+                break
+            stable.append(segment)
+
+        if stable:
+            self.committed_text += "".join(segment["text"] for segment in stable)
+            self.committed_samples += int(stable[-1]["end"] * self.sample_rate)
+
+        if self.partial_callback is not None:
+            tail = "".join(segment["text"] for segment in segments[len(stable):])
+            partial = (self.committed_text + tail).strip()
+            if partial:
+                self.partial_callback(partial)
+
+    def finish(self, waveform, preprocess_fn=None) -> str:
+        """
+        Stop background decoding and transcribe the uncommitted tail of the final recording.
+
+        :param waveform: The complete recording as returned by AudioRecorder.record_audio().
+        :param preprocess_fn: Optional callable applied to the tail before decoding (e.g. VAD trimming).
+        :return: The full transcript (committed text plus the decoded tail).
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+        start_time = time.time()
+        tail = waveform[self.committed_samples:]
+        if preprocess_fn is not None:
+            tail = preprocess_fn(tail)
+        tail_text = ""
+        if tail.shape[0] > 0:
+            tail_text = self.recognizer.transcribe(tail, initial_prompt=self.committed_text or None).get("text", "")
+        print("[Streaming] Final pass on {:.2f} of {:.2f} seconds took {:.3f} seconds".format(
+            tail.shape[0] / self.sample_rate, waveform.shape[0] / self.sample_rate, time.time() - start_time))
+        return self.committed_text + tail_text
@@ -0,0 +1,178 @@
+"""
+Text-to-speech backends.
+
+Every backend turns a text into a TTSAudio held in memory:
+- GTTSBackend: Google Text-to-Speech (MP3, needs network access). Install with:
+    pip install gTTS==2.2.3
+- EspeakBackend: espeak-ng run locally as a subprocess (16-bit PCM, works offline). Install with:
+    sudo apt-get install espeak-ng      (Linux)
+    brew install espeak-ng              (macOS)
+- FakeBackend: deterministic PCM without any engine, for tests.
+"""
+
+import io
+import math
+import shutil
+import struct
+import subprocess
+import time
+import wave
+
+class TTSAudio:
+    """
+    Synthesized speech held in memory.
+    For "pcm", data is signed 16-bit little-endian samples; for "mp3", the encoded file content.
+    """
+    def __init__(self, data: bytes, format: str, sample_rate=None, channels=1, duration=None):
+        self.data = data
+        self.format = format
+        self.sample_rate = sample_rate
+        self.channels = channels
+        # Length of the speech in seconds (None if unknown).
+        self.duration = duration
+        if duration is None and format == "pcm" and sample_rate:
+            self.duration = len(data) / (2 * channels * sample_rate)
+
+class TTSBackend:
+    """
+    Base class of the TTS backends. Subclasses implement _synthesize().
+
+    synthesize() records the synthesis latency and the real-time factor (synthesis time divided
+    by the duration of the produced speech; below 1 means faster than real time).
+    """
+    name = "base"
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.total_audio_seconds = 0.0
+        self.last_latency = None
+        self.last_rtf = None
+
+    def _synthesize(self, text: str) -> TTSAudio:
+        raise NotImplementedError
+
+    def synthesize(self, text: str) -> TTSAudio:
+        start_time = time.perf_counter()
+        audio = self._synthesize(text)
+        latency = time.perf_counter() - start_time
+        self.count += 1
+        self.total_seconds += latency
+        self.last_latency = latency
+        if audio.duration:
+            self.total_audio_seconds += audio.duration
+            self.last_rtf = latency / audio.duration
+        print("[TTS] {} synthesized {} characters in {:.3f} seconds (RTF {})".format(
+            self.name, len(text), latency, "{:.2f}".format(self.last_rtf) if audio.duration else "n/a"))
+        return audio
+
+    def metrics(self) -> dict:
+        return {
+            "backend": self.name,
+            "count": self.count,
+            "mean_latency": self.total_seconds / self.count if self.count else None,
+            "last_latency": self.last_latency,
+            "rtf": self.total_seconds / self.total_audio_seconds if self.total_audio_seconds else None,
+        }
+
+class GTTSBackend(TTSBackend):
+    """
+    Google Text-to-Speech. Returns MP3; every sentence is a network round trip.
+    """
+    name = "gtts"
+    # gTTS produces 32 kbit/s MP3, which gives the duration used for the real-time factor.
+    MP3_BITRATE = 32000
+
+    def __init__(self, lang="en", voice="co.uk"):
+        """
+        :param lang: Language of the speech.
+        :param voice: Top-level domain of the Google host; it selects the accent (e.g. "co.uk").
+        """
+        super().__init__()
+        try:
+            from gtts import gTTS
+        except ImportError as e:
+            raise ImportError("gTTS dependency is required. Please install it via 'pip install gTTS==2.2.3'") from e
+        self._gtts = gTTS
+        self.lang = lang
+        self.voice = voice
+
+    def _synthesize(self, text: str) -> TTSAudio:
+        buffer = io.BytesIO()
+        self._gtts(text=text, lang=self.lang, tld=self.voice).write_to_fp(buffer)
+        data = buffer.getvalue()
+        return TTSAudio(data, "mp3", duration=len(data) * 8 / self.MP3_BITRATE)
+
+class EspeakBackend(TTSBackend):
+    """
+    espeak-ng run as a local subprocess; the WAV it writes to stdout is decoded to PCM in memory.
+    """
+    name = "espeak"
+
+    def __init__(self, lang="en", voice="", speed=150, executable=None):
+        """
+        :param lang: Language of the speech, used as the voice if none is given.
+        :param voice: espeak-ng voice name (e.g. "en-gb", "en-us+f3").
+        :param speed: Speaking rate in words per minute.
+        :param executable: Path of the espeak-ng (or espeak) binary; searched on the PATH if omitted.
+        """
+        super().__init__()
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak")
+        if self.executable is None:
+            raise RuntimeError("espeak-ng is required for the espeak TTS backend. Please install it.")
+        self.lang = lang
+        self.voice = voice or lang
+        self.speed = speed
+
+    def _synthesize(self, text: str) -> TTSAudio:
+        result = subprocess.run(
+            [self.executable, "--stdout", "-v", self.voice, "-s", str(self.speed), text],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+        )
+        with wave.open(io.BytesIO(result.stdout), "rb") as wav:
+            frames = wav.readframes(wav.getnframes())
+            return TTSAudio(frames, "pcm", sample_rate=wav.getframerate(), channels=wav.getnchannels())
+
+class FakeBackend(TTSBackend):
+    """
+    Deterministic backend for tests: a quiet tone whose length depends only on the text.
+    """
+    name = "fake"
+
+    def __init__(self, lang="en", voice="", sample_rate=16000, seconds_per_char=0.05, delay=0.0):
+        """
+        :param lang: Ignored; accepted like the other backends.
+        :param voice: Ignored; accepted like the other backends.
+        :param sample_rate: Sample rate of the produced PCM.
+        :param seconds_per_char: Duration of speech produced per character.
+        :param delay: Seconds each synthesis takes, to simulate a slow engine.
+        """
+        super().__init__()
+        self.lang = lang
+        self.voice = voice
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.delay = delay
+        self.texts = []
+
+    def _synthesize(self, text: str) -> TTSAudio:
+        self.texts.append(text)
+        if self.delay:
+            time.sleep(self.delay)
+        count = int(len(text) * self.seconds_per_char * self.sample_rate)
+        samples = (int(1000 * math.sin(2 * math.pi * 440 * i / self.sample_rate)) for i in range(count))
+        return TTSAudio(struct.pack(f"<{count}h", *samples), "pcm", sample_rate=self.sample_rate)
+
+BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+def create_backend(name: str, **options) -> TTSBackend:
+    """
+    Create the backend registered under name ("gtts", "espeak" or "fake").
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend: {name}")
+    return BACKENDS[name](**options)
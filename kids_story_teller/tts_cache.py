@@ -0,0 +1,71 @@
+import json
+import threading
+
+from cache_store import TieredCache, cache_key
+from tts_backends import TTSAudio
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesized speech.
+
+    Entries are keyed by the hash of (text, voice, lang, backend) and kept in a TieredCache:
+    an in-memory LRU in front of a size-limited directory. precompute() synthesizes a list of
+    fixed phrases in the background so that they play without a synthesis round trip.
+    """
+    def __init__(self, directory=None, memory_entries=32, disk_max_bytes=100 * 1024 * 1024):
+        """
+        :param directory: Directory of the disk tier, or None to keep the cache in memory only.
+        :param memory_entries: Number of phrases kept in memory.
+        :param disk_max_bytes: Maximum total size of the disk tier.
+        """
+        self.cache = TieredCache(directory, memory_entries, disk_max_bytes, suffix=".tts")
+
+    @staticmethod
+    def key(text: str, backend) -> str:
+        return cache_key(text, backend.voice, backend.lang, backend.name)
+
+    def get(self, text: str, backend):
+        key = self.key(text, backend)
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        try:
+            header, audio = data.split(b"\n", 1)
+            return TTSAudio(audio, **json.loads(header))
+        except (ValueError, TypeError) as e:
+            # A truncated or corrupted entry is dropped and synthesized again like a miss.
+            print(f"[Cache] Dropping unreadable speech entry for '{text}': {e}")
+            self.cache.delete(key)
+            return None
+
+    def put(self, text: str, backend, audio: TTSAudio):
+        header = json.dumps({
+            "format": audio.format,
+            "sample_rate": audio.sample_rate,
+            "channels": audio.channels,
+            "duration": audio.duration,
+        }).encode("utf-8")
+        self.cache.put(self.key(text, backend), header + b"\n" + audio.data)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+    def precompute(self, texts, synthesize_fn):
+        """
+        Make sure every text is cached, in a background thread.
+
+        :param texts: Texts to synthesize (duplicates and empty texts are skipped).
+        :param synthesize_fn: Callable synthesizing (and caching) a text, e.g. TTSManager.synthesize.
+        :return: The started thread.
+        """
+        def run():
+            for text in dict.fromkeys(text for text in texts if text and text.strip()):
+                try:
+                    synthesize_fn(text)
+                except Exception as e:
+                    print(f"Failed to precompute speech for '{text}': {e}")
+            print("[TTS] Precomputed {} phrases, cache {}".format(len(texts), self.stats()))
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
@@ -1,44 +1,153 @@
 """
-TTS Manager using gTTS.
+TTS Manager.
 
 Dependencies:
-- gTTS: Google Text-to-Speech. Recommended version: gTTS==2.2.3. Install with:
-    pip install gTTS==2.2.3
-- playsound: Recommended version: playsound==1.2.2. Install with:
+- A TTS backend from tts_backends (gTTS by default, or the local espeak-ng engine).
+- pygame (mixer) for playback from memory through a MixerPlayer.
+- playsound, only when no player is given: Recommended version: playsound==1.2.2. Install with:
     pip install playsound==1.2.2
 
-This module uses the gTTS library to synthesize speech from text and plays the generated audio.
-It attempts to mimic a male voice by specifying the 'tld' parameter as 'co.uk', although the gender cannot be explicitly controlled.
+This module synthesizes speech from text with the configured backend and plays the generated audio.
+With gTTS it attempts to mimic a male voice by using 'co.uk' as the voice (the 'tld' parameter),
+although the gender cannot be explicitly controlled.
 """
 
-try:
-    from gtts import gTTS
-except ImportError as e:
-    raise ImportError("gTTS dependency is required. Please install it via 'pip install gTTS==2.2.3'") from e
-
 import tempfile
-import os
+import wave
 
-try:
-    from playsound import playsound
-except ImportError as e:
-    raise ImportError("playsound dependency is required. Please install it via 'pip install playsound==1.2.2'") from e
+from speech_pipeline import SpeechPipeline
+from tts_backends import TTSAudio, TTSBackend, create_backend
 
 class TTSManager:
     """
-    Text-to-Speech manager using gTTS for converting text to speech.
-    Attempts to use a male voice by specifying the 'tld' parameter as 'co.uk' to hint at a British accent.
+    Text-to-Speech manager converting text to speech with a pluggable backend.
+
+    speak() synthesizes and plays a text before returning. speak_async() queues it on a
+    SpeechPipeline instead, so that the next sentence is synthesized while the current one plays.
     """
+    def __init__(self, backend="gtts", lang="en", voice="co.uk", queue_size=2, synthesis_workers=1, cache=None,
+                 player=None):
+        """
+        :param backend: Backend name ("gtts", "espeak" or "fake") or a TTSBackend instance.
+        :param lang: Language of the speech.
+        :param voice: Backend-specific voice (the Google domain for gTTS, a voice name for espeak-ng).
+        :param queue_size: Number of sentences synthesized ahead of playback by speak_async().
+        :param synthesis_workers: Number of threads synthesizing queued sentences.
+        :param cache: Optional TTSCache consulted before synthesizing.
+        :param player: Optional MixerPlayer playing audio from memory; without one, playsound plays
+                       each sentence from a temporary file.
+        """
+        if not isinstance(backend, TTSBackend):
+            backend = create_backend(backend, lang=lang, voice=voice)
+        self.backend = backend
+        self.cache = cache
+        self.player = player
+        self.pipeline = SpeechPipeline(
+            self.synthesize, self.play, stop_fn=self.stop, wait_fn=self.wait,
+            queue_size=queue_size, workers=synthesis_workers
+        )
+
+    def synthesize(self, text: str) -> TTSAudio:
+        """
+        Convert text to audio with the configured backend, or take it from the cache.
+        """
+        if self.cache is None:
+            return self.backend.synthesize(text)
+        audio = self.cache.get(text, self.backend)
+        if audio is None:
+            audio = self.backend.synthesize(text)
+            self.cache.put(text, self.backend, audio)
+        return audio
+
+    def precompute(self, texts):
+        """
+        Synthesize and cache the given phrases in the background (no-op without a cache).
+        """
+        if self.cache is not None:
+            return self.cache.precompute(list(texts), self.synthesize)
+
+    def play(self, audio: TTSAudio, cancelled=None):
+        """
+        Play synthesized audio. Blocks until playback has finished (with a player: until it is
+        about to finish, so that the next sentence follows without a gap).
+
+        :param cancelled: Optional callable returning True if the audio must no longer be started.
+        """
+        if self.player is not None:
+            self.player.play(audio, cancelled)
+            return
+        if cancelled is not None and cancelled():
+            return
+
+        try:
+            from playsound import playsound
+        except ImportError as e:
+            raise ImportError("playsound dependency is required. Please install it via 'pip install playsound==1.2.2'") from e
+        # playsound needs a file to play from.
+        suffix = ".mp3" if audio.format == "mp3" else ".wav"
+        with tempfile.NamedTemporaryFile(delete=True, suffix=suffix) as fp:
+            if audio.format == "mp3":
+                fp.write(audio.data)
+            else:
+                with wave.open(fp, "wb") as wav:
+                    wav.setnchannels(audio.channels)
+                    wav.setsampwidth(2)
+                    wav.setframerate(audio.sample_rate)
+                    wav.writeframes(audio.data)
+            fp.flush()
+            playsound(fp.name)
+
     def speak(self, text: str):
         """
-        Convert text to speech using gTTS with a male voice heuristic, print the text, and play the generated audio.
+        Convert text to speech, print the text, and play the generated audio.
         """
         print(text)
         try:
-            # Create a temporary MP3 file for the speech output.
-            with tempfile.NamedTemporaryFile(delete=True, suffix=".mp3") as fp:
-                tts = gTTS(text=text, lang='en', tld='co.uk')
-                tts.save(fp.name)
-                playsound(fp.name)
+            self.play(self.synthesize(text))
+            if self.player is not None:
+                self.player.wait()
         except Exception as e:
-            print(f"Error in TTS: {e}")
\ No newline at end of file
+            print(f"Error in TTS: {e}")
+
+    def stop(self):
+        """
+        Interrupt the sentence being played (only possible with a player).
+        """
+        if self.player is not None:
+            self.player.stop()
+
+    def wait(self, timeout=None) -> bool:
+        """
+        Block until the sentence being played has ended (playsound already blocks until then).
+        """
+        if self.player is not None:
+            return self.player.wait(timeout)
+        return True
+
+    def duck(self):
+        if self.player is not None:
+            self.player.duck()
+
+    def restore(self):
+        if self.player is not None:
+            self.player.restore()
+
+    def speak_async(self, text: str, on_start=None):
+        """
+        Queue text for speaking and return immediately.
+
+        :param on_start: Optional callable receiving the text when it starts playing (e.g. to show it).
+        """
+        self.pipeline.enqueue(text, on_start)
+
+    def flush(self):
+        """
+        Drop the sentences queued by speak_async() that have not started playing yet.
+        """
+        self.pipeline.flush()
+
+    def wait_until_done(self, timeout=None) -> bool:
+        return self.pipeline.wait_until_done(timeout)
+
+    def metrics(self) -> dict:
+        return self.backend.metrics()
@@ -0,0 +1,135 @@
+import time
+import numpy as np
+
+class VoiceActivityDetector:
+    """
+    Energy-based voice activity detection used to shorten recordings before transcription.
+
+    The waveform is split into short frames whose RMS energy is computed in one vectorized
+    pass. Frames above the threshold count as speech. Leading and trailing silence is trimmed
+    and long internal pauses are collapsed, because Whisper's cost grows with audio length.
+    """
+    def __init__(self, sample_rate: int, threshold=0.02, frame_ms=30, padding_ms=200, max_pause_ms=600):
+        """
+        :param sample_rate: Sample rate of the waveform, in Hz.
+        :param threshold: Normalized RMS energy above which a frame counts as speech.
+        :param frame_ms: Frame length used for the energy analysis, in milliseconds.
+        :param padding_ms: Audio kept around each speech region so word onsets and endings are not cut.
+        :param max_pause_ms: Internal pauses longer than this are shortened to this length.
+                             Use 0 to keep internal pauses untouched.
+        """
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000))
+        self.padding_frames = int(padding_ms / frame_ms)
+        self.max_pause_frames = int(max_pause_ms / frame_ms)
+        # Statistics of the most recent trim() call.
+        self.last_stats = {"input_seconds": 0.0, "output_seconds": 0.0, "removed_seconds": 0.0}
+
+    def frame_energies(self, waveform: np.ndarray) -> np.ndarray:
+        """
+        Return the normalized RMS energy of every full frame of the waveform.
+        """
+        frame_count = waveform.shape[0] // self.frame_size
+        frames = waveform[:frame_count * self.frame_size].reshape(frame_count, self.frame_size)
+        # einsum computes the per-frame sum of squares without materializing frames ** 2.
+        return np.sqrt(np.einsum("ij,ij->i", frames, frames) / self.frame_size)
+
+    def _keep_mask(self, voiced: np.ndarray) -> np.ndarray:
+        """
+        Build the per-frame mask of frames to keep: speech plus padding, with long pauses shortened.
+        """
+        keep = voiced.copy()
+        if self.padding_frames > 0:
+            window = np.ones(2 * self.padding_frames + 1, dtype=np.int32)
+            keep = np.convolve(voiced.astype(np.int32), window, mode="same") > 0
+
+        voiced_idx = np.flatnonzero(voiced)
+        first, last = voiced_idx[0], voiced_idx[-1]
+        # Drop everything outside the (padded) speech span.
+        keep[:max(0, first - self.padding_frames)] = False
+        keep[last + self.padding_frames + 1:] = False
+
+        if self.max_pause_frames > 0:
+            # Locate runs of dropped-candidate frames inside the speech span and cap their length.
+            gaps = np.diff(np.concatenate(([1], keep[first:last + 1].astype(np.int8), [1])))
+            gap_starts = np.flatnonzero(gaps == -1) + first
+            gap_ends = np.flatnonzero(gaps == 1) + first
+            for start, end in zip(gap_starts, gap_ends):
+                if end - start > self.max_pause_frames:
+                    # Keep the beginning of the pause so the transcript still sees a break.
+                    keep[start:start + self.max_pause_frames] = True
+                else:
+                    keep[start:end] = True
+        return keep
+
+    def trim(self, waveform: np.ndarray) -> np.ndarray:
+        """
+        Remove leading/trailing silence and collapse long pauses.
+
+        :param waveform: Normalized float32 waveform.
+        :return: The shortened waveform. When only the edges are trimmed this is a view of the
+                 input; an empty array is returned if no speech was detected.
+        """
+        input_seconds = waveform.shape[0] / self.sample_rate
+        energies = self.frame_energies(waveform)
+        voiced = energies >= self.threshold
+        if not voiced.any():
+            trimmed = waveform[:0]
+        else:
+            keep = self._keep_mask(voiced)
+            kept_idx = np.flatnonzero(keep)
+            start = kept_idx[0] * self.frame_size
+            end = (kept_idx[-1] + 1) * self.frame_size
+            if kept_idx[-1] == energies.shape[0] - 1:
+                # Include the partial frame at the end of the buffer.
+                end = waveform.shape[0]
+            if kept_idx.shape[0] == kept_idx[-1] - kept_idx[0] + 1:
+                # Only the edges were trimmed: return a view without copying.
+                trimmed = waveform[start:end]
+            else:
+                sample_mask = np.repeat(keep, self.frame_size)
+                sample_mask = np.concatenate(
+                    (sample_mask, np.full(waveform.shape[0] - sample_mask.shape[0], keep[-1]))
+                )
+                trimmed = waveform[sample_mask]
+
+        output_seconds = trimmed.shape[0] / self.sample_rate
+        self.last_stats = {
+            "input_seconds": input_seconds,
+            "output_seconds": output_seconds,
+            "removed_seconds": input_seconds - output_seconds,
+        }
+        print("[VAD] Removed {:.2f} of {:.2f} seconds of audio".format(
+            self.last_stats["removed_seconds"], input_seconds))
+        return trimmed
+
+class SilenceAutoStop:
+    """
+    Tracks per-chunk RMS energy during a recording and reports when the speaker has gone quiet.
+    Used to end recordings automatically (hands-free mode).
+    """
+    def __init__(self, threshold=0.02, silence_ms=1000, no_speech_timeout_ms=5000):
+        """
+        :param threshold: Normalized RMS energy above which a chunk counts as speech.
+        :param silence_ms: Silence after speech that ends the recording, in milliseconds.
+        :param no_speech_timeout_ms: End the recording if no speech is heard at all within this time.
+        """
+        self.threshold = threshold
+        self.silence_seconds = silence_ms / 1000.0
+        self.no_speech_timeout = no_speech_timeout_ms / 1000.0
+        self.started_at = time.monotonic()
+        self.last_voiced_at = None
+
+    def observe(self, rms: float):
+        """
+        Feed the RMS energy of the latest chunk (e.g. from AudioRecorder's energy callback).
+        """
+        if rms >= self.threshold:
+            self.last_voiced_at = time.monotonic()
+
+    def should_stop(self) -> bool:
+        now = time.monotonic()
+        if self.last_voiced_at is None:
+            return now - self.started_at >= self.no_speech_timeout
+        return now - self.last_voiced_at >= self.silence_seconds
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+# The application modules import each other by module name, so put the package directory on the path.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "kids_story_teller"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Run pygame headless; must be set before pygame opens a display.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+@pytest.fixture
+def start_fake_ollama():
+    """
+    Factory that starts a FakeOllamaServer with the given keyword arguments, for tests that need
+    several servers. Every server it started is stopped after the test.
+    """
+    from fake_ollama_server import FakeOllamaServer
+    started = []
+    def start(**kwargs):
+        fake = FakeOllamaServer(**kwargs).start()
+        started.append(fake)
+        return fake
+    yield start
+    for fake in started:
+        fake.stop()
+
+@pytest.fixture
+def fake_ollama(request, start_fake_ollama):
+    """
+    A running FakeOllamaServer. Pass keyword arguments for it with indirect parametrization:
+    @pytest.mark.parametrize("fake_ollama", [{"token_delay": 0.05}], indirect=True)
+    """
+    return start_fake_ollama(**getattr(request, "param", {}))
+
+@pytest.fixture
+def pygame_display(request):
+    """
+    Initialize pygame with a headless display and yield the screen; quit pygame afterwards.
+    The window size can be given with indirect parametrization (default 400 x 300).
+    """
+    pygame = pytest.importorskip("pygame")
+    pygame.init()
+    screen = pygame.display.set_mode(getattr(request, "param", (400, 300)))
+    pygame.event.clear()
+    yield screen
+    pygame.quit()
@@ -0,0 +1,137 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class _FakeOllamaHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so that clients can keep connections alive between requests.
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Like Ollama's Go server, send each small NDJSON chunk immediately (no Nagle delay).
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # setup() runs once per TCP connection.
+        with self.server.fake.lock:
+            self.server.fake.connection_count += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        # Health probe (/api/version).
+        fake = self.server.fake
+        with fake.lock:
+            fake.probe_count += 1
+        status = fake.fail_status or 200
+        body = json.dumps({"version": "0.0.0-fake"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        with fake.lock:
+            fake.request_count += 1
+            fake.payloads.append(payload)
+
+        if fake.first_token_delay:
+            time.sleep(fake.first_token_delay)
+        if fake.fail_status:
+            body = json.dumps({"error": "injected failure"}).encode()
+            self.send_response(fake.fail_status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        if not payload.get("stream", True):
+            body = json.dumps({"model": payload.get("model"), "response": fake.summary, "done": True}).encode()
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        tokens = fake.tokens
+        if payload.get("prompt") == fake.summary_prompt:
+            # A streamed summary request gets the summary, one word per chunk.
+            tokens = [word + " " for word in fake.summary.split()]
+        try:
+            for index, token in enumerate(tokens):
+                if fake.drop_after is not None and index >= fake.drop_after:
+                    # Simulate a backend crash: end the connection without finishing the stream.
+                    self.close_connection = True
+                    return
+                if fake.token_delay:
+                    time.sleep(fake.token_delay)
+                self._write_chunk({"response": token, "done": False})
+            self._write_chunk({"response": "", "done": True, "context": fake.context})
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client cancelled the stream and closed the connection.
+            with fake.lock:
+                fake.aborted_count += 1
+            self.close_connection = True
+
+    def _write_chunk(self, body: dict):
+        data = (json.dumps(body) + "\n").encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+class FakeOllamaServer:
+    """
+    Local NDJSON server that mimics Ollama's streaming /api/generate endpoint.
+
+    It counts TCP connections and requests so tests can check connection reuse,
+    and token_delay slows the stream down to exercise cancellation and timeouts.
+    first_token_delay adds latency before the response starts, fail_status answers every
+    request with that HTTP status, and drop_after closes the stream after that many tokens.
+    Requests whose prompt is summary_prompt are answered with summary instead of tokens.
+    """
+    def __init__(self, tokens=None, token_delay=0.0, context=None, summary="",
+                 first_token_delay=0.0, fail_status=None, drop_after=None,
+                 summary_prompt="Summarize the story so far in a few sentences."):
+        self.tokens = tokens if tokens is not None else ["<think>", "</think>", "Once", " upon", " a", " time", "."]
+        self.token_delay = token_delay
+        self.context = context if context is not None else [1, 2, 3]
+        # Text returned for non-streamed requests (warm-up and summaries).
+        self.summary = summary
+        self.summary_prompt = summary_prompt
+        self.first_token_delay = first_token_delay
+        self.fail_status = fail_status
+        self.drop_after = drop_after
+        self.probe_count = 0
+        self.lock = threading.Lock()
+        self.connection_count = 0
+        self.request_count = 0
+        self.aborted_count = 0
+        self.payloads = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOllamaHandler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/api/generate"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
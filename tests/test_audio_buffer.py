@@ -0,0 +1,68 @@
+import numpy as np
+
+from audio_buffer import CaptureBuffer, PreRollBuffer
+
+def test_int16_chunks_are_scaled_to_float32():
+    buffer = CaptureBuffer(16000, initial_seconds=1)
+    rms = buffer.write(np.array([16384, -16384, 0, 32767], dtype=np.int16).tobytes())
+
+    samples = buffer.view()
+    assert samples.dtype == np.float32
+    assert np.allclose(samples, [0.5, -0.5, 0.0, 32767 / 32768])
+    assert np.isclose(rms, np.sqrt(np.mean(samples ** 2)))
+
+def test_buffer_doubles_when_a_recording_outgrows_it():
+    buffer = CaptureBuffer(10, initial_seconds=1)
+    chunk = np.arange(7, dtype=np.int16)
+    for _ in range(3):
+        buffer.write_samples(chunk)
+
+    assert len(buffer) == 21
+    assert buffer.capacity == 40
+    assert np.allclose(buffer.view(), np.tile(chunk, 3) / 32768)
+
+def test_taken_view_survives_reset():
+    buffer = CaptureBuffer(10, initial_seconds=1)
+    buffer.write_samples(np.full(5, 1000, dtype=np.int16))
+    taken = buffer.take()
+
+    buffer.reset()
+    buffer.write_samples(np.full(5, -1000, dtype=np.int16))
+
+    assert len(buffer) == 5
+    assert np.allclose(taken, 1000 / 32768)
+
+def test_buffer_is_reused_when_nothing_was_taken():
+    buffer = CaptureBuffer(10, initial_seconds=1)
+    buffer.write_samples(np.ones(5, dtype=np.int16))
+    data = buffer.view().base
+
+    buffer.reset()
+    assert len(buffer) == 0
+    assert buffer.view().base is data
+
+def test_pre_roll_keeps_the_latest_audio_in_order():
+    ring = PreRollBuffer(1000, duration_ms=5)
+    ring.write_samples(np.array([1, 2, 3], dtype=np.int16))
+    ring.write_samples(np.array([4, 5, 6, 7], dtype=np.int16))
+
+    capture = CaptureBuffer(1000, initial_seconds=1)
+    ring.drain_into(capture)
+    assert np.allclose(capture.view() * 32768, [3, 4, 5, 6, 7])
+    assert len(ring) == 0
+
+def test_pre_roll_chunk_longer_than_the_ring_keeps_its_end():
+    ring = PreRollBuffer(1000, duration_ms=3)
+    ring.write_samples(np.array([1, 2, 3, 4, 5], dtype=np.int16))
+
+    capture = CaptureBuffer(1000, initial_seconds=1)
+    ring.drain_into(capture)
+    assert np.allclose(capture.view() * 32768, [3, 4, 5])
+
+def test_partly_filled_pre_roll_drains_what_it_has():
+    ring = PreRollBuffer(1000, duration_ms=5)
+    ring.write_samples(np.array([1, 2], dtype=np.int16))
+
+    capture = CaptureBuffer(1000, initial_seconds=1)
+    ring.drain_into(capture)
+    assert np.allclose(capture.view() * 32768, [1, 2])
@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from audio_player import MixerPlayer, pcm_to_mixer_samples
+from tts_backends import FakeBackend
+
+def test_pcm_is_resampled_and_duplicated_to_mixer_format():
+    pcm = np.array([0, 100, 200, 300], dtype=np.int16).tobytes()
+    samples = pcm_to_mixer_samples(pcm, 8000, 1, 16000, 2)
+
+    assert samples.shape == (8, 2)
+    assert samples.dtype == np.int16
+    assert list(samples[:, 0]) == [0, 50, 100, 150, 200, 250, 300, 300]
+    assert (samples[:, 0] == samples[:, 1]).all()
+
+@pytest.fixture
+def player():
+    try:
+        pygame.mixer.init(frequency=16000, size=-16, channels=1)
+    except pygame.error as e:
+        pytest.skip(f"No audio device: {e}")
+    yield MixerPlayer(lead_time=0.05)
+    pygame.mixer.quit()
+
+def test_consecutive_sentences_are_queued_without_gap(player):
+    backend = FakeBackend(seconds_per_char=0.02)
+    first, second = backend.synthesize("0123456789"), backend.synthesize("0123456789")
+    start = time.monotonic()
+    player.play(first)
+    player.play(second)
+    player.wait()
+
+    assert time.monotonic() - start == pytest.approx(0.4, abs=0.1)
+    assert player.last_start_latency < 0.1
+
+def test_stop_interrupts_playback(player):
+    audio = FakeBackend(seconds_per_char=0.1).synthesize("0123456789")
+    start = time.monotonic()
+    threading.Timer(0.1, player.stop).start()
+    player.play(audio)
+
+    assert time.monotonic() - start < 0.5
+    assert not player.channel.get_busy()
+
+def test_duck_and_restore_volume(player):
+    player.set_volume(0.8)
+    player.duck()
+    assert player.channel.get_volume() == pytest.approx(0.8 * 0.3, abs=0.01)
+    player.restore()
+    assert player.channel.get_volume() == pytest.approx(0.8, abs=0.01)
+
+def test_cancelled_sound_is_not_started(player):
+    audio = FakeBackend(seconds_per_char=0.1).synthesize("0123456789")
+    start = time.monotonic()
+    player.play(audio, cancelled=lambda: True)
+
+    assert time.monotonic() - start < 0.1
+    assert not player.channel.get_busy()
+
+def test_earlier_stop_does_not_skip_the_next_sound(player):
+    player.stop()
+    player.play(FakeBackend(seconds_per_char=0.01).synthesize("0123456789"), cancelled=lambda: False)
+
+    assert player.last_start_latency is not None
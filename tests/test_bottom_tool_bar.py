@@ -0,0 +1,47 @@
+import pytest
+
+pygame = pytest.importorskip("pygame")
+pytest.importorskip("pygame_gui")
+
+from bottom_tool_bar import BottomToolBar
+
+@pytest.fixture
+def toolbar(pygame_display):
+    return BottomToolBar(400, 300), pygame_display
+
+def test_steady_state_frame_creates_no_surfaces(toolbar, monkeypatch):
+    bar, screen = toolbar
+    bar.set_message("Give me 10 seconds to think a story for you about a dragon")
+    bar.draw(screen, 0.0)
+    toolbar_surface = bar.surface
+    layout = bar._message_layout(bar.message)
+
+    monkeypatch.setattr(bar, "font", None)  # Rendering text again would fail.
+    for _ in range(3):
+        bar.draw(screen, 0.0)
+
+    assert bar.surface is toolbar_surface
+    assert bar._message_layout(bar.message) is layout
+
+def test_layout_is_recomputed_when_the_message_changes(toolbar):
+    bar, screen = toolbar
+    bar.set_message("Once upon a time there was a dragon")
+    bar.draw(screen, 0.0)
+    first = bar._message_layout(bar.message)
+
+    bar.set_message("The end")
+    bar.draw(screen, 0.0)
+    second = bar._message_layout(bar.message)
+
+    assert len(first) == 2 and len(second) == 1
+    # Switching back reuses the cached lines.
+    assert bar._message_layout("Once upon a time there was a dragon") is first
+
+def test_button_images_are_reused(toolbar):
+    bar, screen = toolbar
+    bar.draw(screen, 0.0)
+    image = bar.left_button.image
+
+    bar.draw(screen, 0.0)
+    assert bar.left_button.image is image
+    assert image is bar.left_button.state_images["normal"]
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pygame")
+
+from diffusion_worker import DiffusionWorker
+
+class FakeGenerator:
+    """
+    Takes steps * step_seconds per image and checks should_stop between steps.
+    """
+    def __init__(self, steps=20, step_seconds=0.01):
+        self.steps = steps
+        self.step_seconds = step_seconds
+        self.started = []
+        self.steps_run = {}
+        self.first_started = threading.Event()
+
+    def __call__(self, prompt, should_stop):
+        self.started.append(prompt)
+        self.first_started.set()
+        for step in range(self.steps):
+            time.sleep(self.step_seconds)
+            self.steps_run[prompt] = step + 1
+            if should_stop():
+                return None
+        return f"image of {prompt}"
+
+def test_newest_prompt_wins():
+    generator = FakeGenerator()
+    results = []
+    worker = DiffusionWorker(generator, result_fn=lambda prompt, image: results.append(image))
+
+    worker.submit("first")
+    generator.first_started.wait(1)
+    for prompt in ("second", "third", "fourth"):
+        worker.submit(prompt)
+    assert worker.wait_until_idle(5)
+
+    # "second" and "third" never started; "first" stopped early.
+    assert generator.started == ["first", "fourth"]
+    assert generator.steps_run["first"] < generator.steps
+    assert results == ["image of fourth"]
+    metrics = worker.metrics()
+    assert metrics["submitted"] == 4
+    assert metrics["coalesced"] == 2
+    assert metrics["cancelled"] == 1
+    assert metrics["completed"] == 1
+    assert metrics["queue_depth"] == 0
+    assert metrics["cancelled_seconds"] > 0
+    worker.close()
+
+def test_wait_time_is_measured():
+    generator = FakeGenerator(steps=5, step_seconds=0.02)
+    worker = DiffusionWorker(generator)
+
+    worker.submit("first")
+    generator.first_started.wait(1)
+    assert worker.queue_depth == 1
+    worker.submit("second")
+    assert worker.queue_depth == 2
+    assert worker.wait_until_idle(5)
+
+    # "second" waited for "first" to reach its next step boundary.
+    assert worker.last_wait > 0
+    assert worker.metrics()["mean_wait"] is not None
+    worker.close()
+
+def test_cancel_stops_the_running_job_without_a_result():
+    generator = FakeGenerator(steps=100)
+    results = []
+    worker = DiffusionWorker(generator, result_fn=lambda prompt, image: results.append(image))
+
+    worker.submit("first")
+    generator.first_started.wait(1)
+    worker.cancel()
+    assert worker.wait_until_idle(5)
+
+    assert results == []
+    assert worker.cancelled == 1
+    assert generator.steps_run["first"] < generator.steps
+    worker.close()
+
+def test_failures_are_counted_and_the_worker_keeps_running():
+    calls = []
+
+    def generate(prompt, should_stop):
+        calls.append(prompt)
+        if prompt == "bad":
+            raise RuntimeError("boom")
+        return prompt
+
+    results = []
+    worker = DiffusionWorker(generate, result_fn=lambda prompt, image: results.append(image))
+    worker.submit("bad")
+    assert worker.wait_until_idle(5)
+    worker.submit("good")
+    assert worker.wait_until_idle(5)
+
+    assert worker.failed == 1
+    assert results == ["good"]
+    worker.close()
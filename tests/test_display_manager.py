@@ -0,0 +1,62 @@
+import pytest
+
+pygame = pytest.importorskip("pygame")
+pytest.importorskip("pygame_gui")
+from PIL import Image
+
+from display_manager import DisplayManager
+from image_surface import pil_to_surface
+
+@pytest.fixture
+def display(pygame_display):
+    return DisplayManager(400, 300)
+
+def test_pil_image_becomes_surface_with_same_pixels():
+    image = Image.new("RGB", (3, 2), (10, 20, 30))
+    image.putpixel((2, 1), (200, 100, 0))
+
+    surface = pil_to_surface(image)
+    assert surface.get_size() == (3, 2)
+    assert surface.get_at((0, 0))[:3] == (10, 20, 30)
+    assert surface.get_at((2, 1))[:3] == (200, 100, 0)
+
+def test_scaled_image_is_reused_until_the_image_changes(display):
+    display.set_top_image(pil_to_surface(Image.new("RGB", (64, 64), (255, 0, 0))))
+    display.draw()
+    scaled = display._scaled_top_image
+    display.draw()
+    assert display._scaled_top_image is scaled
+    # The top area is 400 x 200; the square image is scaled to its height.
+    assert scaled.get_size() == (200, 200)
+    assert display.screen.get_at((200, 100))[:3] == (255, 0, 0)
+
+    display.set_top_image(pil_to_surface(Image.new("RGB", (64, 32), (0, 0, 255))))
+    display.draw()
+    assert display._scaled_top_image is not scaled
+    assert display._scaled_top_image.get_size() == (400, 200)
+
+def test_only_changed_sections_are_redrawn(display):
+    assert len(display.draw()) == 2
+    assert display.draw() == []
+
+    display.set_message("Once upon a time")
+    assert display.draw() == [display.bottom_toolbar.rect]
+    display.set_message("Once upon a time")
+    assert display.draw() == []
+
+    display.set_energy(0.001)
+    assert display.draw() == []
+    display.set_energy(0.5)
+    assert display.draw() == [display.bottom_toolbar.rect]
+
+    display.set_top_image(pil_to_surface(Image.new("RGB", (8, 8))))
+    assert display.draw() == [pygame.Rect(0, 0, 400, 200)]
+
+def test_becoming_dirty_posts_one_redraw_event(display):
+    display.draw()
+    pygame.event.clear()
+
+    display.set_message("a")
+    display.set_message("b")
+    events = [event for event in pygame.event.get() if event.type == DisplayManager.REDRAW_EVENT]
+    assert len(events) == 1
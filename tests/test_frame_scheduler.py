@@ -0,0 +1,40 @@
+import threading
+import time
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from frame_scheduler import FrameScheduler
+
+def test_frames_are_capped(pygame_display):
+    scheduler = FrameScheduler(max_fps=20, idle_fps=0)
+
+    start = time.monotonic()
+    for _ in range(6):
+        scheduler.next_events(dirty=True)
+    # The first tick does not wait; the five others wait about 50 ms each.
+    assert time.monotonic() - start >= 0.2
+
+def test_idle_loop_sleeps_until_an_event_arrives(pygame_display):
+    scheduler = FrameScheduler(max_fps=1000, idle_fps=1)
+    wake_up = pygame.event.custom_type()
+    threading.Timer(0.1, lambda: pygame.event.post(pygame.event.Event(wake_up))).start()
+
+    start = time.monotonic()
+    events = scheduler.next_events(dirty=False)
+    assert 0.05 <= time.monotonic() - start < 0.9
+    assert [event.type for event in events] == [wake_up]
+
+def test_idle_loop_times_out_without_events(pygame_display):
+    scheduler = FrameScheduler(max_fps=1000, idle_fps=10)
+
+    assert scheduler.next_events(dirty=False) == []
+
+def test_report_counts_loops_and_drawn_frames(pygame_display):
+    scheduler = FrameScheduler(report_interval=0)
+    scheduler.record(0.002, drew=True)
+    scheduler.record(0.0, drew=False)
+
+    assert (scheduler.loops, scheduler.frames) == (2, 1)
+    assert "2.00 ms per frame" in scheduler.report()
@@ -0,0 +1,44 @@
+import os
+
+from PIL import Image
+
+from image_cache import ImageCache
+
+def make_image(color=(200, 100, 50)):
+    return Image.new("RGB", (16, 8), color)
+
+def key(**overrides):
+    parts = dict(model="model", prompt="a dragon", seed=1, steps=12, width=256, height=256,
+                 scheduler="dpm++", guidance_scale=7.5)
+    parts.update(overrides)
+    return ImageCache.key(**parts)
+
+def test_cached_image_survives_a_restart(tmp_path):
+    ImageCache(directory=str(tmp_path)).put(key(), make_image())
+
+    cache = ImageCache(directory=str(tmp_path))
+    image = cache.get(key())
+    assert image.size == (16, 8)
+    assert image.convert("RGB").getpixel((0, 0)) == (200, 100, 50)
+    assert cache.stats()["disk_hits"] == 1
+
+def test_key_includes_every_generation_setting():
+    cache = ImageCache()
+    cache.put(key(), make_image())
+
+    for override in ({"model": "other"}, {"prompt": "a castle"}, {"seed": 2}, {"steps": 8},
+                     {"width": 512}, {"scheduler": "euler-a"}, {"guidance_scale": 1.0}, {"lora": "lcm"}):
+        assert cache.get(key(**override)) is None
+    assert cache.get(key()) is not None
+    assert cache.stats()["misses"] == 8
+    assert cache.stats()["memory_hits"] == 1
+
+def test_corrupted_disk_entry_is_dropped(tmp_path):
+    cache = ImageCache(directory=str(tmp_path))
+    cache.cache.disk.put(key(), b"\x89PNG\r\n\x1a\ntruncated")
+
+    assert cache.get(key()) is None
+    assert not os.path.exists(cache.cache.disk.path(key()))
+
+    cache.put(key(), make_image())
+    assert ImageCache(directory=str(tmp_path)).get(key()).size == (16, 8)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from latent_preview import SD_LATENT_RGB_FACTORS, latents_to_rgb, latents_to_surface
+
+def test_zero_latents_are_mid_grey():
+    rgb = latents_to_rgb(np.zeros((4, 8, 6), dtype=np.float32))
+
+    assert rgb.shape == (8, 6, 3)
+    assert rgb.dtype == np.uint8
+    assert (rgb == 127).all()
+
+def test_each_channel_is_projected_with_its_factors():
+    latents = np.zeros((4, 2, 2), dtype=np.float32)
+    latents[3] = 1.0
+
+    expected = ((SD_LATENT_RGB_FACTORS[3] + 1.0) * 127.5).astype(np.uint8)
+    assert (latents_to_rgb(latents)[0, 0] == expected).all()
+
+def test_values_are_clipped():
+    rgb = latents_to_rgb(np.full((4, 1, 1), 100.0))
+
+    assert (rgb == 255).all()
+
+def test_surface_has_latent_size():
+    surface = latents_to_surface(np.zeros((4, 32, 24), dtype=np.float32))
+
+    assert surface.get_size() == (24, 32)
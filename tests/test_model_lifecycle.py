@@ -0,0 +1,60 @@
+import threading
+import time
+
+from model_lifecycle import FAILED, LOADING, READY, WARMING, ModelLifecycleManager
+
+def test_model_goes_through_loading_and_warming_to_ready():
+    release_load = threading.Event()
+    release_warm_up = threading.Event()
+    warmed_up = []
+
+    def load():
+        release_load.wait(5)
+        return "model"
+
+    def warm_up(instance):
+        release_warm_up.wait(5)
+        warmed_up.append(instance)
+
+    models = ModelLifecycleManager()
+    model = models.register("test", load, warm_up_fn=warm_up)
+    assert models.state("test") == LOADING
+    assert models.get("test") is None
+
+    release_load.set()
+    while model.state == LOADING:
+        time.sleep(0.01)
+    assert model.state == WARMING
+    # Not handed out before the warm-up has finished.
+    assert models.get("test") is None
+    assert not models.wait_ready("test", timeout=0.05)
+
+    release_warm_up.set()
+    assert models.wait_ready("test", timeout=5)
+    assert models.state("test") == READY
+    assert models.get("test") == "model"
+    assert warmed_up == ["model"]
+    assert models.metrics()["test"]["warm_up_seconds"] is not None
+
+def test_load_failure_marks_the_model_failed():
+    def load():
+        raise RuntimeError("missing weights")
+
+    models = ModelLifecycleManager()
+    models.register("test", load)
+
+    assert not models.wait_ready("test", timeout=5)
+    assert models.state("test") == FAILED
+    assert models.get("test") is None
+    assert models.metrics()["test"]["error"] == "missing weights"
+
+def test_warm_up_failure_marks_the_model_failed():
+    def warm_up(instance):
+        raise ValueError("bad input")
+
+    models = ModelLifecycleManager()
+    models.register("test", lambda: "model", warm_up_fn=warm_up)
+
+    assert not models.wait_ready("test", timeout=5)
+    assert models.state("test") == FAILED
+    assert models.models["test"].instance is None
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ollama_client import OllamaClient, flush_poll_interval, MIN_FLUSH_POLL_SEC
+from sentence_segmenter import SentenceSegmenter
+from conversation_context import ConversationContext
+
+def make_client(url, **kwargs):
+    return OllamaClient(url, "test-model", "Tell a story.", **kwargs)
+
+def test_ask_streams_sentences_and_updates_context(fake_ollama):
+    client = make_client(fake_ollama.url)
+    received = []
+    context = ConversationContext()
+    client.ask("a dragon", context, received.append)
+
+    assert received == ["Once upon a time."]
+    assert context.to_list() == [1, 2, 3]
+    assert fake_ollama.payloads[0]["prompt"] == "Tell a story.\na dragon"
+
+def test_requests_reuse_one_pooled_connection(fake_ollama):
+    client = make_client(fake_ollama.url)
+    for _ in range(5):
+        client.ask("a dragon", ConversationContext(), lambda text: None)
+
+    assert fake_ollama.request_count == 5
+    assert fake_ollama.connection_count == 1
+
+@pytest.mark.parametrize(
+    "fake_ollama", [dict(tokens=["</think>"] + ["word", "."] * 50, token_delay=0.05)], indirect=True
+)
+def test_cancel_stops_stream_immediately(fake_ollama):
+    client = make_client(fake_ollama.url)
+    received = []
+    worker = threading.Thread(target=client.ask, args=("a dragon", ConversationContext(), received.append))
+    worker.start()
+    deadline = time.time() + 5
+    while not received and time.time() < deadline:
+        time.sleep(0.01)
+
+    start = time.time()
+    client.cancel()
+    worker.join(timeout=2)
+
+    assert not worker.is_alive()
+    assert time.time() - start < 0.5
+    assert len(received) < 50
+
+@pytest.mark.parametrize("fake_ollama", [dict(tokens=["</think>", "slow", "."], token_delay=0.5)], indirect=True)
+def test_read_timeout_is_reported(fake_ollama):
+    client = make_client(fake_ollama.url, read_timeout=0.1)
+    received = []
+    client.ask("a dragon", ConversationContext(), received.append)
+    assert len(received) == 1 and received[0].startswith("Request error")
+
+@pytest.mark.parametrize(
+    "fake_ollama", [dict(tokens=["The bunny hopped, ", "and hopped"], token_delay=0.5)], indirect=True
+)
+def test_stalled_stream_is_flushed_by_the_timer(fake_ollama):
+    client = make_client(fake_ollama.url, min_chunk_chars=50, flush_interval=0.1)
+    received = []
+    client.ask("a bunny", ConversationContext(), lambda text: received.append((time.monotonic(), text)))
+
+    assert [text for _, text in received] == ["The bunny hopped,", "and hopped"]
+    # The clause was spoken while the model was still working on the next token.
+    assert received[1][0] - received[0][0] > 0.25
+
+def test_flush_timer_interval_is_bounded():
+    assert flush_poll_interval(SentenceSegmenter(flush_interval=0)) is None
+    assert flush_poll_interval(SentenceSegmenter(flush_interval=0.01)) == MIN_FLUSH_POLL_SEC
+    assert flush_poll_interval(SentenceSegmenter(flush_interval=2.0)) == 0.5
+
+def test_zero_flush_interval_streams_without_timer(fake_ollama):
+    client = make_client(fake_ollama.url, flush_interval=0)
+    received = []
+    client.ask("a dragon", ConversationContext(), received.append)
+
+    assert received == ["Once upon a time."]
+
+def test_async_client_streams_and_reuses_connection(fake_ollama):
+    pytest.importorskip("aiohttp")
+    from async_ollama_client import AsyncOllamaClient
+
+    async def run():
+        client = AsyncOllamaClient(fake_ollama.url, "test-model", "Tell a story.")
+        received = []
+        context = ConversationContext()
+        for _ in range(3):
+            await client.ask("a dragon", context, received.append)
+        await client.close()
+        return received, context
+
+    received, context = asyncio.run(run())
+    assert received == ["Once upon a time."] * 3
+    assert context.to_list() == [1, 2, 3]
+    assert fake_ollama.connection_count == 1
+
+@pytest.mark.parametrize("fake_ollama", [dict(context=list(range(10)))], indirect=True)
+def test_context_is_truncated_and_instructions_resent(fake_ollama):
+    client = make_client(fake_ollama.url)
+    context = ConversationContext(max_tokens=4)
+    client.ask("a dragon", context, lambda text: None)
+    assert context.to_list() == [6, 7, 8, 9]
+
+    client.ask("a castle", context, lambda text: None)
+    assert fake_ollama.payloads[1]["context"] == [6, 7, 8, 9]
+    assert fake_ollama.payloads[1]["prompt"] == "Tell a story.\na castle"
+
+@pytest.mark.parametrize(
+    "fake_ollama", [dict(context=list(range(10)), summary="A dragon found a castle.")], indirect=True
+)
+def test_summarize_policy_resets_context_with_summary(fake_ollama):
+    client = make_client(fake_ollama.url)
+    context = ConversationContext(max_tokens=4, policy="summarize")
+    client.ask("a dragon", context, lambda text: None)
+    assert len(context) == 0
+    assert context.summary == "A dragon found a castle."
+
+    client.ask("what next", context, lambda text: None)
+    assert fake_ollama.payloads[2]["context"] == []
+    assert "The story so far: A dragon found a castle." in fake_ollama.payloads[2]["prompt"]
+
+@pytest.mark.parametrize(
+    "fake_ollama", [dict(context=list(range(10)), summary="A dragon found a big castle.", token_delay=0.1)],
+    indirect=True
+)
+def test_cancel_stops_summary_and_keeps_context(fake_ollama):
+    client = make_client(fake_ollama.url)
+    context = ConversationContext(max_tokens=4, policy="summarize")
+    worker = threading.Thread(target=client.ask, args=("a dragon", context, lambda text: None))
+    worker.start()
+    deadline = time.time() + 5
+    while fake_ollama.request_count < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+    start = time.time()
+    client.cancel()
+    worker.join(timeout=2)
+
+    assert not worker.is_alive()
+    assert time.time() - start < 0.5
+    # The summary was dropped; the context is summarized after a later answer instead.
+    assert context.summary == ""
+    assert context.needs_summary
+    assert len(context) == 10
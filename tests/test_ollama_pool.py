@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ollama_client import OllamaClient
+from ollama_pool import OllamaEndpointPool
+from conversation_context import ConversationContext
+
+def make_client(pool):
+    return OllamaClient(pool.endpoints[0].url, "test-model", "Tell a story.", pool=pool)
+
+def test_routes_to_least_loaded_endpoint(start_fake_ollama):
+    first, second = start_fake_ollama(), start_fake_ollama()
+    pool = OllamaEndpointPool([first.url, second.url], health_interval=0)
+    busy = pool.choose()
+    assert busy.url == first.url
+
+    make_client(pool).ask("a dragon", ConversationContext(), lambda text: None)
+    assert (first.request_count, second.request_count) == (0, 1)
+    pool.release(busy)
+
+def test_prefers_lower_latency(start_fake_ollama):
+    slow, fast = start_fake_ollama(first_token_delay=0.2), start_fake_ollama()
+    pool = OllamaEndpointPool([slow.url, fast.url], health_interval=0)
+    client = make_client(pool)
+    client.ask("a dragon", ConversationContext(), lambda text: None)
+    client.ask("a dragon", ConversationContext(), lambda text: None)
+    for _ in range(3):
+        client.ask("a dragon", ConversationContext(), lambda text: None)
+
+    assert slow.request_count == 1
+    assert fast.request_count == 4
+
+def test_fails_over_on_error_status_and_dropped_stream(start_fake_ollama):
+    broken = start_fake_ollama(fail_status=500)
+    dropping = start_fake_ollama(drop_after=0)
+    healthy = start_fake_ollama()
+    pool = OllamaEndpointPool([broken.url, dropping.url, healthy.url], health_interval=0)
+    received = []
+    assert make_client(pool).ask("a dragon", ConversationContext(), received.append)
+
+    assert received == ["Once upon a time."]
+    assert (broken.request_count, dropping.request_count, healthy.request_count) == (1, 1, 1)
+
+def test_error_reported_when_all_endpoints_fail(start_fake_ollama):
+    first, second = start_fake_ollama(fail_status=503), start_fake_ollama(fail_status=503)
+    pool = OllamaEndpointPool([first.url, second.url], health_interval=0)
+    received = []
+    assert not make_client(pool).ask("a dragon", ConversationContext(), received.append)
+    assert len(received) == 1 and received[0].startswith("Request error")
+
+def test_circuit_breaker_skips_failing_endpoint_until_backoff_ends(start_fake_ollama):
+    broken, healthy = start_fake_ollama(fail_status=500), start_fake_ollama()
+    pool = OllamaEndpointPool(
+        [broken.url, healthy.url], health_interval=0, failure_threshold=1, base_backoff=0.2
+    )
+    client = make_client(pool)
+    for _ in range(3):
+        client.ask("a dragon", ConversationContext(), lambda text: None)
+    assert broken.request_count == 1
+
+    time.sleep(0.25)
+    broken.fail_status = None
+    client.ask("a dragon", ConversationContext(), lambda text: None)
+    assert broken.request_count == 2
+    assert pool.endpoints[0].failures == 0
+
+def test_health_probes_open_and_close_circuit(start_fake_ollama):
+    fake = start_fake_ollama(fail_status=500)
+    pool = OllamaEndpointPool([fake.url], health_interval=0, failure_threshold=1, base_backoff=60)
+    assert not pool.probe(pool.endpoints[0])
+    assert not pool.endpoints[0].is_available(time.monotonic())
+
+    fake.fail_status = None
+    pool.probe_all()
+    assert pool.endpoints[0].is_available(time.monotonic())
+    assert fake.probe_count == 2
+    pool.stop()
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ollama_client import OllamaClient
+from conversation_context import ConversationContext
+from response_cache import CachedOllamaClient, normalize_transcript
+
+def make_cached(url, **kwargs):
+    return CachedOllamaClient(OllamaClient(url, "test-model", "Tell a story."), **kwargs)
+
+def test_normalize_transcript():
+    assert normalize_transcript(" A Dragon, and a princess!") == "a dragon and a princess"
+
+def test_hit_replays_chunks_and_restores_context(fake_ollama):
+    client = make_cached(fake_ollama.url)
+    first, second = [], []
+    client.ask("A dragon.", ConversationContext(), first.append)
+    context = ConversationContext()
+    client.ask("a dragon", context, second.append)
+
+    assert fake_ollama.request_count == 1
+    assert second == first == ["Once upon a time."]
+    assert context.to_list() == [1, 2, 3]
+    assert (client.hits, client.misses) == (1, 1)
+
+def test_exact_match_and_context_are_part_of_the_key(fake_ollama):
+    client = make_cached(fake_ollama.url, match="exact")
+    client.ask("A dragon.", ConversationContext(), lambda text: None)
+    client.ask("a dragon", ConversationContext(), lambda text: None)
+    context = ConversationContext()
+    context.update([7, 8])
+    client.ask("A dragon.", context, lambda text: None)
+
+    assert fake_ollama.request_count == 3
+
+def test_disk_tier_survives_restart(fake_ollama, tmp_path):
+    make_cached(fake_ollama.url, directory=str(tmp_path)).ask("a dragon", ConversationContext(), lambda text: None)
+    client = make_cached(fake_ollama.url, directory=str(tmp_path))
+    received = []
+    client.ask("a dragon", ConversationContext(), received.append)
+
+    assert fake_ollama.request_count == 1
+    assert received == ["Once upon a time."]
+    assert client.cache.disk_hits == 1
+
+def test_corrupted_disk_entry_is_dropped_and_regenerated(fake_ollama, tmp_path):
+    client = make_cached(fake_ollama.url, directory=str(tmp_path))
+    key = client.key("a dragon", ConversationContext())
+    client.cache.disk.put(key, b"{not json")
+    received = []
+    client.ask("a dragon", ConversationContext(), received.append)
+
+    assert fake_ollama.request_count == 1
+    assert received == ["Once upon a time."]
+    assert (client.hits, client.misses) == (0, 1)
+
+    # The regenerated entry replaced the corrupted one.
+    restarted = make_cached(fake_ollama.url, directory=str(tmp_path))
+    restarted.ask("a dragon", ConversationContext(), lambda text: None)
+    assert fake_ollama.request_count == 1
+    assert restarted.hits == 1
+
+def test_variety_mode_generates_until_enough_variants(fake_ollama):
+    client = make_cached(fake_ollama.url, variants=2)
+    for _ in range(4):
+        client.ask("a dragon", ConversationContext(), lambda text: None)
+
+    assert fake_ollama.request_count == 2
+    assert (client.hits, client.misses) == (2, 2)
+
+def test_ttl_expires_entries(fake_ollama):
+    client = make_cached(fake_ollama.url, ttl_sec=0.01)
+    client.ask("a dragon", ConversationContext(), lambda text: None)
+    time.sleep(0.05)
+    client.ask("a dragon", ConversationContext(), lambda text: None)
+
+    assert fake_ollama.request_count == 2
@@ -0,0 +1,51 @@
+from sentence_segmenter import SentenceSegmenter
+
+def feed_all(segmenter, tokens):
+    chunks = []
+    for token in tokens:
+        chunks.extend(segmenter.feed(token))
+    return chunks
+
+def test_boundaries_inside_tokens():
+    segmenter = SentenceSegmenter(min_chars=5)
+    chunks = feed_all(segmenter, ["The dragon flew", ". The", " princess waved", "!\n", "They"])
+    assert chunks == ["The dragon flew.", "The princess waved!"]
+    assert segmenter.flush() == ["They"]
+
+def test_abbreviations_initials_and_decimals_do_not_split():
+    segmenter = SentenceSegmenter(min_chars=5)
+    chunks = feed_all(segmenter, ["Mr", ". Smith read J. R. R. Tolkien for 2.5 hours", ". Then"])
+    assert chunks == ["Mr. Smith read J. R. R. Tolkien for 2.5 hours."]
+
+def test_closing_quotes_stay_with_sentence():
+    segmenter = SentenceSegmenter(min_chars=5)
+    chunks = feed_all(segmenter, ['The owl said "Hoo!"', " and flew away. "])
+    assert chunks == ['The owl said "Hoo!"', "and flew away."]
+
+def test_short_sentences_are_merged():
+    segmenter = SentenceSegmenter(min_chars=20)
+    chunks = feed_all(segmenter, ["Hi. ", "Look at the moon. ", "Wow"])
+    assert chunks == ["Hi. Look at the moon."]
+
+def test_long_text_is_split_at_clause_break():
+    segmenter = SentenceSegmenter(min_chars=5, max_chars=40)
+    chunks = feed_all(segmenter, ["Once upon a time, in a land far far away there lived a bear"])
+    assert chunks == ["Once upon a time,", "in a land far far away there lived a"]
+    assert segmenter.flush() == ["bear"]
+
+def test_time_based_flush_at_last_boundary():
+    now = [0.0]
+    segmenter = SentenceSegmenter(min_chars=50, flush_interval=1.0, clock=lambda: now[0])
+    assert feed_all(segmenter, ["The bunny hopped, ", "and hopped"]) == []
+    now[0] = 2.0
+    assert segmenter.feed(" again") == ["The bunny hopped,"]
+    assert segmenter.flush() == ["and hopped again"]
+
+def test_poll_flushes_without_new_tokens():
+    now = [0.0]
+    segmenter = SentenceSegmenter(min_chars=50, flush_interval=1.0, clock=lambda: now[0])
+    assert segmenter.feed("The bunny hopped, and") == []
+    assert segmenter.poll() == []
+    now[0] = 1.0
+    assert segmenter.poll() == ["The bunny hopped,"]
+    assert segmenter.poll() == []
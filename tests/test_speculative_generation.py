@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip("requests")
+
+from ollama_client import OllamaClient
+from conversation_context import ConversationContext
+from speculative_generation import SpeculativeGenerator
+
+# Every test runs against a slightly slow stream so that speculation has time to start.
+pytestmark = pytest.mark.parametrize(
+    "fake_ollama", [dict(tokens=["Once", " upon", " a", " time", "."], token_delay=0.02)], indirect=True
+)
+
+def make_speculator(url, **kwargs):
+    return SpeculativeGenerator(OllamaClient(url, "test-model", "Tell a story."), **kwargs)
+
+def test_matching_final_transcript_keeps_speculation(fake_ollama):
+    speculator = make_speculator(fake_ollama.url)
+    context = ConversationContext()
+    speculator.observe_partial("A dragon", context)
+    speculator.observe_partial("a dragon.", context)
+
+    received = []
+    assert speculator.resolve("A dragon!", context, received.append)
+    assert received == ["Once upon a time."]
+    assert fake_ollama.request_count == 1
+    assert fake_ollama.payloads[0]["prompt"] == "Tell a story.\na dragon."
+    assert context.to_list() == [1, 2, 3]
+    assert (speculator.hits, speculator.misses) == (1, 0)
+    assert speculator.saved_seconds > 0
+
+def test_unstable_partial_does_not_speculate(fake_ollama):
+    speculator = make_speculator(fake_ollama.url)
+    context = ConversationContext()
+    speculator.observe_partial("a", context)
+    speculator.observe_partial("a dragon", context)
+
+    speculator.resolve("a dragon and a princess", context, lambda text: None)
+    assert fake_ollama.request_count == 1
+    assert (speculator.hits, speculator.misses) == (0, 0)
+
+def test_mismatch_restarts_with_final_transcript(fake_ollama):
+    speculator = make_speculator(fake_ollama.url, stable_count=1)
+    context = ConversationContext()
+    speculator.observe_partial("a dragon", context)
+
+    received = []
+    assert speculator.resolve("a dragon and a princess", context, received.append)
+    assert received == ["Once upon a time."]
+    assert fake_ollama.payloads[-1]["prompt"] == "Tell a story.\na dragon and a princess"
+    assert (speculator.hits, speculator.misses) == (0, 1)
+
+def test_buffered_chunks_are_passed_on_without_the_lock(fake_ollama):
+    speculator = make_speculator(fake_ollama.url, stable_count=1)
+    context = ConversationContext()
+    speculator.observe_partial("a dragon", context)
+    speculator._speculation.thread.join()
+
+    received = []
+    def callback(text):
+        # The callback queues speech and updates the display; it must not run under the lock.
+        assert not speculator._lock.locked()
+        received.append(text)
+
+    assert speculator.resolve("A dragon", context, callback)
+    assert received == ["Once upon a time."]
@@ -0,0 +1,95 @@
+import threading
+import time
+
+from speech_pipeline import SpeechPipeline
+
+class Recorder:
+    """
+    Fake synthesis and playback that log when each step starts and ends.
+    """
+    def __init__(self, synth_delay=0.05, play_delay=0.05):
+        self.synth_delay = synth_delay
+        self.play_delay = play_delay
+        self.events = []
+        self.played = []
+        self.lock = threading.Lock()
+
+    def log(self, event):
+        with self.lock:
+            self.events.append((event, time.monotonic()))
+
+    def synthesize(self, text):
+        self.log(("synth-start", text))
+        time.sleep(self.synth_delay)
+        self.log(("synth-end", text))
+        return text.upper()
+
+    def play(self, audio, cancelled=None):
+        self.log(("play-start", audio))
+        time.sleep(self.play_delay)
+        self.played.append(audio)
+
+    def time_of(self, event):
+        return next(t for e, t in self.events if e == event)
+
+def test_plays_in_order_and_synthesizes_ahead():
+    recorder = Recorder()
+    pipeline = SpeechPipeline(recorder.synthesize, recorder.play, workers=2)
+    for text in ["one", "two", "three"]:
+        pipeline.enqueue(text)
+    assert pipeline.wait_until_done(timeout=2)
+
+    assert recorder.played == ["ONE", "TWO", "THREE"]
+    # Sentence two was synthesized before sentence one finished playing.
+    assert recorder.time_of(("synth-end", "two")) < recorder.time_of(("play-start", "TWO"))
+    assert recorder.time_of(("synth-start", "two")) < recorder.time_of(("play-start", "ONE")) + recorder.play_delay
+
+def test_enqueue_does_not_block():
+    recorder = Recorder(synth_delay=0.2, play_delay=0.2)
+    pipeline = SpeechPipeline(recorder.synthesize, recorder.play, queue_size=1)
+    start = time.monotonic()
+    for index in range(10):
+        pipeline.enqueue(str(index))
+    assert time.monotonic() - start < 0.05
+    pipeline.flush()
+
+def test_flush_drops_queued_sentences():
+    recorder = Recorder(play_delay=0.2)
+    stopped = []
+    pipeline = SpeechPipeline(recorder.synthesize, recorder.play, stop_fn=lambda: stopped.append(True))
+    for text in ["one", "two", "three", "four"]:
+        pipeline.enqueue(text)
+    time.sleep(0.1)
+    pipeline.flush()
+    pipeline.enqueue("new")
+    assert pipeline.wait_until_done(timeout=2)
+
+    assert recorder.played[0] == "ONE"
+    assert recorder.played[-1] == "NEW"
+    assert "FOUR" not in recorder.played
+    assert stopped == [True]
+
+def test_on_start_runs_when_each_sentence_starts_playing():
+    recorder = Recorder(play_delay=0.1)
+    pipeline = SpeechPipeline(recorder.synthesize, recorder.play)
+    for text in ["one", "two"]:
+        pipeline.enqueue(text, on_start=lambda text: recorder.log(("shown", text)))
+    assert pipeline.wait_until_done(timeout=2)
+
+    # "two" is shown when it starts playing, not when it was queued.
+    assert recorder.time_of(("shown", "two")) >= recorder.time_of(("play-start", "ONE")) + recorder.play_delay
+    assert recorder.time_of(("shown", "two")) <= recorder.time_of(("play-start", "TWO"))
+
+def test_wait_until_done_waits_for_the_audio_to_end():
+    recorder = Recorder()
+    waits = []
+    def wait(timeout):
+        # Like MixerPlayer.wait: the last sentence is still playing when play_fn returns.
+        waits.append(timeout)
+        return True
+    pipeline = SpeechPipeline(recorder.synthesize, recorder.play, wait_fn=wait)
+    pipeline.enqueue("one")
+    assert pipeline.wait_until_done(timeout=2)
+
+    assert recorder.played == ["ONE"]
+    assert len(waits) == 1 and 0 < waits[0] <= 2
@@ -0,0 +1,32 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("whisper")
+
+from speech_recognizer import SpeechRecognizer
+
+class FakeWhisperModel:
+    """
+    Accepts what faster_whisper.WhisperModel.transcribe accepts: a numpy array or a path.
+    """
+    def __init__(self, model_path, **options):
+        self.inputs = []
+
+    def transcribe(self, audio, language=None, initial_prompt=None):
+        if not isinstance(audio, (np.ndarray, str)):
+            raise TypeError(f"unsupported audio input: {type(audio)}")
+        self.inputs.append(audio)
+        return iter([]), None
+
+def test_faster_whisper_warm_up_passes_a_numpy_array(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(WhisperModel=FakeWhisperModel))
+    recognizer = SpeechRecognizer("tiny", "en", backend="faster-whisper")
+
+    recognizer.warm_up()
+
+    (audio,) = recognizer.model.inputs
+    assert audio.dtype == np.float32 and audio.shape == (16000,)
@@ -0,0 +1,60 @@
+import numpy as np
+
+from streaming_transcriber import StreamingTranscriber
+
+RATE = 100
+
+class FakeRecognizer:
+    """
+    Returns scripted results and records the length and prompt of every decoded window.
+    """
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+
+    def transcribe(self, waveform, initial_prompt=None):
+        self.calls.append((waveform.shape[0], initial_prompt))
+        return self.results.pop(0)
+
+def segment(start, end, text):
+    return {"start": start, "end": end, "text": text}
+
+def test_stable_segments_are_committed_and_only_the_tail_is_decoded_again():
+    recognizer = FakeRecognizer([
+        {"segments": [segment(0.0, 1.5, " Once"), segment(1.5, 3.5, " upon"), segment(3.5, 5.0, " a tim")]},
+        {"text": " a time ago"},
+    ])
+    partials = []
+    audio = np.zeros(6 * RATE, dtype=np.float32)
+    transcriber = StreamingTranscriber(
+        recognizer, lambda: audio[:5 * RATE], RATE, min_window_sec=2.0, holdback_sec=1.0,
+        partial_callback=partials.append
+    )
+
+    transcriber._decode_window()
+    # The last segment is never committed.
+    assert transcriber.committed_text == " Once upon"
+    assert transcriber.committed_samples == 350
+    assert partials == ["Once upon a tim"]
+
+    assert transcriber.finish(audio) == " Once upon a time ago"
+    assert recognizer.calls == [(500, None), (250, " Once upon")]
+
+def test_segments_close_to_the_window_end_are_held_back():
+    recognizer = FakeRecognizer([
+        {"segments": [segment(0.0, 2.5, " Once"), segment(2.5, 3.0, " upon")]},
+    ])
+    audio = np.zeros(3 * RATE, dtype=np.float32)
+    transcriber = StreamingTranscriber(recognizer, lambda: audio, RATE, min_window_sec=2.0, holdback_sec=1.0)
+
+    transcriber._decode_window()
+    assert transcriber.committed_text == ""
+    assert transcriber.committed_samples == 0
+
+def test_short_windows_are_not_decoded():
+    recognizer = FakeRecognizer([])
+    audio = np.zeros(RATE, dtype=np.float32)
+    transcriber = StreamingTranscriber(recognizer, lambda: audio, RATE, min_window_sec=2.0)
+
+    transcriber._decode_window()
+    assert recognizer.calls == []
@@ -0,0 +1,37 @@
+import shutil
+
+import pytest
+
+from tts_backends import EspeakBackend, FakeBackend, create_backend
+
+def test_fake_backend_is_deterministic():
+    backend = FakeBackend(sample_rate=8000, seconds_per_char=0.01)
+    first = backend.synthesize("Once upon a time.")
+    second = backend.synthesize("Once upon a time.")
+
+    assert first.data == second.data
+    assert first.format == "pcm"
+    assert first.duration == pytest.approx(0.17)
+    assert backend.texts == ["Once upon a time."] * 2
+
+def test_metrics_report_latency_and_real_time_factor():
+    backend = FakeBackend(seconds_per_char=0.1, delay=0.05)
+    backend.synthesize("0123456789")
+    metrics = backend.metrics()
+
+    assert metrics["backend"] == "fake"
+    assert metrics["count"] == 1
+    assert metrics["mean_latency"] >= 0.05
+    assert 0.05 <= metrics["rtf"] < 1.0
+
+def test_create_backend():
+    assert isinstance(create_backend("fake", lang="en", voice=""), FakeBackend)
+    with pytest.raises(ValueError):
+        create_backend("unknown")
+
+@pytest.mark.skipif(not (shutil.which("espeak-ng") or shutil.which("espeak")), reason="espeak-ng not installed")
+def test_espeak_backend_returns_pcm():
+    audio = EspeakBackend(lang="en").synthesize("Hello.")
+    assert audio.format == "pcm"
+    assert audio.sample_rate > 0
+    assert audio.duration > 0
@@ -0,0 +1,62 @@
+import os
+
+from tts_backends import FakeBackend
+from tts_cache import TTSCache
+
+def test_cache_hit_returns_identical_audio(tmp_path):
+    backend = FakeBackend()
+    cache = TTSCache(directory=str(tmp_path))
+    audio = backend.synthesize("Yes.")
+    cache.put("Yes.", backend, audio)
+
+    cached = TTSCache(directory=str(tmp_path)).get("Yes.", backend)
+    assert cached.data == audio.data
+    assert (cached.format, cached.sample_rate, cached.duration) == ("pcm", 16000, audio.duration)
+
+def test_key_includes_voice_lang_and_backend():
+    cache = TTSCache()
+    cache.put("Yes.", FakeBackend(voice="a"), FakeBackend().synthesize("Yes."))
+
+    assert cache.get("Yes.", FakeBackend(voice="b")) is None
+    assert cache.get("Yes.", FakeBackend(lang="fr", voice="a")) is None
+    assert cache.get("Yes.", FakeBackend(voice="a")) is not None
+    assert cache.stats()["misses"] == 2
+
+def test_precompute_synthesizes_each_phrase_once():
+    backend = FakeBackend()
+    cache = TTSCache()
+
+    def synthesize(text):
+        audio = cache.get(text, backend)
+        if audio is None:
+            audio = backend.synthesize(text)
+            cache.put(text, backend, audio)
+        return audio
+
+    cache.precompute(["Yes.", "Let me think.", "Yes.", ""], synthesize).join()
+    synthesize("Yes.")
+
+    assert backend.texts == ["Yes.", "Let me think."]
+    assert cache.stats()["memory_hits"] == 1
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    backend = FakeBackend(seconds_per_char=0.01)
+    size = len(backend.synthesize("abcd").data) + 100
+    cache = TTSCache(directory=str(tmp_path), memory_entries=0, disk_max_bytes=2 * size)
+    for text in ["abcd", "efgh", "ijkl"]:
+        cache.put(text, backend, backend.synthesize(text))
+
+    assert cache.get("abcd", backend) is None
+    assert cache.get("ijkl", backend) is not None
+
+def test_corrupted_disk_entry_is_dropped_and_regenerated(tmp_path):
+    backend = FakeBackend()
+    cache = TTSCache(directory=str(tmp_path))
+    cache.cache.disk.put(TTSCache.key("Yes.", backend), b"truncated")
+
+    assert cache.get("Yes.", backend) is None
+    assert not os.path.exists(cache.cache.disk.path(TTSCache.key("Yes.", backend)))
+
+    audio = backend.synthesize("Yes.")
+    cache.put("Yes.", backend, audio)
+    assert TTSCache(directory=str(tmp_path)).get("Yes.", backend).data == audio.data
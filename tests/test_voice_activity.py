@@ -0,0 +1,38 @@
+import numpy as np
+
+from voice_activity import VoiceActivityDetector
+
+# 1 kHz and 10 ms frames: a frame is 10 samples.
+RATE = 1000
+
+def audio(*parts):
+    """
+    Build a waveform from (frames, amplitude) parts.
+    """
+    return np.concatenate([np.full(frames * 10, amplitude, dtype=np.float32) for frames, amplitude in parts])
+
+def detector(**options):
+    options = {"frame_ms": 10, "padding_ms": 20, "max_pause_ms": 50, **options}
+    return VoiceActivityDetector(RATE, threshold=0.1, **options)
+
+def test_edges_are_trimmed_to_a_view_with_padding():
+    waveform = audio((10, 0.0), (10, 0.5), (10, 0.0))
+
+    trimmed = detector().trim(waveform)
+    # 10 speech frames plus 2 frames of padding on each side.
+    assert trimmed.shape[0] == 140
+    assert np.shares_memory(trimmed, waveform)
+
+def test_long_pauses_are_capped():
+    waveform = audio((10, 0.0), (5, 0.5), (20, 0.0), (5, 0.5), (10, 0.0))
+
+    vad = detector()
+    trimmed = vad.trim(waveform)
+    # Frames 8-21 (speech, padding and the first 5 pause frames) and frames 33-41.
+    assert trimmed.shape[0] == 230
+    assert np.count_nonzero(trimmed) == 100
+    assert np.isclose(vad.last_stats["removed_seconds"], 0.27)
+
+def test_silence_and_too_short_input_give_empty_audio():
+    assert detector().trim(audio((30, 0.01))).shape[0] == 0
+    assert detector().trim(np.full(5, 0.5, dtype=np.float32)).shape[0] == 0